@@ -1 +1,8 @@
 # DHS FastAPI Application
+import pandas as pd
+
+# Copy-on-Write: filtered frames share memory until they are written to,
+# so routers can slice without defensive .copy() calls.
+# (Always enabled from pandas 3.0, where the option is deprecated.)
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
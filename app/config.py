@@ -22,6 +22,14 @@ DATA_FILES = {
     "household_member": "RWFW81FL.DTA" # Household member data
 }
 
+# Datasets preloaded at application startup (the ones most endpoints read;
+# the others load on first use); override with a comma-separated
+# DHS_WARMUP_DATASETS, empty to disable
+WARMUP_DATASETS = [
+    name for name in os.getenv("DHS_WARMUP_DATASETS", "women,children").split(",")
+    if name
+]
+
 # Province and District mappings
 PROVINCES = {
     1: "Kigali City",
@@ -5,7 +5,7 @@ Provides shared resources to route handlers.
 
 from fastapi import Depends, HTTPException
 from app.services.data_loader import DHSDataLoader, data_loader
-from app.services.calculations import CalculationService, calc_service
+from app.services.calculations import CalculationService, IndicatorSpec, calc_service
 
 
 def get_data_loader() -> DHSDataLoader:
@@ -16,3 +16,17 @@ def get_data_loader() -> DHSDataLoader:
 def get_calculation_service() -> CalculationService:
     """Dependency to get the calculation service"""
     return calc_service
+
+
+def require_columns(data_loader: DHSDataLoader, spec: IndicatorSpec) -> None:
+    """
+    Check that the spec's dataset has every column the indicator needs.
+    Raises a 400 naming the missing columns instead of failing mid-calculation.
+    """
+    required = {spec.region_col, spec.weight_col, *spec.columns}
+    missing = required - data_loader.get_columns(spec.dataset)
+    if missing:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Missing columns in {spec.dataset} dataset: {', '.join(sorted(missing))}"
+        )
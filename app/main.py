@@ -8,14 +8,18 @@ social indicators organized by thematic chapters.
 Run with: uvicorn app.main:app --reload
 """
 
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from app.config import (
     API_TITLE, API_DESCRIPTION, API_VERSION, 
-    CORS_ORIGINS, PROVINCES, DATA_FILES
+    CORS_ORIGINS, PROVINCES, DATA_FILES, WARMUP_DATASETS
 )
+from app.services import data_loader
 
 # Import all routers
 from app.routers import (
@@ -23,6 +27,16 @@ from app.routers import (
     chapter6, chapter7, chapter8, chapter9, chapter10
 )
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Load the commonly used datasets before serving, so the first request
+    for each dataset does not pay the Stata read.
+    """
+    await asyncio.to_thread(data_loader.warmup, WARMUP_DATASETS)
+    yield
+
+
 # Create FastAPI application
 app = FastAPI(
     title=API_TITLE,
@@ -30,7 +44,8 @@ app = FastAPI(
     version=API_VERSION,
     docs_url="/docs",
     redoc_url="/redoc",
-    openapi_url="/openapi.json"
+    openapi_url="/openapi.json",
+    lifespan=lifespan
 )
 
 # Configure CORS for frontend integration
@@ -204,12 +219,15 @@ async def get_available_indicators():
 async def global_exception_handler(request, exc):
     """
     Global exception handler for unhandled errors.
+    Routers let unexpected errors propagate here instead of wrapping each
+    endpoint; "detail" keeps the shape of FastAPI's HTTPException bodies.
     """
     return JSONResponse(
         status_code=500,
         content={
             "error": "Internal Server Error",
             "message": str(exc),
+            "detail": str(exc),
             "path": str(request.url)
         }
     )
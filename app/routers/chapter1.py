@@ -5,14 +5,15 @@ Endpoints for household-level indicators like electricity, assets, etc.
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from typing import List, Optional
+from functools import lru_cache
+import asyncio
 import numpy as np
 
 from app.dependencies import get_data_loader, get_calculation_service
 from app.services.data_loader import DHSDataLoader
 from app.services.calculations import CalculationService
 from app.models.schemas import IndicatorResponse, RegionCode
-from app.config import DISTRICT_MAPS, PROVINCES
-from app.utils.helpers import format_indicator_response, get_province_key
+from app.utils.helpers import format_indicator_response, get_district_map
 
 router = APIRouter(
     prefix="/chapter1",
@@ -21,6 +22,60 @@ router = APIRouter(
 )
 
 
+# Asset key -> (indicator column, raw hv column, indicator name)
+ASSET_MAP = {
+    'electricity': ('has_electricity', 'hv206', 'Household Electricity Access'),
+    'mobile': ('has_mobile', 'hv243a', 'Mobile Phone Ownership'),
+    'radio': ('has_radio', 'hv207', 'Radio Ownership'),
+    'tv': ('has_tv', 'hv208', 'Television Ownership'),
+    'computer': ('has_computer', 'hv243e', 'Computer Ownership')
+}
+
+
+@lru_cache(maxsize=256)
+def _compute_household_assets(
+    data_loader: DHSDataLoader,
+    calc: CalculationService,
+    region: int,
+    asset: str,
+    data_version: int
+) -> dict:
+    """Build the household assets response, cached per region/asset and data version."""
+    col_name, raw_col, indicator_name = ASSET_MAP[asset]
+    
+    # Load household data
+    df = data_loader.load_dataset("household")
+    
+    # Filter for completed interviews only
+    df = df[df['hv015'] == 1]
+    
+    # Clean indicator (1=yes, 9=missing -> NaN)
+    df[col_name] = df[raw_col].replace({9: float('nan')})
+    
+    # Filter by region
+    region_df = data_loader.load_region("household", region, df)
+    
+    # Get district mapping
+    district_map = get_district_map(region)
+    
+    # Calculate district-level values
+    districts_data = calc.district_percentages(region_df, col_name, 'shdistrict', district_map)
+    
+    # Calculate province and national values
+    province_val = calc.weighted_percentage(region_df, col_name)
+    national_val = calc.weighted_percentage(df, col_name)
+    
+    return format_indicator_response(
+        indicator_name=indicator_name,
+        unit="Percentage",
+        districts_data=districts_data,
+        province_value=province_val,
+        province_code=region,
+        national_value=national_val,
+        population_type="Households"
+    )
+
+
 @router.get("/household-assets", response_model=IndicatorResponse)
 async def get_household_assets(
     region: RegionCode = Query(default=RegionCode.EASTERN, description="Province/Region code"),
@@ -40,61 +95,16 @@ async def get_household_assets(
     
     Data is provided at district, province, and national levels.
     """
-    asset_map = {
-        'electricity': ('has_electricity', 'hv206', 'Household Electricity Access'),
-        'mobile': ('has_mobile', 'hv243a', 'Mobile Phone Ownership'),
-        'radio': ('has_radio', 'hv207', 'Radio Ownership'),
-        'tv': ('has_tv', 'hv208', 'Television Ownership'),
-        'computer': ('has_computer', 'hv243e', 'Computer Ownership')
-    }
-    
-    if asset not in asset_map:
+    if asset not in ASSET_MAP:
         raise HTTPException(
             status_code=400, 
-            detail=f"Invalid asset type. Choose from: {list(asset_map.keys())}"
+            detail=f"Invalid asset type. Choose from: {list(ASSET_MAP.keys())}"
         )
     
-    col_name, raw_col, indicator_name = asset_map[asset]
-    
     try:
-        # Load household data
-        df = data_loader.load_dataset("household")
-        
-        # Filter for completed interviews only
-        df = df[df['hv015'] == 1].copy()
-        
-        # Clean indicator (1=yes, 9=missing -> NaN)
-        df[col_name] = df[raw_col].replace({9: float('nan')})
-        
-        # Filter by region
-        region_df = df[df['hv024'] == region.value].copy()
-        
-        # Get district mapping
-        province_key = get_province_key(region.value)
-        district_map = DISTRICT_MAPS.get(province_key, {})
-        
-        # Calculate district-level values
-        districts_data = {}
-        for dist_code, dist_name in district_map.items():
-            dist_df = region_df[region_df['shdistrict'] == dist_code]
-            if not dist_df.empty:
-                val = calc.weighted_percentage(dist_df, col_name)
-                districts_data[dist_name] = val
-        
-        # Calculate province and national values
-        province_val = calc.weighted_percentage(region_df, col_name)
-        national_val = calc.weighted_percentage(df, col_name)
-        
-        return format_indicator_response(
-            indicator_name=indicator_name,
-            unit="Percentage",
-            districts_data=districts_data,
-            province_value=province_val,
-            province_code=region.value,
-            national_value=national_val,
-            population_type="Households"
-        )
-        
+        return await asyncio.to_thread(_compute_household_assets, data_loader, calc, region.value, asset, data_loader.version)
+    except HTTPException:
+        raise
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -122,6 +132,40 @@ async def get_specific_asset(
     return await get_household_assets(region=region, asset=asset_type, data_loader=data_loader, calc=calc)
 
 
+@lru_cache(maxsize=256)
+def _compute_handwashing_facilities(
+    data_loader: DHSDataLoader,
+    calc: CalculationService,
+    region: int,
+    data_version: int
+) -> dict:
+    """Build the handwashing response, cached per region and data version."""
+    df = data_loader.load_dataset("household")
+    df = df[df['hv015'] == 1]
+    
+    # Handwashing indicators: 1=Fixed, 2=Mobile
+    df['hw_total'] = df['hv230a'].isin([1, 2]).astype(np.int8)
+    
+    region_df = data_loader.load_region("household", region, df)
+    
+    district_map = get_district_map(region)
+    
+    districts_data = calc.district_percentages(region_df, 'hw_total', 'shdistrict', district_map)
+    
+    province_val = calc.weighted_percentage(region_df, 'hw_total')
+    national_val = calc.weighted_percentage(df, 'hw_total')
+    
+    return format_indicator_response(
+        indicator_name="Handwashing Facilities",
+        unit="Percentage",
+        districts_data=districts_data,
+        province_value=province_val,
+        province_code=region,
+        national_value=national_val,
+        population_type="Households"
+    )
+
+
 @router.get("/handwashing", response_model=IndicatorResponse)
 async def get_handwashing_facilities(
     region: RegionCode = Query(default=RegionCode.EASTERN),
@@ -137,35 +181,10 @@ async def get_handwashing_facilities(
     - Total (any handwashing facility)
     """
     try:
-        df = data_loader.load_dataset("household")
-        df = df[df['hv015'] == 1].copy()
-        
-        # Handwashing indicators: 1=Fixed, 2=Mobile
-        df['hw_total'] = df['hv230a'].isin([1, 2]).astype(int)
-        
-        region_df = df[df['hv024'] == region.value].copy()
-        
-        province_key = get_province_key(region.value)
-        district_map = DISTRICT_MAPS.get(province_key, {})
-        
-        districts_data = {}
-        for dist_code, dist_name in district_map.items():
-            dist_df = region_df[region_df['shdistrict'] == dist_code]
-            if not dist_df.empty:
-                districts_data[dist_name] = calc.weighted_percentage(dist_df, 'hw_total')
-        
-        province_val = calc.weighted_percentage(region_df, 'hw_total')
-        national_val = calc.weighted_percentage(df, 'hw_total')
-        
-        return format_indicator_response(
-            indicator_name="Handwashing Facilities",
-            unit="Percentage",
-            districts_data=districts_data,
-            province_value=province_val,
-            province_code=region.value,
-            national_value=national_val,
-            population_type="Households"
-        )
-        
+        return await asyncio.to_thread(_compute_handwashing_facilities, data_loader, calc, region.value, data_loader.version)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
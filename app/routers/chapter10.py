@@ -5,6 +5,8 @@ Endpoints for decision-making, attitudes toward domestic violence, and women's c
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from typing import Optional
+from functools import lru_cache
+import asyncio
 import numpy as np
 import pandas as pd
 
@@ -12,8 +14,7 @@ from app.dependencies import get_data_loader, get_calculation_service
 from app.services.data_loader import DHSDataLoader
 from app.services.calculations import CalculationService
 from app.models.schemas import IndicatorResponse, RegionCode, MultiIndicatorResponse
-from app.config import DISTRICT_MAPS, PROVINCES
-from app.utils.helpers import format_indicator_response, get_province_key
+from app.utils.helpers import format_indicator_response, get_district_map
 
 router = APIRouter(
     prefix="/chapter10",
@@ -22,6 +23,72 @@ router = APIRouter(
 )
 
 
+@lru_cache(maxsize=256)
+def _compute_decision_making(
+    data_loader: DHSDataLoader,
+    calc: CalculationService,
+    region: int,
+    decision_type: str,
+    data_version: int
+) -> dict:
+    """Build the decision making response, cached per region/decision_type and data version."""
+    df = data_loader.load_dataset("women")
+    
+    # Currently married women 15-49
+    df = df[df['v502'] == 1]
+    
+    # Convert to participation flags
+    for col in ['v743a', 'v743b', 'v743d']:
+        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(9)
+        df[f'{col}_flag'] = df[col].isin([1, 2]).astype(np.int8)
+    
+    if decision_type == "all_three":
+        df['indicator'] = (
+            (df['v743a_flag'] == 1) & 
+            (df['v743b_flag'] == 1) & 
+            (df['v743d_flag'] == 1)
+        ).astype(np.int8)
+        label = "Participates in All Three Decisions"
+    elif decision_type == "none":
+        df['indicator'] = (
+            (df['v743a_flag'] == 0) & 
+            (df['v743b_flag'] == 0) & 
+            (df['v743d_flag'] == 0)
+        ).astype(np.int8)
+        label = "Participates in None of the Decisions"
+    elif decision_type == "own_healthcare":
+        df['indicator'] = df['v743a_flag']
+        label = "Participates in Own Healthcare Decisions"
+    elif decision_type == "household_purchases":
+        df['indicator'] = df['v743b_flag']
+        label = "Participates in Large Household Purchase Decisions"
+    elif decision_type == "visits":
+        df['indicator'] = df['v743d_flag']
+        label = "Participates in Decisions about Visits to Family"
+    else:
+        raise HTTPException(status_code=400, detail="Invalid decision type")
+    
+    region_df = data_loader.load_region("women", region, df)
+    
+    district_map = get_district_map(region)
+    dist_col = data_loader.get_district_column("women")
+    
+    districts_data = calc.district_percentages(region_df, 'indicator', dist_col, district_map, weight_col='v005')
+    
+    province_val = calc.weighted_percentage(region_df, 'indicator', weight_col='v005')
+    national_val = calc.weighted_percentage(df, 'indicator', weight_col='v005')
+    
+    return format_indicator_response(
+        indicator_name=label,
+        unit="Percentage",
+        districts_data=districts_data,
+        province_value=province_val,
+        province_code=region,
+        national_value=national_val,
+        population_type="Currently married women 15-49"
+    )
+
+
 @router.get("/decision-making", response_model=IndicatorResponse)
 async def get_decision_making(
     region: RegionCode = Query(default=RegionCode.EASTERN),
@@ -41,71 +108,83 @@ async def get_decision_making(
     Participation = 1 (self) or 2 (jointly)
     """
     try:
-        df = data_loader.load_dataset("women")
-        
-        # Currently married women 15-49
-        df = df[df['v502'] == 1].copy()
-        
-        # Convert to participation flags
-        for col in ['v743a', 'v743b', 'v743d']:
-            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(9)
-            df[f'{col}_flag'] = df[col].isin([1, 2]).astype(int)
-        
-        if decision_type == "all_three":
-            df['indicator'] = (
-                (df['v743a_flag'] == 1) & 
-                (df['v743b_flag'] == 1) & 
-                (df['v743d_flag'] == 1)
-            ).astype(int)
-            label = "Participates in All Three Decisions"
-        elif decision_type == "none":
-            df['indicator'] = (
-                (df['v743a_flag'] == 0) & 
-                (df['v743b_flag'] == 0) & 
-                (df['v743d_flag'] == 0)
-            ).astype(int)
-            label = "Participates in None of the Decisions"
-        elif decision_type == "own_healthcare":
-            df['indicator'] = df['v743a_flag']
-            label = "Participates in Own Healthcare Decisions"
-        elif decision_type == "household_purchases":
-            df['indicator'] = df['v743b_flag']
-            label = "Participates in Large Household Purchase Decisions"
-        elif decision_type == "visits":
-            df['indicator'] = df['v743d_flag']
-            label = "Participates in Decisions about Visits to Family"
-        else:
-            raise HTTPException(status_code=400, detail="Invalid decision type")
-        
-        region_df = df[df['v024'] == region.value].copy()
-        
-        province_key = get_province_key(region.value)
-        district_map = DISTRICT_MAPS.get(province_key, {})
-        dist_col = calc.get_district_column(region_df)
-        
-        districts_data = {}
-        for dist_code, dist_name in district_map.items():
-            dist_df = region_df[pd.to_numeric(region_df[dist_col], errors='coerce') == dist_code]
-            if not dist_df.empty:
-                districts_data[dist_name] = calc.weighted_percentage(dist_df, 'indicator', weight_col='v005')
-        
-        province_val = calc.weighted_percentage(region_df, 'indicator', weight_col='v005')
-        national_val = calc.weighted_percentage(df, 'indicator', weight_col='v005')
-        
-        return format_indicator_response(
-            indicator_name=label,
-            unit="Percentage",
-            districts_data=districts_data,
-            province_value=province_val,
-            province_code=region.value,
-            national_value=national_val,
-            population_type="Currently married women 15-49"
-        )
-        
+        return await asyncio.to_thread(_compute_decision_making, data_loader, calc, region.value, decision_type, data_loader.version)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@lru_cache(maxsize=256)
+def _compute_attitude_violence(
+    data_loader: DHSDataLoader,
+    calc: CalculationService,
+    region: int,
+    gender: str,
+    reason: str,
+    data_version: int
+) -> dict:
+    """Build the attitude violence response, cached per region/gender/reason and data version."""
+    dataset = "women" if gender == "female" else "men"
+    df = data_loader.load_dataset(dataset)
+    
+    prefix = 'v' if gender == "female" else 'mv'
+    weight_col = f'{prefix}005'
+    
+    reason_cols = {
+        'burns_food': f'{prefix}744a',
+        'argues': f'{prefix}744b',
+        'goes_out': f'{prefix}744c',
+        'neglects_children': f'{prefix}744d',
+        'refuses_sex': f'{prefix}744e'
+    }
+    
+    for col in reason_cols.values():
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+    
+    if reason == "any":
+        # Agrees with at least one reason
+        conditions = [df.get(col, 0) == 1 for col in reason_cols.values()]
+        df['indicator'] = np.any(conditions, axis=0).astype(np.int8)
+        label = "Agrees Wife Beating Justified (Any Reason)"
+    elif reason in reason_cols:
+        col = reason_cols[reason]
+        df['indicator'] = (df.get(col, 0) == 1).astype(np.int8)
+        reason_labels = {
+            'burns_food': 'Burns Food',
+            'argues': 'Argues',
+            'goes_out': 'Goes Out Without Telling',
+            'neglects_children': 'Neglects Children',
+            'refuses_sex': 'Refuses Sex'
+        }
+        label = f"Agrees Wife Beating Justified If: {reason_labels[reason]}"
+    else:
+        raise HTTPException(status_code=400, detail=f"Invalid reason. Choose from: any, {', '.join(reason_cols.keys())}")
+    
+    region_df = data_loader.load_region(dataset, region, df)
+    
+    district_map = get_district_map(region)
+    dist_col = data_loader.get_district_column(dataset)
+    
+    districts_data = calc.district_percentages(region_df, 'indicator', dist_col, district_map, weight_col=weight_col)
+    
+    province_val = calc.weighted_percentage(region_df, 'indicator', weight_col=weight_col)
+    national_val = calc.weighted_percentage(df, 'indicator', weight_col=weight_col)
+    
+    gender_label = "Women" if gender == "female" else "Men"
+    
+    return format_indicator_response(
+        indicator_name=label,
+        unit="Percentage",
+        districts_data=districts_data,
+        province_value=province_val,
+        province_code=region,
+        national_value=national_val,
+        population_type=f"{gender_label} age 15-49"
+    )
+
+
 @router.get("/attitude-violence", response_model=IndicatorResponse)
 async def get_attitude_violence(
     region: RegionCode = Query(default=RegionCode.EASTERN),
@@ -127,75 +206,62 @@ async def get_attitude_violence(
     Code 1 = Yes (justified)
     """
     try:
-        dataset = "women" if gender == "female" else "men"
-        df = data_loader.load_dataset(dataset)
-        
-        prefix = 'v' if gender == "female" else 'mv'
-        region_col = f'{prefix}024'
-        weight_col = f'{prefix}005'
-        
-        reason_cols = {
-            'burns_food': f'{prefix}744a',
-            'argues': f'{prefix}744b',
-            'goes_out': f'{prefix}744c',
-            'neglects_children': f'{prefix}744d',
-            'refuses_sex': f'{prefix}744e'
-        }
-        
-        for col in reason_cols.values():
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-        
-        if reason == "any":
-            # Agrees with at least one reason
-            conditions = [df.get(col, 0) == 1 for col in reason_cols.values()]
-            df['indicator'] = np.any(conditions, axis=0).astype(int)
-            label = "Agrees Wife Beating Justified (Any Reason)"
-        elif reason in reason_cols:
-            col = reason_cols[reason]
-            df['indicator'] = (df.get(col, 0) == 1).astype(int)
-            reason_labels = {
-                'burns_food': 'Burns Food',
-                'argues': 'Argues',
-                'goes_out': 'Goes Out Without Telling',
-                'neglects_children': 'Neglects Children',
-                'refuses_sex': 'Refuses Sex'
-            }
-            label = f"Agrees Wife Beating Justified If: {reason_labels[reason]}"
-        else:
-            raise HTTPException(status_code=400, detail=f"Invalid reason. Choose from: any, {', '.join(reason_cols.keys())}")
-        
-        region_df = df[df[region_col] == region.value].copy()
-        
-        province_key = get_province_key(region.value)
-        district_map = DISTRICT_MAPS.get(province_key, {})
-        dist_col = calc.get_district_column(region_df)
-        
-        districts_data = {}
-        for dist_code, dist_name in district_map.items():
-            dist_df = region_df[pd.to_numeric(region_df[dist_col], errors='coerce') == dist_code]
-            if not dist_df.empty:
-                districts_data[dist_name] = calc.weighted_percentage(dist_df, 'indicator', weight_col=weight_col)
-        
-        province_val = calc.weighted_percentage(region_df, 'indicator', weight_col=weight_col)
-        national_val = calc.weighted_percentage(df, 'indicator', weight_col=weight_col)
-        
-        gender_label = "Women" if gender == "female" else "Men"
-        
-        return format_indicator_response(
-            indicator_name=label,
-            unit="Percentage",
-            districts_data=districts_data,
-            province_value=province_val,
-            province_code=region.value,
-            national_value=national_val,
-            population_type=f"{gender_label} age 15-49"
-        )
-        
+        return await asyncio.to_thread(_compute_attitude_violence, data_loader, calc, region.value, gender, reason, data_loader.version)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@lru_cache(maxsize=256)
+def _compute_women_earnings_control(
+    data_loader: DHSDataLoader,
+    calc: CalculationService,
+    region: int,
+    control_level: str,
+    data_version: int
+) -> dict:
+    """Build the women earnings control response, cached per region/control_level and data version."""
+    df = data_loader.load_dataset("women")
+    
+    # Currently married employed women
+    df = df[(df['v502'] == 1) & (df['v714'] == 1)]
+    
+    df['v739'] = pd.to_numeric(df['v739'], errors='coerce').fillna(0)
+    
+    control_map = {
+        'self': (lambda x: x == 1, 'Mainly Self'),
+        'jointly': (lambda x: x == 2, 'Jointly with Husband'),
+        'husband': (lambda x: x == 3, 'Mainly Husband'),
+    }
+    
+    if control_level not in control_map:
+        raise HTTPException(status_code=400, detail=f"Invalid control level. Choose from: {list(control_map.keys())}")
+    
+    condition, label = control_map[control_level]
+    df['indicator'] = condition(df['v739']).astype(np.int8)
+    
+    region_df = data_loader.load_region("women", region, df)
+    
+    district_map = get_district_map(region)
+    dist_col = data_loader.get_district_column("women")
+    
+    districts_data = calc.district_percentages(region_df, 'indicator', dist_col, district_map, weight_col='v005')
+    
+    province_val = calc.weighted_percentage(region_df, 'indicator', weight_col='v005')
+    national_val = calc.weighted_percentage(df, 'indicator', weight_col='v005')
+    
+    return format_indicator_response(
+        indicator_name=f"Control Over Woman's Earnings: {label}",
+        unit="Percentage",
+        districts_data=districts_data,
+        province_value=province_val,
+        province_code=region,
+        national_value=national_val,
+        population_type="Currently married employed women 15-49"
+    )
+
+
 @router.get("/women-earnings-control", response_model=IndicatorResponse)
 async def get_women_earnings_control(
     region: RegionCode = Query(default=RegionCode.EASTERN),
@@ -213,54 +279,62 @@ async def get_women_earnings_control(
     - 4: Someone else
     """
     try:
-        df = data_loader.load_dataset("women")
-        
-        # Currently married employed women
-        df = df[(df['v502'] == 1) & (df['v714'] == 1)].copy()
-        
-        df['v739'] = pd.to_numeric(df['v739'], errors='coerce').fillna(0)
-        
-        control_map = {
-            'self': (lambda x: x == 1, 'Mainly Self'),
-            'jointly': (lambda x: x == 2, 'Jointly with Husband'),
-            'husband': (lambda x: x == 3, 'Mainly Husband'),
-        }
-        
-        if control_level not in control_map:
-            raise HTTPException(status_code=400, detail=f"Invalid control level. Choose from: {list(control_map.keys())}")
-        
-        condition, label = control_map[control_level]
-        df['indicator'] = condition(df['v739']).astype(int)
-        
-        region_df = df[df['v024'] == region.value].copy()
-        
-        province_key = get_province_key(region.value)
-        district_map = DISTRICT_MAPS.get(province_key, {})
-        dist_col = calc.get_district_column(region_df)
-        
-        districts_data = {}
-        for dist_code, dist_name in district_map.items():
-            dist_df = region_df[pd.to_numeric(region_df[dist_col], errors='coerce') == dist_code]
-            if not dist_df.empty:
-                districts_data[dist_name] = calc.weighted_percentage(dist_df, 'indicator', weight_col='v005')
-        
-        province_val = calc.weighted_percentage(region_df, 'indicator', weight_col='v005')
-        national_val = calc.weighted_percentage(df, 'indicator', weight_col='v005')
-        
-        return format_indicator_response(
-            indicator_name=f"Control Over Woman's Earnings: {label}",
-            unit="Percentage",
-            districts_data=districts_data,
-            province_value=province_val,
-            province_code=region.value,
-            national_value=national_val,
-            population_type="Currently married employed women 15-49"
-        )
-        
+        return await asyncio.to_thread(_compute_women_earnings_control, data_loader, calc, region.value, control_level, data_loader.version)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@lru_cache(maxsize=256)
+def _compute_earnings_comparison(
+    data_loader: DHSDataLoader,
+    calc: CalculationService,
+    region: int,
+    comparison: str,
+    data_version: int
+) -> dict:
+    """Build the earnings comparison response, cached per region/comparison and data version."""
+    df = data_loader.load_dataset("women")
+    
+    # Currently married employed women whose husband is also employed
+    df = df[(df['v502'] == 1) & (df['v714'] == 1)]
+    
+    df['v746'] = pd.to_numeric(df['v746'], errors='coerce').fillna(0)
+    
+    comparison_map = {
+        'more': (1, 'Earns More Than Husband'),
+        'less': (2, 'Earns Less Than Husband'),
+        'about_same': (3, 'Earns About the Same as Husband'),
+    }
+    
+    if comparison not in comparison_map:
+        raise HTTPException(status_code=400, detail=f"Invalid comparison. Choose from: {list(comparison_map.keys())}")
+    
+    code, label = comparison_map[comparison]
+    df['indicator'] = (df['v746'] == code).astype(np.int8)
+    
+    region_df = data_loader.load_region("women", region, df)
+    
+    district_map = get_district_map(region)
+    dist_col = data_loader.get_district_column("women")
+    
+    districts_data = calc.district_percentages(region_df, 'indicator', dist_col, district_map, weight_col='v005')
+    
+    province_val = calc.weighted_percentage(region_df, 'indicator', weight_col='v005')
+    national_val = calc.weighted_percentage(df, 'indicator', weight_col='v005')
+    
+    return format_indicator_response(
+        indicator_name=label,
+        unit="Percentage",
+        districts_data=districts_data,
+        province_value=province_val,
+        province_code=region,
+        national_value=national_val,
+        population_type="Currently married employed women 15-49"
+    )
+
+
 @router.get("/earnings-comparison", response_model=IndicatorResponse)
 async def get_earnings_comparison(
     region: RegionCode = Query(default=RegionCode.EASTERN),
@@ -279,54 +353,71 @@ async def get_earnings_comparison(
     - 5: Don't know
     """
     try:
-        df = data_loader.load_dataset("women")
-        
-        # Currently married employed women whose husband is also employed
-        df = df[(df['v502'] == 1) & (df['v714'] == 1)].copy()
-        
-        df['v746'] = pd.to_numeric(df['v746'], errors='coerce').fillna(0)
-        
-        comparison_map = {
-            'more': (1, 'Earns More Than Husband'),
-            'less': (2, 'Earns Less Than Husband'),
-            'about_same': (3, 'Earns About the Same as Husband'),
-        }
-        
-        if comparison not in comparison_map:
-            raise HTTPException(status_code=400, detail=f"Invalid comparison. Choose from: {list(comparison_map.keys())}")
-        
-        code, label = comparison_map[comparison]
-        df['indicator'] = (df['v746'] == code).astype(int)
-        
-        region_df = df[df['v024'] == region.value].copy()
-        
-        province_key = get_province_key(region.value)
-        district_map = DISTRICT_MAPS.get(province_key, {})
-        dist_col = calc.get_district_column(region_df)
-        
-        districts_data = {}
-        for dist_code, dist_name in district_map.items():
-            dist_df = region_df[pd.to_numeric(region_df[dist_col], errors='coerce') == dist_code]
-            if not dist_df.empty:
-                districts_data[dist_name] = calc.weighted_percentage(dist_df, 'indicator', weight_col='v005')
-        
-        province_val = calc.weighted_percentage(region_df, 'indicator', weight_col='v005')
-        national_val = calc.weighted_percentage(df, 'indicator', weight_col='v005')
-        
-        return format_indicator_response(
-            indicator_name=label,
-            unit="Percentage",
-            districts_data=districts_data,
-            province_value=province_val,
-            province_code=region.value,
-            national_value=national_val,
-            population_type="Currently married employed women 15-49"
-        )
-        
+        return await asyncio.to_thread(_compute_earnings_comparison, data_loader, calc, region.value, comparison, data_loader.version)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@lru_cache(maxsize=256)
+def _compute_cash_earnings(
+    data_loader: DHSDataLoader,
+    calc: CalculationService,
+    region: int,
+    gender: str,
+    earnings_type: str,
+    data_version: int
+) -> dict:
+    """Build the cash earnings response, cached per region/gender/earnings_type and data version."""
+    dataset = "women" if gender == "female" else "men"
+    df = data_loader.load_dataset(dataset)
+    
+    prefix = 'v' if gender == "female" else 'mv'
+    weight_col = f'{prefix}005'
+    earnings_col = f'{prefix}741'
+    
+    # Filter for employed
+    employed_col = f'{prefix}714'
+    df = df[df.get(employed_col, 0) == 1]
+    
+    df[earnings_col] = pd.to_numeric(df.get(earnings_col, 0), errors='coerce').fillna(0)
+    
+    type_map = {
+        'cash_only': (1, 'Cash Only'),
+        'cash_and_kind': (2, 'Cash and In-Kind'),
+        'not_paid': (0, 'Not Paid'),
+    }
+    
+    if earnings_type not in type_map:
+        raise HTTPException(status_code=400, detail=f"Invalid earnings type. Choose from: {list(type_map.keys())}")
+    
+    code, label = type_map[earnings_type]
+    df['indicator'] = (df[earnings_col] == code).astype(np.int8)
+    
+    region_df = data_loader.load_region(dataset, region, df)
+    
+    district_map = get_district_map(region)
+    dist_col = data_loader.get_district_column(dataset)
+    
+    districts_data = calc.district_percentages(region_df, 'indicator', dist_col, district_map, weight_col=weight_col)
+    
+    province_val = calc.weighted_percentage(region_df, 'indicator', weight_col=weight_col)
+    national_val = calc.weighted_percentage(df, 'indicator', weight_col=weight_col)
+    
+    gender_label = "Women" if gender == "female" else "Men"
+    
+    return format_indicator_response(
+        indicator_name=f"Type of Earnings: {label} ({gender_label})",
+        unit="Percentage",
+        districts_data=districts_data,
+        province_value=province_val,
+        province_code=region,
+        national_value=national_val,
+        population_type=f"Employed {gender_label} 15-49"
+    )
+
+
 @router.get("/cash-earnings", response_model=IndicatorResponse)
 async def get_cash_earnings(
     region: RegionCode = Query(default=RegionCode.EASTERN),
@@ -345,58 +436,10 @@ async def get_cash_earnings(
     - 0: Not paid
     """
     try:
-        dataset = "women" if gender == "female" else "men"
-        df = data_loader.load_dataset(dataset)
-        
-        prefix = 'v' if gender == "female" else 'mv'
-        region_col = f'{prefix}024'
-        weight_col = f'{prefix}005'
-        earnings_col = f'{prefix}741'
-        
-        # Filter for employed
-        employed_col = f'{prefix}714'
-        df = df[df.get(employed_col, 0) == 1].copy()
-        
-        df[earnings_col] = pd.to_numeric(df.get(earnings_col, 0), errors='coerce').fillna(0)
-        
-        type_map = {
-            'cash_only': (1, 'Cash Only'),
-            'cash_and_kind': (2, 'Cash and In-Kind'),
-            'not_paid': (0, 'Not Paid'),
-        }
-        
-        if earnings_type not in type_map:
-            raise HTTPException(status_code=400, detail=f"Invalid earnings type. Choose from: {list(type_map.keys())}")
-        
-        code, label = type_map[earnings_type]
-        df['indicator'] = (df[earnings_col] == code).astype(int)
-        
-        region_df = df[df[region_col] == region.value].copy()
-        
-        province_key = get_province_key(region.value)
-        district_map = DISTRICT_MAPS.get(province_key, {})
-        dist_col = calc.get_district_column(region_df)
-        
-        districts_data = {}
-        for dist_code, dist_name in district_map.items():
-            dist_df = region_df[pd.to_numeric(region_df[dist_col], errors='coerce') == dist_code]
-            if not dist_df.empty:
-                districts_data[dist_name] = calc.weighted_percentage(dist_df, 'indicator', weight_col=weight_col)
-        
-        province_val = calc.weighted_percentage(region_df, 'indicator', weight_col=weight_col)
-        national_val = calc.weighted_percentage(df, 'indicator', weight_col=weight_col)
-        
-        gender_label = "Women" if gender == "female" else "Men"
-        
-        return format_indicator_response(
-            indicator_name=f"Type of Earnings: {label} ({gender_label})",
-            unit="Percentage",
-            districts_data=districts_data,
-            province_value=province_val,
-            province_code=region.value,
-            national_value=national_val,
-            population_type=f"Employed {gender_label} 15-49"
-        )
-        
+        return await asyncio.to_thread(_compute_cash_earnings, data_loader, calc, region.value, gender, earnings_type, data_loader.version)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
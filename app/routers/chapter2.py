@@ -5,6 +5,8 @@ Endpoints for population demographic indicators.
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from typing import Optional
+from functools import lru_cache
+import asyncio
 import numpy as np
 import pandas as pd
 
@@ -12,8 +14,7 @@ from app.dependencies import get_data_loader, get_calculation_service
 from app.services.data_loader import DHSDataLoader
 from app.services.calculations import CalculationService
 from app.models.schemas import IndicatorResponse, RegionCode
-from app.config import DISTRICT_MAPS, PROVINCES
-from app.utils.helpers import format_indicator_response, get_province_key
+from app.utils.helpers import format_indicator_response, get_district_map
 
 router = APIRouter(
     prefix="/chapter2",
@@ -22,6 +23,44 @@ router = APIRouter(
 )
 
 
+@lru_cache(maxsize=256)
+def _compute_birth_registration(
+    data_loader: DHSDataLoader,
+    calc: CalculationService,
+    region: int,
+    data_version: int
+) -> dict:
+    """Build the birth registration response, cached per region and data version."""
+    df = data_loader.load_dataset("person")
+    
+    # Filter: De jure population (hv102=1), children under 5 (hv105 < 5)
+    df = df[calc.filter_mask(df, age_max=4, resident_only=True, index=data_loader.get_filter_index("person"))]
+    
+    # hv140: Birth registration (1=has certificate, 2=registered)
+    df['is_registered'] = df['hv140'].isin([1, 2]).astype(np.int8)
+    
+    # Filter by region
+    region_df = data_loader.load_region("person", region, df)
+    
+    district_map = get_district_map(region)
+    dist_col = data_loader.get_district_column("person")
+    
+    districts_data = calc.district_percentages(region_df, 'is_registered', dist_col, district_map)
+    
+    province_val = calc.weighted_percentage(region_df, 'is_registered')
+    national_val = calc.weighted_percentage(df, 'is_registered')
+    
+    return format_indicator_response(
+        indicator_name="Birth Registration (Children Under 5)",
+        unit="Percentage",
+        districts_data=districts_data,
+        province_value=province_val,
+        province_code=region,
+        national_value=national_val,
+        population_type="De jure children under 5 years"
+    )
+
+
 @router.get("/birth-registration", response_model=IndicatorResponse)
 async def get_birth_registration(
     region: RegionCode = Query(default=RegionCode.EASTERN, description="Province/Region code"),
@@ -35,44 +74,52 @@ async def get_birth_registration(
     who have a birth certificate or whose birth has been registered.
     """
     try:
-        df = data_loader.load_dataset("person")
-        
-        # Filter: De jure population (hv102=1), children under 5 (hv105 < 5)
-        df = df[(df['hv102'] == 1) & (df['hv105'] < 5)].copy()
-        
-        # hv140: Birth registration (1=has certificate, 2=registered)
-        df['is_registered'] = df['hv140'].isin([1, 2]).astype(int)
-        
-        # Filter by region
-        region_df = df[df['hv024'] == region.value].copy()
-        
-        province_key = get_province_key(region.value)
-        district_map = DISTRICT_MAPS.get(province_key, {})
-        dist_col = calc.get_district_column(region_df)
-        
-        districts_data = {}
-        for dist_code, dist_name in district_map.items():
-            dist_df = region_df[region_df[dist_col] == dist_code]
-            if not dist_df.empty:
-                districts_data[dist_name] = calc.weighted_percentage(dist_df, 'is_registered')
-        
-        province_val = calc.weighted_percentage(region_df, 'is_registered')
-        national_val = calc.weighted_percentage(df, 'is_registered')
-        
-        return format_indicator_response(
-            indicator_name="Birth Registration (Children Under 5)",
-            unit="Percentage",
-            districts_data=districts_data,
-            province_value=province_val,
-            province_code=region.value,
-            national_value=national_val,
-            population_type="De jure children under 5 years"
-        )
-        
+        return await asyncio.to_thread(_compute_birth_registration, data_loader, calc, region.value, data_loader.version)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@lru_cache(maxsize=256)
+def _compute_orphanhood(
+    data_loader: DHSDataLoader,
+    calc: CalculationService,
+    region: int,
+    data_version: int
+) -> dict:
+    """Build the orphanhood response, cached per region and data version."""
+    df = data_loader.load_dataset("person")
+    
+    # Filter: De jure (hv102=1), under 18 (hv105 < 18)
+    df = df[calc.filter_mask(df, age_max=17, resident_only=True, index=data_loader.get_filter_index("person"))]
+    
+    # hv111: Mother alive (0=no, 1=yes), hv113: Father alive
+    df['mother_dead'] = (df['hv111'] == 0)
+    df['father_dead'] = (df['hv113'] == 0)
+    df['is_orphan'] = (df['mother_dead'] | df['father_dead']).astype(np.int8)
+    
+    region_df = data_loader.load_region("person", region, df)
+    
+    district_map = get_district_map(region)
+    dist_col = data_loader.get_district_column("person")
+    
+    districts_data = calc.district_percentages(region_df, 'is_orphan', dist_col, district_map)
+    
+    province_val = calc.weighted_percentage(region_df, 'is_orphan')
+    national_val = calc.weighted_percentage(df, 'is_orphan')
+    
+    return format_indicator_response(
+        indicator_name="Orphanhood (One or Both Parents Dead)",
+        unit="Percentage",
+        districts_data=districts_data,
+        province_value=province_val,
+        province_code=region,
+        national_value=national_val,
+        population_type="De jure children under 18 years"
+    )
+
+
 @router.get("/orphanhood", response_model=IndicatorResponse)
 async def get_orphanhood(
     region: RegionCode = Query(default=RegionCode.EASTERN),
@@ -85,45 +132,70 @@ async def get_orphanhood(
     Orphan is defined as having one or both parents dead (hv111=0 or hv113=0).
     """
     try:
-        df = data_loader.load_dataset("person")
-        
-        # Filter: De jure (hv102=1), under 18 (hv105 < 18)
-        df = df[(df['hv102'] == 1) & (df['hv105'] < 18)].copy()
-        
-        # hv111: Mother alive (0=no, 1=yes), hv113: Father alive
-        df['mother_dead'] = (df['hv111'] == 0)
-        df['father_dead'] = (df['hv113'] == 0)
-        df['is_orphan'] = (df['mother_dead'] | df['father_dead']).astype(int)
-        
-        region_df = df[df['hv024'] == region.value].copy()
-        
-        province_key = get_province_key(region.value)
-        district_map = DISTRICT_MAPS.get(province_key, {})
-        dist_col = calc.get_district_column(region_df)
-        
-        districts_data = {}
-        for dist_code, dist_name in district_map.items():
-            dist_df = region_df[region_df[dist_col] == dist_code]
-            if not dist_df.empty:
-                districts_data[dist_name] = calc.weighted_percentage(dist_df, 'is_orphan')
-        
-        province_val = calc.weighted_percentage(region_df, 'is_orphan')
-        national_val = calc.weighted_percentage(df, 'is_orphan')
-        
-        return format_indicator_response(
-            indicator_name="Orphanhood (One or Both Parents Dead)",
-            unit="Percentage",
-            districts_data=districts_data,
-            province_value=province_val,
-            province_code=region.value,
-            national_value=national_val,
-            population_type="De jure children under 18 years"
-        )
-        
+        return await asyncio.to_thread(_compute_orphanhood, data_loader, calc, region.value, data_loader.version)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# hv106 education level code and label per indicator option
+EDUCATION_MAP = {
+    'no_education': (0, 'No Education'),
+    'primary': (1, 'Primary Education'),
+    'secondary': (2, 'Secondary Education'),
+    'higher': (3, 'Higher Education')
+}
+
+
+@lru_cache(maxsize=256)
+def _compute_education_attainment(
+    data_loader: DHSDataLoader,
+    calc: CalculationService,
+    region: int,
+    indicator: str,
+    gender: str,
+    data_version: int
+) -> dict:
+    """Build the education response, cached per region/indicator/gender and data version."""
+    df = data_loader.load_dataset("person")
+    
+    # Filter: De jure population aged 6+
+    df = df[calc.filter_mask(df, age_min=6, resident_only=True, index=data_loader.get_filter_index("person"))]
+    
+    # Filter by gender if specified
+    if gender == "male":
+        df = df[df['hv104'] == 1]
+    elif gender == "female":
+        df = df[df['hv104'] == 2]
+    
+    # hv106: Highest education level (0=None, 1=Primary, 2=Secondary, 3=Higher)
+    edu_code, edu_name = EDUCATION_MAP[indicator]
+    df['edu_indicator'] = (df['hv106'] == edu_code).astype(np.int8)
+    
+    region_df = data_loader.load_region("person", region, df)
+    
+    district_map = get_district_map(region)
+    dist_col = data_loader.get_district_column("person")
+    
+    districts_data = calc.district_percentages(region_df, 'edu_indicator', dist_col, district_map)
+    
+    province_val = calc.weighted_percentage(region_df, 'edu_indicator')
+    national_val = calc.weighted_percentage(df, 'edu_indicator')
+    
+    gender_label = {"all": "", "male": "Male ", "female": "Female "}.get(gender, "")
+    
+    return format_indicator_response(
+        indicator_name=f"{gender_label}{edu_name}",
+        unit="Percentage",
+        districts_data=districts_data,
+        province_value=province_val,
+        province_code=region,
+        national_value=national_val,
+        population_type=f"De jure population aged 6+ ({gender})"
+    )
+
+
 @router.get("/education", response_model=IndicatorResponse)
 async def get_education_attainment(
     region: RegionCode = Query(default=RegionCode.EASTERN),
@@ -141,63 +213,69 @@ async def get_education_attainment(
     - **secondary**: Secondary education completed
     - **higher**: Higher education completed
     """
-    education_map = {
-        'no_education': (0, 'No Education'),
-        'primary': (1, 'Primary Education'),
-        'secondary': (2, 'Secondary Education'),
-        'higher': (3, 'Higher Education')
-    }
-    
-    if indicator not in education_map:
-        raise HTTPException(status_code=400, detail=f"Invalid indicator. Choose from: {list(education_map.keys())}")
+    if indicator not in EDUCATION_MAP:
+        raise HTTPException(status_code=400, detail=f"Invalid indicator. Choose from: {list(EDUCATION_MAP.keys())}")
     
     try:
-        df = data_loader.load_dataset("person")
-        
-        # Filter: De jure population aged 6+
-        df = df[(df['hv102'] == 1) & (df['hv105'] >= 6)].copy()
-        
-        # Filter by gender if specified
-        if gender == "male":
-            df = df[df['hv104'] == 1]
-        elif gender == "female":
-            df = df[df['hv104'] == 2]
-        
-        # hv106: Highest education level (0=None, 1=Primary, 2=Secondary, 3=Higher)
-        edu_code, edu_name = education_map[indicator]
-        df['edu_indicator'] = (df['hv106'] == edu_code).astype(int)
-        
-        region_df = df[df['hv024'] == region.value].copy()
-        
-        province_key = get_province_key(region.value)
-        district_map = DISTRICT_MAPS.get(province_key, {})
-        dist_col = calc.get_district_column(region_df)
-        
-        districts_data = {}
-        for dist_code, dist_name in district_map.items():
-            dist_df = region_df[region_df[dist_col] == dist_code]
-            if not dist_df.empty:
-                districts_data[dist_name] = calc.weighted_percentage(dist_df, 'edu_indicator')
-        
-        province_val = calc.weighted_percentage(region_df, 'edu_indicator')
-        national_val = calc.weighted_percentage(df, 'edu_indicator')
-        
-        gender_label = {"all": "", "male": "Male ", "female": "Female "}.get(gender, "")
-        
-        return format_indicator_response(
-            indicator_name=f"{gender_label}{edu_name}",
-            unit="Percentage",
-            districts_data=districts_data,
-            province_value=province_val,
-            province_code=region.value,
-            national_value=national_val,
-            population_type=f"De jure population aged 6+ ({gender})"
-        )
-        
+        return await asyncio.to_thread(_compute_education_attainment, data_loader, calc, region.value, indicator, gender, data_loader.version)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@lru_cache(maxsize=256)
+def _compute_media_exposure(
+    data_loader: DHSDataLoader,
+    calc: CalculationService,
+    region: int,
+    media_type: str,
+    data_version: int
+) -> dict:
+    """Build the media exposure response, cached per region/media_type and data version."""
+    df = data_loader.load_dataset("women")
+    
+    # Create media exposure indicators
+    # v157: Reads newspaper, v158: Listens to radio, v159: Watches TV
+    # Values: 0=not at all, 1=less than once a week, 2=at least once a week
+    df['reads_newspaper'] = (df['v157'] >= 1).astype(np.int8)
+    df['listens_radio'] = (df['v158'] >= 1).astype(np.int8)
+    df['watches_tv'] = (df['v159'] >= 1).astype(np.int8)
+    df['any_media'] = ((df['reads_newspaper'] == 1) | (df['listens_radio'] == 1) | (df['watches_tv'] == 1)).astype(np.int8)
+    
+    media_map = {
+        'newspaper': ('reads_newspaper', 'Reads Newspaper'),
+        'radio': ('listens_radio', 'Listens to Radio'),
+        'tv': ('watches_tv', 'Watches Television'),
+        'any': ('any_media', 'Any Media Exposure')
+    }
+    
+    if media_type not in media_map:
+        raise HTTPException(status_code=400, detail=f"Invalid media type. Choose from: {list(media_map.keys())}")
+    
+    col_name, indicator_name = media_map[media_type]
+    
+    region_df = data_loader.load_region("women", region, df)
+    
+    district_map = get_district_map(region)
+    dist_col = data_loader.get_district_column("women")
+    
+    districts_data = calc.district_percentages(region_df, col_name, dist_col, district_map, weight_col='v005')
+    
+    province_val = calc.weighted_percentage(region_df, col_name, weight_col='v005')
+    national_val = calc.weighted_percentage(df, col_name, weight_col='v005')
+    
+    return format_indicator_response(
+        indicator_name=indicator_name,
+        unit="Percentage",
+        districts_data=districts_data,
+        province_value=province_val,
+        province_code=region,
+        national_value=national_val,
+        population_type="Women age 15-49"
+    )
+
+
 @router.get("/media-exposure", response_model=IndicatorResponse)
 async def get_media_exposure(
     region: RegionCode = Query(default=RegionCode.EASTERN),
@@ -211,57 +289,47 @@ async def get_media_exposure(
     Based on women's survey data (v157, v158, v159).
     """
     try:
-        df = data_loader.load_dataset("women")
-        
-        # Create media exposure indicators
-        # v157: Reads newspaper, v158: Listens to radio, v159: Watches TV
-        # Values: 0=not at all, 1=less than once a week, 2=at least once a week
-        df['reads_newspaper'] = (df['v157'] >= 1).astype(int)
-        df['listens_radio'] = (df['v158'] >= 1).astype(int)
-        df['watches_tv'] = (df['v159'] >= 1).astype(int)
-        df['any_media'] = ((df['reads_newspaper'] == 1) | (df['listens_radio'] == 1) | (df['watches_tv'] == 1)).astype(int)
-        
-        media_map = {
-            'newspaper': ('reads_newspaper', 'Reads Newspaper'),
-            'radio': ('listens_radio', 'Listens to Radio'),
-            'tv': ('watches_tv', 'Watches Television'),
-            'any': ('any_media', 'Any Media Exposure')
-        }
-        
-        if media_type not in media_map:
-            raise HTTPException(status_code=400, detail=f"Invalid media type. Choose from: {list(media_map.keys())}")
-        
-        col_name, indicator_name = media_map[media_type]
-        
-        region_df = df[df['v024'] == region.value].copy()
-        
-        province_key = get_province_key(region.value)
-        district_map = DISTRICT_MAPS.get(province_key, {})
-        dist_col = calc.get_district_column(region_df)
-        
-        districts_data = {}
-        for dist_code, dist_name in district_map.items():
-            dist_df = region_df[region_df[dist_col] == dist_code]
-            if not dist_df.empty:
-                districts_data[dist_name] = calc.weighted_percentage(dist_df, col_name, weight_col='v005')
-        
-        province_val = calc.weighted_percentage(region_df, col_name, weight_col='v005')
-        national_val = calc.weighted_percentage(df, col_name, weight_col='v005')
-        
-        return format_indicator_response(
-            indicator_name=indicator_name,
-            unit="Percentage",
-            districts_data=districts_data,
-            province_value=province_val,
-            province_code=region.value,
-            national_value=national_val,
-            population_type="Women age 15-49"
-        )
-        
+        return await asyncio.to_thread(_compute_media_exposure, data_loader, calc, region.value, media_type, data_loader.version)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@lru_cache(maxsize=256)
+def _compute_health_insurance(
+    data_loader: DHSDataLoader,
+    calc: CalculationService,
+    region: int,
+    data_version: int
+) -> dict:
+    """Build the insurance response, cached per region and data version."""
+    df = data_loader.load_dataset("women")
+    
+    # v481: Has health insurance (1=yes)
+    df['has_insurance'] = (df['v481'] == 1).astype(np.int8)
+    
+    region_df = data_loader.load_region("women", region, df)
+    
+    district_map = get_district_map(region)
+    dist_col = data_loader.get_district_column("women")
+    
+    districts_data = calc.district_percentages(region_df, 'has_insurance', dist_col, district_map, weight_col='v005')
+    
+    province_val = calc.weighted_percentage(region_df, 'has_insurance', weight_col='v005')
+    national_val = calc.weighted_percentage(df, 'has_insurance', weight_col='v005')
+    
+    return format_indicator_response(
+        indicator_name="Health Insurance Coverage",
+        unit="Percentage",
+        districts_data=districts_data,
+        province_value=province_val,
+        province_code=region,
+        national_value=national_val,
+        population_type="Women age 15-49"
+    )
+
+
 @router.get("/insurance", response_model=IndicatorResponse)
 async def get_health_insurance(
     region: RegionCode = Query(default=RegionCode.EASTERN),
@@ -272,35 +340,10 @@ async def get_health_insurance(
     Get percentage of women covered by health insurance.
     """
     try:
-        df = data_loader.load_dataset("women")
-        
-        # v481: Has health insurance (1=yes)
-        df['has_insurance'] = (df['v481'] == 1).astype(int)
-        
-        region_df = df[df['v024'] == region.value].copy()
-        
-        province_key = get_province_key(region.value)
-        district_map = DISTRICT_MAPS.get(province_key, {})
-        dist_col = calc.get_district_column(region_df)
-        
-        districts_data = {}
-        for dist_code, dist_name in district_map.items():
-            dist_df = region_df[region_df[dist_col] == dist_code]
-            if not dist_df.empty:
-                districts_data[dist_name] = calc.weighted_percentage(dist_df, 'has_insurance', weight_col='v005')
-        
-        province_val = calc.weighted_percentage(region_df, 'has_insurance', weight_col='v005')
-        national_val = calc.weighted_percentage(df, 'has_insurance', weight_col='v005')
-        
-        return format_indicator_response(
-            indicator_name="Health Insurance Coverage",
-            unit="Percentage",
-            districts_data=districts_data,
-            province_value=province_val,
-            province_code=region.value,
-            national_value=national_val,
-            population_type="Women age 15-49"
-        )
-        
+        return await asyncio.to_thread(_compute_health_insurance, data_loader, calc, region.value, data_loader.version)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
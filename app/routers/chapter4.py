@@ -5,6 +5,8 @@ Endpoints for contraceptive use, demand for family planning, and exposure to FP
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from typing import Optional
+from functools import lru_cache
+import asyncio
 import numpy as np
 import pandas as pd
 
@@ -12,8 +14,8 @@ from app.dependencies import get_data_loader, get_calculation_service
 from app.services.data_loader import DHSDataLoader
 from app.services.calculations import CalculationService
 from app.models.schemas import IndicatorResponse, RegionCode, MultiIndicatorResponse
-from app.config import DISTRICT_MAPS, PROVINCES
-from app.utils.helpers import format_indicator_response, get_province_key
+from app.config import PROVINCES
+from app.utils.helpers import format_indicator_response, get_district_map
 
 router = APIRouter(
     prefix="/chapter4",
@@ -22,6 +24,64 @@ router = APIRouter(
 )
 
 
+@lru_cache(maxsize=256)
+def _compute_contraception_use(
+    data_loader: DHSDataLoader,
+    calc: CalculationService,
+    region: int,
+    method: str,
+    marital_status: str,
+    data_version: int
+) -> dict:
+    """Build the contraception use response, cached per region/method/marital_status and data version."""
+    df = data_loader.load_dataset("women")
+    
+    # Women 15-49, currently married (v502 = 1) if specified
+    mask = calc.filter_mask(df, age_min=15, age_max=49, index=data_loader.get_filter_index("women"))
+    if marital_status == "married":
+        mask &= df['v502'].to_numpy() == 1
+    df = df[mask]
+    
+    # Create contraception indicators
+    df['v313'] = pd.to_numeric(df['v313'], errors='coerce').fillna(0)
+    df['any_method'] = (df['v313'] > 0).astype(np.int8)
+    df['modern_method'] = (df['v313'] == 3).astype(np.int8)
+    df['traditional_method'] = ((df['v313'] == 1) | (df['v313'] == 2)).astype(np.int8)
+    
+    method_map = {
+        'any': ('any_method', 'Any Contraceptive Method'),
+        'modern': ('modern_method', 'Modern Contraceptive Method'),
+        'traditional': ('traditional_method', 'Traditional Contraceptive Method')
+    }
+    
+    if method not in method_map:
+        raise HTTPException(status_code=400, detail=f"Invalid method. Choose from: {list(method_map.keys())}")
+    
+    col_name, indicator_name = method_map[method]
+    
+    region_df = data_loader.load_region("women", region, df)
+    
+    district_map = get_district_map(region)
+    dist_col = data_loader.get_district_column("women")
+    
+    districts_data = calc.district_percentages(region_df, col_name, dist_col, district_map, weight_col='v005')
+    
+    province_val = calc.weighted_percentage(region_df, col_name, weight_col='v005')
+    national_val = calc.weighted_percentage(df, col_name, weight_col='v005')
+    
+    pop_type = "Currently married women 15-49" if marital_status == "married" else "All women 15-49"
+    
+    return format_indicator_response(
+        indicator_name=indicator_name,
+        unit="Percentage",
+        districts_data=districts_data,
+        province_value=province_val,
+        province_code=region,
+        national_value=national_val,
+        population_type=pop_type
+    )
+
+
 @router.get("/contraception-use", response_model=IndicatorResponse)
 async def get_contraception_use(
     region: RegionCode = Query(default=RegionCode.EASTERN),
@@ -45,63 +105,61 @@ async def get_contraception_use(
     - 3: Modern method
     """
     try:
-        df = data_loader.load_dataset("women")
-        
-        # Filter by marital status if specified
-        if marital_status == "married":
-            # v502: Currently married = 1
-            df = df[(df['v502'] == 1) & (df['v012'] >= 15) & (df['v012'] <= 49)].copy()
-        else:
-            df = df[(df['v012'] >= 15) & (df['v012'] <= 49)].copy()
-        
-        # Create contraception indicators
-        df['v313'] = pd.to_numeric(df['v313'], errors='coerce').fillna(0)
-        df['any_method'] = (df['v313'] > 0).astype(int)
-        df['modern_method'] = (df['v313'] == 3).astype(int)
-        df['traditional_method'] = ((df['v313'] == 1) | (df['v313'] == 2)).astype(int)
-        
-        method_map = {
-            'any': ('any_method', 'Any Contraceptive Method'),
-            'modern': ('modern_method', 'Modern Contraceptive Method'),
-            'traditional': ('traditional_method', 'Traditional Contraceptive Method')
-        }
-        
-        if method not in method_map:
-            raise HTTPException(status_code=400, detail=f"Invalid method. Choose from: {list(method_map.keys())}")
-        
-        col_name, indicator_name = method_map[method]
-        
-        region_df = df[df['v024'] == region.value].copy()
-        
-        province_key = get_province_key(region.value)
-        district_map = DISTRICT_MAPS.get(province_key, {})
-        dist_col = calc.get_district_column(region_df)
-        
-        districts_data = {}
-        for dist_code, dist_name in district_map.items():
-            dist_df = region_df[pd.to_numeric(region_df[dist_col], errors='coerce') == dist_code]
-            if not dist_df.empty:
-                districts_data[dist_name] = calc.weighted_percentage(dist_df, col_name, weight_col='v005')
-        
-        province_val = calc.weighted_percentage(region_df, col_name, weight_col='v005')
-        national_val = calc.weighted_percentage(df, col_name, weight_col='v005')
-        
-        pop_type = "Currently married women 15-49" if marital_status == "married" else "All women 15-49"
-        
-        return format_indicator_response(
-            indicator_name=indicator_name,
-            unit="Percentage",
-            districts_data=districts_data,
-            province_value=province_val,
-            province_code=region.value,
-            national_value=national_val,
-            population_type=pop_type
-        )
-        
+        return await asyncio.to_thread(_compute_contraception_use, data_loader, calc, region.value, method, marital_status, data_loader.version)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@lru_cache(maxsize=256)
+def _compute_contraception_methods_breakdown(
+    data_loader: DHSDataLoader,
+    calc: CalculationService,
+    region: int,
+    data_version: int
+) -> MultiIndicatorResponse:
+    """Build the contraception methods response, cached per region and data version."""
+    region_df = data_loader.load_region("women", region)
+    
+    # Filter: Currently married women 15-49
+    region_df = region_df[(region_df['v502'] == 1) & (region_df['v012'] >= 15) & (region_df['v012'] <= 49)]
+    
+    # v312: Current contraceptive method
+    # Create indicators for specific methods
+    methods = {
+        'female_sterilization': 6,
+        'male_sterilization': 7,
+        'pill': 1,
+        'iud': 2,
+        'injections': 3,
+        'implants': 11,
+        'male_condom': 5,
+        'female_condom': 14,
+        'withdrawal': 8,
+        'rhythm': 9,
+        'other_modern': 13,
+        'other_traditional': 10
+    }
+    
+    region_df['v312'] = pd.to_numeric(region_df['v312'], errors='coerce').fillna(0)
+    
+    for method_name, method_code in methods.items():
+        region_df[f'uses_{method_name}'] = (region_df['v312'] == method_code).astype(np.int8)
+    
+    # All methods share the same rows, so compute them in one pass
+    pcts = calc.weighted_percentages(region_df, [f'uses_{m}' for m in methods], weight_col='v005')
+    indicators = {method_name: pcts[f'uses_{method_name}'] for method_name in methods}
+    
+    province_name = PROVINCES.get(region, "Unknown Province")
+    
+    return MultiIndicatorResponse(
+        indicators=indicators,
+        location=province_name,
+        location_code=region
+    )
+
+
 @router.get("/contraception-methods", response_model=MultiIndicatorResponse)
 async def get_contraception_methods_breakdown(
     region: RegionCode = Query(default=RegionCode.EASTERN),
@@ -113,50 +171,60 @@ async def get_contraception_methods_breakdown(
     Returns percentages for each specific method.
     """
     try:
-        df = data_loader.load_dataset("women")
-        
-        # Filter: Currently married women 15-49
-        df = df[(df['v502'] == 1) & (df['v012'] >= 15) & (df['v012'] <= 49)].copy()
-        
-        region_df = df[df['v024'] == region.value].copy()
-        
-        # v312: Current contraceptive method
-        # Create indicators for specific methods
-        methods = {
-            'female_sterilization': 6,
-            'male_sterilization': 7,
-            'pill': 1,
-            'iud': 2,
-            'injections': 3,
-            'implants': 11,
-            'male_condom': 5,
-            'female_condom': 14,
-            'withdrawal': 8,
-            'rhythm': 9,
-            'other_modern': 13,
-            'other_traditional': 10
-        }
-        
-        region_df['v312'] = pd.to_numeric(region_df['v312'], errors='coerce').fillna(0)
-        
-        indicators = {}
-        for method_name, method_code in methods.items():
-            region_df[f'uses_{method_name}'] = (region_df['v312'] == method_code).astype(int)
-            pct = calc.weighted_percentage(region_df, f'uses_{method_name}', weight_col='v005')
-            indicators[method_name] = pct
-        
-        province_name = PROVINCES.get(region.value, "Unknown Province")
-        
-        return MultiIndicatorResponse(
-            indicators=indicators,
-            location=province_name,
-            location_code=region.value
-        )
-        
+        return await asyncio.to_thread(_compute_contraception_methods_breakdown, data_loader, calc, region.value, data_loader.version)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@lru_cache(maxsize=256)
+def _compute_unmet_need(
+    data_loader: DHSDataLoader,
+    calc: CalculationService,
+    region: int,
+    need_type: str,
+    data_version: int
+) -> dict:
+    """Build the unmet need response, cached per region/need_type and data version."""
+    df = data_loader.load_dataset("women")
+    
+    # Currently married women 15-49
+    mask = calc.filter_mask(df, age_min=15, age_max=49, index=data_loader.get_filter_index("women"))
+    df = df[mask & (df['v502'].to_numpy() == 1)]
+    df['v626a'] = pd.to_numeric(df['v626a'], errors='coerce').fillna(0)
+    
+    if need_type == "spacing":
+        df['unmet_need'] = (df['v626a'] == 1).astype(np.int8)
+        label = "Unmet Need for Spacing"
+    elif need_type == "limiting":
+        df['unmet_need'] = (df['v626a'] == 2).astype(np.int8)
+        label = "Unmet Need for Limiting"
+    else:  # total
+        df['unmet_need'] = df['v626a'].isin([1, 2]).astype(np.int8)
+        label = "Total Unmet Need for Family Planning"
+    
+    region_df = data_loader.load_region("women", region, df)
+    
+    district_map = get_district_map(region)
+    dist_col = data_loader.get_district_column("women")
+    
+    districts_data = calc.district_percentages(region_df, 'unmet_need', dist_col, district_map, weight_col='v005')
+    
+    province_val = calc.weighted_percentage(region_df, 'unmet_need', weight_col='v005')
+    national_val = calc.weighted_percentage(df, 'unmet_need', weight_col='v005')
+    
+    return format_indicator_response(
+        indicator_name=label,
+        unit="Percentage",
+        districts_data=districts_data,
+        province_value=province_val,
+        province_code=region,
+        national_value=national_val,
+        population_type="Currently married women 15-49"
+    )
+
+
 @router.get("/unmet-need", response_model=IndicatorResponse)
 async def get_unmet_need(
     region: RegionCode = Query(default=RegionCode.EASTERN),
@@ -178,51 +246,57 @@ async def get_unmet_need(
     - 4: Met need for limiting
     """
     try:
-        df = data_loader.load_dataset("women")
-        
-        # Currently married women 15-49
-        df = df[(df['v502'] == 1) & (df['v012'] >= 15) & (df['v012'] <= 49)].copy()
-        df['v626a'] = pd.to_numeric(df['v626a'], errors='coerce').fillna(0)
-        
-        if need_type == "spacing":
-            df['unmet_need'] = (df['v626a'] == 1).astype(int)
-            label = "Unmet Need for Spacing"
-        elif need_type == "limiting":
-            df['unmet_need'] = (df['v626a'] == 2).astype(int)
-            label = "Unmet Need for Limiting"
-        else:  # total
-            df['unmet_need'] = df['v626a'].isin([1, 2]).astype(int)
-            label = "Total Unmet Need for Family Planning"
-        
-        region_df = df[df['v024'] == region.value].copy()
-        
-        province_key = get_province_key(region.value)
-        district_map = DISTRICT_MAPS.get(province_key, {})
-        dist_col = calc.get_district_column(region_df)
-        
-        districts_data = {}
-        for dist_code, dist_name in district_map.items():
-            dist_df = region_df[pd.to_numeric(region_df[dist_col], errors='coerce') == dist_code]
-            if not dist_df.empty:
-                districts_data[dist_name] = calc.weighted_percentage(dist_df, 'unmet_need', weight_col='v005')
-        
-        province_val = calc.weighted_percentage(region_df, 'unmet_need', weight_col='v005')
-        national_val = calc.weighted_percentage(df, 'unmet_need', weight_col='v005')
-        
-        return format_indicator_response(
-            indicator_name=label,
-            unit="Percentage",
-            districts_data=districts_data,
-            province_value=province_val,
-            province_code=region.value,
-            national_value=national_val,
-            population_type="Currently married women 15-49"
-        )
-        
+        return await asyncio.to_thread(_compute_unmet_need, data_loader, calc, region.value, need_type, data_loader.version)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@lru_cache(maxsize=256)
+def _compute_demand_satisfied(
+    data_loader: DHSDataLoader,
+    calc: CalculationService,
+    region: int,
+    data_version: int
+) -> dict:
+    """Build the demand satisfied response, cached per region and data version."""
+    df = data_loader.load_dataset("women")
+    
+    mask = calc.filter_mask(df, age_min=15, age_max=49, index=data_loader.get_filter_index("women"))
+    df = df[mask & (df['v502'].to_numpy() == 1)]
+    
+    df['v626a'] = pd.to_numeric(df['v626a'], errors='coerce').fillna(0)
+    df['v313'] = pd.to_numeric(df['v313'], errors='coerce').fillna(0)
+    
+    # Total demand = unmet need + met need (using any method)
+    df['has_demand'] = df['v626a'].isin([1, 2, 3, 4]).astype(np.int8)
+    df['modern_user'] = (df['v313'] == 3).astype(np.int8)
+    
+    # Filter to those with demand only
+    demand_df = df[df['has_demand'] == 1]
+    
+    region_df = data_loader.load_region("women", region, demand_df)
+    
+    district_map = get_district_map(region)
+    dist_col = data_loader.get_district_column("women")
+    
+    districts_data = calc.district_percentages(region_df, 'modern_user', dist_col, district_map, weight_col='v005')
+    
+    province_val = calc.weighted_percentage(region_df, 'modern_user', weight_col='v005')
+    national_val = calc.weighted_percentage(demand_df, 'modern_user', weight_col='v005')
+    
+    return format_indicator_response(
+        indicator_name="Demand for FP Satisfied by Modern Methods",
+        unit="Percentage",
+        districts_data=districts_data,
+        province_value=province_val,
+        province_code=region,
+        national_value=national_val,
+        population_type="Currently married women 15-49 with demand for FP"
+    )
+
+
 @router.get("/demand-satisfied", response_model=IndicatorResponse)
 async def get_demand_satisfied(
     region: RegionCode = Query(default=RegionCode.EASTERN),
@@ -235,49 +309,84 @@ async def get_demand_satisfied(
     Calculated as: (Modern method users) / (Total demand for FP) * 100
     """
     try:
-        df = data_loader.load_dataset("women")
-        
-        df = df[(df['v502'] == 1) & (df['v012'] >= 15) & (df['v012'] <= 49)].copy()
-        
-        df['v626a'] = pd.to_numeric(df['v626a'], errors='coerce').fillna(0)
-        df['v313'] = pd.to_numeric(df['v313'], errors='coerce').fillna(0)
-        
-        # Total demand = unmet need + met need (using any method)
-        df['has_demand'] = df['v626a'].isin([1, 2, 3, 4]).astype(int)
-        df['modern_user'] = (df['v313'] == 3).astype(int)
-        
-        # Filter to those with demand only
-        demand_df = df[df['has_demand'] == 1].copy()
-        
-        region_df = demand_df[demand_df['v024'] == region.value].copy()
-        
-        province_key = get_province_key(region.value)
-        district_map = DISTRICT_MAPS.get(province_key, {})
-        dist_col = calc.get_district_column(region_df)
-        
-        districts_data = {}
-        for dist_code, dist_name in district_map.items():
-            dist_df = region_df[pd.to_numeric(region_df[dist_col], errors='coerce') == dist_code]
-            if not dist_df.empty:
-                districts_data[dist_name] = calc.weighted_percentage(dist_df, 'modern_user', weight_col='v005')
-        
-        province_val = calc.weighted_percentage(region_df, 'modern_user', weight_col='v005')
-        national_val = calc.weighted_percentage(demand_df, 'modern_user', weight_col='v005')
-        
-        return format_indicator_response(
-            indicator_name="Demand for FP Satisfied by Modern Methods",
-            unit="Percentage",
-            districts_data=districts_data,
-            province_value=province_val,
-            province_code=region.value,
-            national_value=national_val,
-            population_type="Currently married women 15-49 with demand for FP"
-        )
-        
+        return await asyncio.to_thread(_compute_demand_satisfied, data_loader, calc, region.value, data_loader.version)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@lru_cache(maxsize=256)
+def _compute_fp_exposure(
+    data_loader: DHSDataLoader,
+    calc: CalculationService,
+    region: int,
+    source: str,
+    gender: str,
+    data_version: int
+) -> dict:
+    """Build the fp exposure response, cached per region/source/gender and data version."""
+    dataset = "women" if gender == "female" else "men"
+    df = data_loader.load_dataset(dataset)
+    
+    # Column prefixes differ by gender
+    prefix = 'v' if gender == "female" else 'mv'
+    weight_col = f'{prefix}005'
+    
+    # FP exposure columns: v384a (radio), v384b (tv), v384c (newspaper)
+    # For health worker: v395 (visited by FP worker)
+    source_map = {
+        'radio': (f'{prefix}384a', 'Heard FP message on Radio'),
+        'tv': (f'{prefix}384b', 'Heard FP message on TV'),
+        'newspaper': (f'{prefix}384c', 'Read FP message in Newspaper'),
+        'health_worker': (f'{prefix}395', 'Visited by FP Health Worker'),
+    }
+    
+    if source == "any":
+        # Create combined exposure indicator
+        for src, (col, _) in source_map.items():
+            if col in df.columns:
+                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+                df[f'{src}_exp'] = (df[col] == 1).astype(np.int8)
+        
+        exposure_cols = [f'{s}_exp' for s in source_map.keys() if f'{s}_exp' in df.columns]
+        if exposure_cols:
+            df['any_exposure'] = (df[exposure_cols].sum(axis=1) > 0).astype(np.int8)
+        else:
+            df['any_exposure'] = 0
+        col_name = 'any_exposure'
+        label = 'Any FP Message Exposure'
+    else:
+        if source not in source_map:
+            raise HTTPException(status_code=400, detail=f"Invalid source. Choose from: any, {', '.join(source_map.keys())}")
+        col_name, label = source_map[source]
+        df[col_name] = pd.to_numeric(df[col_name], errors='coerce').fillna(0)
+        df['exposure_ind'] = (df[col_name] == 1).astype(np.int8)
+        col_name = 'exposure_ind'
+    
+    region_df = data_loader.load_region(dataset, region, df)
+    
+    district_map = get_district_map(region)
+    dist_col = data_loader.get_district_column(dataset)
+    
+    districts_data = calc.district_percentages(region_df, col_name, dist_col, district_map, weight_col=weight_col)
+    
+    province_val = calc.weighted_percentage(region_df, col_name, weight_col=weight_col)
+    national_val = calc.weighted_percentage(df, col_name, weight_col=weight_col)
+    
+    gender_label = "Women" if gender == "female" else "Men"
+    
+    return format_indicator_response(
+        indicator_name=label,
+        unit="Percentage",
+        districts_data=districts_data,
+        province_value=province_val,
+        province_code=region,
+        national_value=national_val,
+        population_type=f"{gender_label} age 15-49"
+    )
+
+
 @router.get("/fp-exposure", response_model=IndicatorResponse)
 async def get_fp_exposure(
     region: RegionCode = Query(default=RegionCode.EASTERN),
@@ -290,71 +399,10 @@ async def get_fp_exposure(
     Get exposure to family planning messages.
     """
     try:
-        dataset = "women" if gender == "female" else "men"
-        df = data_loader.load_dataset(dataset)
-        
-        # Column prefixes differ by gender
-        prefix = 'v' if gender == "female" else 'mv'
-        region_col = f'{prefix}024'
-        weight_col = f'{prefix}005'
-        
-        # FP exposure columns: v384a (radio), v384b (tv), v384c (newspaper)
-        # For health worker: v395 (visited by FP worker)
-        source_map = {
-            'radio': (f'{prefix}384a', 'Heard FP message on Radio'),
-            'tv': (f'{prefix}384b', 'Heard FP message on TV'),
-            'newspaper': (f'{prefix}384c', 'Read FP message in Newspaper'),
-            'health_worker': (f'{prefix}395', 'Visited by FP Health Worker'),
-        }
-        
-        if source == "any":
-            # Create combined exposure indicator
-            for src, (col, _) in source_map.items():
-                if col in df.columns:
-                    df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-                    df[f'{src}_exp'] = (df[col] == 1).astype(int)
-            
-            exposure_cols = [f'{s}_exp' for s in source_map.keys() if f'{s}_exp' in df.columns]
-            if exposure_cols:
-                df['any_exposure'] = (df[exposure_cols].sum(axis=1) > 0).astype(int)
-            else:
-                df['any_exposure'] = 0
-            col_name = 'any_exposure'
-            label = 'Any FP Message Exposure'
-        else:
-            if source not in source_map:
-                raise HTTPException(status_code=400, detail=f"Invalid source. Choose from: any, {', '.join(source_map.keys())}")
-            col_name, label = source_map[source]
-            df[col_name] = pd.to_numeric(df[col_name], errors='coerce').fillna(0)
-            df['exposure_ind'] = (df[col_name] == 1).astype(int)
-            col_name = 'exposure_ind'
-        
-        region_df = df[df[region_col] == region.value].copy()
-        
-        province_key = get_province_key(region.value)
-        district_map = DISTRICT_MAPS.get(province_key, {})
-        dist_col = calc.get_district_column(region_df)
-        
-        districts_data = {}
-        for dist_code, dist_name in district_map.items():
-            dist_df = region_df[pd.to_numeric(region_df[dist_col], errors='coerce') == dist_code]
-            if not dist_df.empty:
-                districts_data[dist_name] = calc.weighted_percentage(dist_df, col_name, weight_col=weight_col)
-        
-        province_val = calc.weighted_percentage(region_df, col_name, weight_col=weight_col)
-        national_val = calc.weighted_percentage(df, col_name, weight_col=weight_col)
-        
-        gender_label = "Women" if gender == "female" else "Men"
-        
-        return format_indicator_response(
-            indicator_name=label,
-            unit="Percentage",
-            districts_data=districts_data,
-            province_value=province_val,
-            province_code=region.value,
-            national_value=national_val,
-            population_type=f"{gender_label} age 15-49"
-        )
-        
+        return await asyncio.to_thread(_compute_fp_exposure, data_loader, calc, region.value, source, gender, data_loader.version)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
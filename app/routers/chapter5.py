@@ -5,6 +5,8 @@ Endpoints for antenatal care, delivery assistance, and postnatal care.
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from typing import Optional
+from functools import lru_cache
+import asyncio
 import numpy as np
 import pandas as pd
 
@@ -12,8 +14,7 @@ from app.dependencies import get_data_loader, get_calculation_service
 from app.services.data_loader import DHSDataLoader
 from app.services.calculations import CalculationService
 from app.models.schemas import IndicatorResponse, RegionCode
-from app.config import DISTRICT_MAPS, PROVINCES
-from app.utils.helpers import format_indicator_response, get_province_key
+from app.utils.helpers import format_indicator_response, get_district_map
 
 router = APIRouter(
     prefix="/chapter5",
@@ -36,7 +37,64 @@ def filter_recent_births(df: pd.DataFrame, months: int = 60) -> pd.DataFrame:
     df[b3_col] = pd.to_numeric(df[b3_col], errors='coerce')
     df['v008'] = pd.to_numeric(df['v008'], errors='coerce')
     
-    return df[(df['v008'] - df[b3_col]) < months].copy()
+    return df[(df['v008'] - df[b3_col]) < months]
+
+
+@lru_cache(maxsize=256)
+def _compute_antenatal_care(
+    data_loader: DHSDataLoader,
+    calc: CalculationService,
+    region: int,
+    indicator: str,
+    data_version: int
+) -> dict:
+    """Build the antenatal care response, cached per region/indicator and data version."""
+    df = data_loader.load_dataset("women")
+    df = filter_recent_births(df, 60)
+    
+    if len(df) == 0:
+        raise HTTPException(status_code=404, detail="No births found in the last 5 years")
+    
+    # Detect column format
+    m2a = 'm2a_1' if 'm2a_1' in df.columns else 'm2a_01'
+    m2b = 'm2b_1' if 'm2b_1' in df.columns else 'm2b_01'
+    m2c = 'm2c_1' if 'm2c_1' in df.columns else 'm2c_01'
+    m14 = 'm14_1' if 'm14_1' in df.columns else 'm14_01'
+    
+    for col in [m2a, m2b, m2c, m14]:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+    
+    if indicator == "skilled_provider":
+        # Skilled if Doctor (m2a) or Nurse/Midwife (m2b) or Medical Assistant (m2c) = 1
+        df['indicator'] = ((df[m2a] == 1) | (df[m2b] == 1) | (df.get(m2c, 0) == 1)).astype(np.int8)
+        label = "ANC from Skilled Provider"
+    elif indicator == "four_visits":
+        # At least 4 visits
+        df['indicator'] = (df[m14] >= 4).astype(np.int8)
+        label = "At Least 4 ANC Visits"
+    else:
+        raise HTTPException(status_code=400, detail="Invalid indicator. Choose: skilled_provider, four_visits")
+    
+    region_df = data_loader.load_region("women", region, df)
+    
+    district_map = get_district_map(region)
+    dist_col = data_loader.get_district_column("women")
+    
+    districts_data = calc.district_percentages(region_df, 'indicator', dist_col, district_map, weight_col='v005')
+    
+    province_val = calc.weighted_percentage(region_df, 'indicator', weight_col='v005')
+    national_val = calc.weighted_percentage(df, 'indicator', weight_col='v005')
+    
+    return format_indicator_response(
+        indicator_name=label,
+        unit="Percentage",
+        districts_data=districts_data,
+        province_value=province_val,
+        province_code=region,
+        national_value=national_val,
+        population_type="Women with a live birth in the last 5 years"
+    )
 
 
 @router.get("/antenatal-care", response_model=IndicatorResponse)
@@ -57,62 +115,62 @@ async def get_antenatal_care(
     m14_1: Number of ANC visits
     """
     try:
-        df = data_loader.load_dataset("women")
-        df = filter_recent_births(df, 60)
-        
-        if len(df) == 0:
-            raise HTTPException(status_code=404, detail="No births found in the last 5 years")
-        
-        # Detect column format
-        m2a = 'm2a_1' if 'm2a_1' in df.columns else 'm2a_01'
-        m2b = 'm2b_1' if 'm2b_1' in df.columns else 'm2b_01'
-        m2c = 'm2c_1' if 'm2c_1' in df.columns else 'm2c_01'
-        m14 = 'm14_1' if 'm14_1' in df.columns else 'm14_01'
-        
-        for col in [m2a, m2b, m2c, m14]:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-        
-        if indicator == "skilled_provider":
-            # Skilled if Doctor (m2a) or Nurse/Midwife (m2b) or Medical Assistant (m2c) = 1
-            df['indicator'] = ((df[m2a] == 1) | (df[m2b] == 1) | (df.get(m2c, 0) == 1)).astype(int)
-            label = "ANC from Skilled Provider"
-        elif indicator == "four_visits":
-            # At least 4 visits
-            df['indicator'] = (df[m14] >= 4).astype(int)
-            label = "At Least 4 ANC Visits"
-        else:
-            raise HTTPException(status_code=400, detail="Invalid indicator. Choose: skilled_provider, four_visits")
-        
-        region_df = df[df['v024'] == region.value].copy()
-        
-        province_key = get_province_key(region.value)
-        district_map = DISTRICT_MAPS.get(province_key, {})
-        dist_col = calc.get_district_column(region_df)
-        
-        districts_data = {}
-        for dist_code, dist_name in district_map.items():
-            dist_df = region_df[pd.to_numeric(region_df[dist_col], errors='coerce') == dist_code]
-            if not dist_df.empty:
-                districts_data[dist_name] = calc.weighted_percentage(dist_df, 'indicator', weight_col='v005')
-        
-        province_val = calc.weighted_percentage(region_df, 'indicator', weight_col='v005')
-        national_val = calc.weighted_percentage(df, 'indicator', weight_col='v005')
-        
-        return format_indicator_response(
-            indicator_name=label,
-            unit="Percentage",
-            districts_data=districts_data,
-            province_value=province_val,
-            province_code=region.value,
-            national_value=national_val,
-            population_type="Women with a live birth in the last 5 years"
-        )
-        
+        return await asyncio.to_thread(_compute_antenatal_care, data_loader, calc, region.value, indicator, data_loader.version)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@lru_cache(maxsize=256)
+def _compute_delivery_place(
+    data_loader: DHSDataLoader,
+    calc: CalculationService,
+    region: int,
+    place: str,
+    data_version: int
+) -> dict:
+    """Build the delivery place response, cached per region/place and data version."""
+    df = data_loader.load_dataset("women")
+    df = filter_recent_births(df, 60)
+    
+    m15 = 'm15_1' if 'm15_1' in df.columns else 'm15_01'
+    df[m15] = pd.to_numeric(df[m15], errors='coerce').fillna(0)
+    
+    place_map = {
+        'health_facility': (lambda x: (x >= 11) & (x <= 36), 'Delivery at Health Facility'),
+        'hospital': (lambda x: (x >= 10) & (x <= 16), 'Delivery at Hospital'),
+        'health_center': (lambda x: (x >= 20) & (x <= 26), 'Delivery at Health Center'),
+        'home': (lambda x: x == 0, 'Delivery at Home'),
+    }
+    
+    if place not in place_map:
+        raise HTTPException(status_code=400, detail=f"Invalid place. Choose from: {list(place_map.keys())}")
+    
+    condition, label = place_map[place]
+    df['indicator'] = condition(df[m15]).astype(np.int8)
+    
+    region_df = data_loader.load_region("women", region, df)
+    
+    district_map = get_district_map(region)
+    dist_col = data_loader.get_district_column("women")
+    
+    districts_data = calc.district_percentages(region_df, 'indicator', dist_col, district_map, weight_col='v005')
+    
+    province_val = calc.weighted_percentage(region_df, 'indicator', weight_col='v005')
+    national_val = calc.weighted_percentage(df, 'indicator', weight_col='v005')
+    
+    return format_indicator_response(
+        indicator_name=label,
+        unit="Percentage",
+        districts_data=districts_data,
+        province_value=province_val,
+        province_code=region,
+        national_value=national_val,
+        population_type="Live births in the last 5 years"
+    )
+
+
 @router.get("/delivery-place", response_model=IndicatorResponse)
 async def get_delivery_place(
     region: RegionCode = Query(default=RegionCode.EASTERN),
@@ -131,54 +189,69 @@ async def get_delivery_place(
     - 0: Home
     """
     try:
-        df = data_loader.load_dataset("women")
-        df = filter_recent_births(df, 60)
-        
-        m15 = 'm15_1' if 'm15_1' in df.columns else 'm15_01'
-        df[m15] = pd.to_numeric(df[m15], errors='coerce').fillna(0)
-        
-        place_map = {
-            'health_facility': (lambda x: (x >= 11) & (x <= 36), 'Delivery at Health Facility'),
-            'hospital': (lambda x: (x >= 10) & (x <= 16), 'Delivery at Hospital'),
-            'health_center': (lambda x: (x >= 20) & (x <= 26), 'Delivery at Health Center'),
-            'home': (lambda x: x == 0, 'Delivery at Home'),
-        }
-        
-        if place not in place_map:
-            raise HTTPException(status_code=400, detail=f"Invalid place. Choose from: {list(place_map.keys())}")
-        
-        condition, label = place_map[place]
-        df['indicator'] = condition(df[m15]).astype(int)
-        
-        region_df = df[df['v024'] == region.value].copy()
-        
-        province_key = get_province_key(region.value)
-        district_map = DISTRICT_MAPS.get(province_key, {})
-        dist_col = calc.get_district_column(region_df)
-        
-        districts_data = {}
-        for dist_code, dist_name in district_map.items():
-            dist_df = region_df[pd.to_numeric(region_df[dist_col], errors='coerce') == dist_code]
-            if not dist_df.empty:
-                districts_data[dist_name] = calc.weighted_percentage(dist_df, 'indicator', weight_col='v005')
-        
-        province_val = calc.weighted_percentage(region_df, 'indicator', weight_col='v005')
-        national_val = calc.weighted_percentage(df, 'indicator', weight_col='v005')
-        
-        return format_indicator_response(
-            indicator_name=label,
-            unit="Percentage",
-            districts_data=districts_data,
-            province_value=province_val,
-            province_code=region.value,
-            national_value=national_val,
-            population_type="Live births in the last 5 years"
-        )
-        
+        return await asyncio.to_thread(_compute_delivery_place, data_loader, calc, region.value, place, data_loader.version)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@lru_cache(maxsize=256)
+def _compute_delivery_assistance(
+    data_loader: DHSDataLoader,
+    calc: CalculationService,
+    region: int,
+    provider: str,
+    data_version: int
+) -> dict:
+    """Build the delivery assistance response, cached per region/provider and data version."""
+    df = data_loader.load_dataset("women")
+    df = filter_recent_births(df, 60)
+    
+    # Detect column format
+    m3a = 'm3a_1' if 'm3a_1' in df.columns else 'm3a_01'
+    m3b = 'm3b_1' if 'm3b_1' in df.columns else 'm3b_01'
+    m3c = 'm3c_1' if 'm3c_1' in df.columns else 'm3c_01'
+    m3g = 'm3g_1' if 'm3g_1' in df.columns else 'm3g_01'
+    
+    for col in [m3a, m3b, m3c, m3g]:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+    
+    provider_map = {
+        'skilled': (lambda d: ((d[m3a] == 1) | (d[m3b] == 1) | (d.get(m3c, 0) == 1)), 'Skilled Birth Attendant'),
+        'doctor': (lambda d: d[m3a] == 1, 'Delivered by Doctor'),
+        'nurse': (lambda d: d[m3b] == 1, 'Delivered by Nurse/Midwife'),
+        'traditional': (lambda d: d[m3g] == 1, 'Traditional Birth Attendant'),
+    }
+    
+    if provider not in provider_map:
+        raise HTTPException(status_code=400, detail=f"Invalid provider. Choose from: {list(provider_map.keys())}")
+    
+    condition, label = provider_map[provider]
+    df['indicator'] = condition(df).astype(np.int8)
+    
+    region_df = data_loader.load_region("women", region, df)
+    
+    district_map = get_district_map(region)
+    dist_col = data_loader.get_district_column("women")
+    
+    districts_data = calc.district_percentages(region_df, 'indicator', dist_col, district_map, weight_col='v005')
+    
+    province_val = calc.weighted_percentage(region_df, 'indicator', weight_col='v005')
+    national_val = calc.weighted_percentage(df, 'indicator', weight_col='v005')
+    
+    return format_indicator_response(
+        indicator_name=label,
+        unit="Percentage",
+        districts_data=districts_data,
+        province_value=province_val,
+        province_code=region,
+        national_value=national_val,
+        population_type="Live births in the last 5 years"
+    )
+
+
 @router.get("/delivery-assistance", response_model=IndicatorResponse)
 async def get_delivery_assistance(
     region: RegionCode = Query(default=RegionCode.EASTERN),
@@ -193,61 +266,110 @@ async def get_delivery_assistance(
     m3g_1: Traditional birth attendant
     """
     try:
-        df = data_loader.load_dataset("women")
-        df = filter_recent_births(df, 60)
-        
-        # Detect column format
-        m3a = 'm3a_1' if 'm3a_1' in df.columns else 'm3a_01'
-        m3b = 'm3b_1' if 'm3b_1' in df.columns else 'm3b_01'
-        m3c = 'm3c_1' if 'm3c_1' in df.columns else 'm3c_01'
-        m3g = 'm3g_1' if 'm3g_1' in df.columns else 'm3g_01'
-        
-        for col in [m3a, m3b, m3c, m3g]:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-        
-        provider_map = {
-            'skilled': (lambda d: ((d[m3a] == 1) | (d[m3b] == 1) | (d.get(m3c, 0) == 1)), 'Skilled Birth Attendant'),
-            'doctor': (lambda d: d[m3a] == 1, 'Delivered by Doctor'),
-            'nurse': (lambda d: d[m3b] == 1, 'Delivered by Nurse/Midwife'),
-            'traditional': (lambda d: d[m3g] == 1, 'Traditional Birth Attendant'),
-        }
-        
-        if provider not in provider_map:
-            raise HTTPException(status_code=400, detail=f"Invalid provider. Choose from: {list(provider_map.keys())}")
-        
-        condition, label = provider_map[provider]
-        df['indicator'] = condition(df).astype(int)
-        
-        region_df = df[df['v024'] == region.value].copy()
-        
-        province_key = get_province_key(region.value)
-        district_map = DISTRICT_MAPS.get(province_key, {})
-        dist_col = calc.get_district_column(region_df)
-        
-        districts_data = {}
-        for dist_code, dist_name in district_map.items():
-            dist_df = region_df[pd.to_numeric(region_df[dist_col], errors='coerce') == dist_code]
-            if not dist_df.empty:
-                districts_data[dist_name] = calc.weighted_percentage(dist_df, 'indicator', weight_col='v005')
-        
-        province_val = calc.weighted_percentage(region_df, 'indicator', weight_col='v005')
-        national_val = calc.weighted_percentage(df, 'indicator', weight_col='v005')
-        
-        return format_indicator_response(
-            indicator_name=label,
-            unit="Percentage",
-            districts_data=districts_data,
-            province_value=province_val,
-            province_code=region.value,
-            national_value=national_val,
-            population_type="Live births in the last 5 years"
-        )
-        
+        return await asyncio.to_thread(_compute_delivery_assistance, data_loader, calc, region.value, provider, data_loader.version)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@lru_cache(maxsize=256)
+def _compute_postnatal_care(
+    data_loader: DHSDataLoader,
+    calc: CalculationService,
+    region: int,
+    target: str,
+    data_version: int
+) -> dict:
+    """Build the postnatal care response, cached per region/target and data version."""
+    # Load children dataset (RWKR81FL)
+    df = data_loader.load_dataset("children")
+
+    # Ensure numeric types for filter columns
+    for col in ['midx', 'b19', 'v024', 'v005']:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+
+    # Filter: most recent birth (midx == 1) AND born in last 2 years (b19 < 24)
+    df = df[
+        (df['midx'] == 1) &
+        (df['b19'] < 24)
+    ]
+
+    if len(df) == 0:
+        raise HTTPException(status_code=404, detail="No births found in the last 2 years")
+
+    # Helper: check if timing code is within first 2 days
+    def _valid_timing(t):
+        """Return True if timing code represents within 2 days."""
+        if pd.isna(t):
+            return False
+        t = int(t)
+        return (100 <= t <= 171) or t in (198, 199, 200, 201, 202)
+
+    # --- PNC for Women ---
+    def check_women(row):
+        # Check m62 (checked after delivery)
+        if row.get('m62') == 1 and _valid_timing(row.get('m63')):
+            return 1
+        # Check m66 (checked before discharge)
+        if row.get('m66') == 1 and _valid_timing(row.get('m67')):
+            return 1
+        return 0
+
+    # --- PNC for Newborn ---
+    def check_newborn(row):
+        # Check m70 (baby checked after delivery)
+        if row.get('m70') == 1 and _valid_timing(row.get('m71')):
+            return 1
+        # Check m74 (baby checked before discharge)
+        if row.get('m74') == 1 and _valid_timing(row.get('m75')):
+            return 1
+        return 0
+
+    # Ensure PNC columns are numeric
+    pnc_cols = ['m62', 'm63', 'm66', 'm67', 'm70', 'm71', 'm74', 'm75']
+    for col in pnc_cols:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+
+    # Apply the chosen PNC logic
+    if target == "women":
+        df['indicator'] = df.apply(check_women, axis=1)
+        label = "Postnatal Checkup Within 2 Days (Women)"
+    elif target == "newborn":
+        df['indicator'] = df.apply(check_newborn, axis=1)
+        label = "Postnatal Checkup Within 2 Days (Newborn)"
+    else:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid target. Choose: women, newborn"
+        )
+
+    # Filter by region
+    region_df = data_loader.load_region("children", region, df)
+
+    # Dynamically detect district column and use config-based district maps
+    district_map = get_district_map(region)
+    dist_col = data_loader.get_district_column("children")
+
+    # Calculate per-district values
+    districts_data = calc.district_percentages(region_df, 'indicator', dist_col, district_map, weight_col='v005')
+
+    province_val = calc.weighted_percentage(region_df, 'indicator', weight_col='v005')
+    national_val = calc.weighted_percentage(df, 'indicator', weight_col='v005')
+
+    return format_indicator_response(
+        indicator_name=label,
+        unit="Percentage",
+        districts_data=districts_data,
+        province_value=province_val,
+        province_code=region,
+        national_value=national_val,
+        population_type="Births in the last 2 years (most recent birth)"
+    )
+
+
 @router.get("/postnatal-care", response_model=IndicatorResponse)
 async def get_postnatal_care(
     region: RegionCode = Query(default=RegionCode.EASTERN),
@@ -271,102 +393,51 @@ async def get_postnatal_care(
     **Valid timing codes:** 100–171 (hours) or 198–202 (days within 2 days).
     """
     try:
-        # Load children dataset (RWKR81FL)
-        df = data_loader.load_dataset("children")
-
-        # Ensure numeric types for filter columns
-        for col in ['midx', 'b19', 'v024', 'v005']:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-
-        # Filter: most recent birth (midx == 1) AND born in last 2 years (b19 < 24)
-        df = df[
-            (df['midx'] == 1) &
-            (df['b19'] < 24)
-        ].copy()
-
-        if len(df) == 0:
-            raise HTTPException(status_code=404, detail="No births found in the last 2 years")
-
-        # Helper: check if timing code is within first 2 days
-        def _valid_timing(t):
-            """Return True if timing code represents within 2 days."""
-            if pd.isna(t):
-                return False
-            t = int(t)
-            return (100 <= t <= 171) or t in (198, 199, 200, 201, 202)
-
-        # --- PNC for Women ---
-        def check_women(row):
-            # Check m62 (checked after delivery)
-            if row.get('m62') == 1 and _valid_timing(row.get('m63')):
-                return 1
-            # Check m66 (checked before discharge)
-            if row.get('m66') == 1 and _valid_timing(row.get('m67')):
-                return 1
-            return 0
-
-        # --- PNC for Newborn ---
-        def check_newborn(row):
-            # Check m70 (baby checked after delivery)
-            if row.get('m70') == 1 and _valid_timing(row.get('m71')):
-                return 1
-            # Check m74 (baby checked before discharge)
-            if row.get('m74') == 1 and _valid_timing(row.get('m75')):
-                return 1
-            return 0
-
-        # Ensure PNC columns are numeric
-        pnc_cols = ['m62', 'm63', 'm66', 'm67', 'm70', 'm71', 'm74', 'm75']
-        for col in pnc_cols:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-
-        # Apply the chosen PNC logic
-        if target == "women":
-            df['indicator'] = df.apply(check_women, axis=1)
-            label = "Postnatal Checkup Within 2 Days (Women)"
-        elif target == "newborn":
-            df['indicator'] = df.apply(check_newborn, axis=1)
-            label = "Postnatal Checkup Within 2 Days (Newborn)"
-        else:
-            raise HTTPException(
-                status_code=400,
-                detail="Invalid target. Choose: women, newborn"
-            )
-
-        # Filter by region
-        region_df = df[df['v024'] == region.value].copy()
-
-        # Dynamically detect district column and use config-based district maps
-        province_key = get_province_key(region.value)
-        district_map = DISTRICT_MAPS.get(province_key, {})
-        dist_col = calc.get_district_column(region_df)
-
-        # Calculate per-district values
-        districts_data = {}
-        for dist_code, dist_name in district_map.items():
-            dist_df = region_df[pd.to_numeric(region_df[dist_col], errors='coerce') == dist_code]
-            if not dist_df.empty:
-                districts_data[dist_name] = calc.weighted_percentage(dist_df, 'indicator', weight_col='v005')
-
-        province_val = calc.weighted_percentage(region_df, 'indicator', weight_col='v005')
-        national_val = calc.weighted_percentage(df, 'indicator', weight_col='v005')
-
-        return format_indicator_response(
-            indicator_name=label,
-            unit="Percentage",
-            districts_data=districts_data,
-            province_value=province_val,
-            province_code=region.value,
-            national_value=national_val,
-            population_type="Births in the last 2 years (most recent birth)"
-        )
-
+        return await asyncio.to_thread(_compute_postnatal_care, data_loader, calc, region.value, target, data_loader.version)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@lru_cache(maxsize=256)
+def _compute_tetanus_protection(
+    data_loader: DHSDataLoader,
+    calc: CalculationService,
+    region: int,
+    data_version: int
+) -> dict:
+    """Build the tetanus protection response, cached per region and data version."""
+    df = data_loader.load_dataset("women")
+    df = filter_recent_births(df, 60)
+    
+    m1 = 'm1_1' if 'm1_1' in df.columns else 'm1_01'
+    df[m1] = pd.to_numeric(df[m1], errors='coerce').fillna(0)
+    
+    # Protected if received at least 2 doses
+    df['indicator'] = (df[m1] >= 2).astype(np.int8)
+    
+    region_df = data_loader.load_region("women", region, df)
+    
+    district_map = get_district_map(region)
+    dist_col = data_loader.get_district_column("women")
+    
+    districts_data = calc.district_percentages(region_df, 'indicator', dist_col, district_map, weight_col='v005')
+    
+    province_val = calc.weighted_percentage(region_df, 'indicator', weight_col='v005')
+    national_val = calc.weighted_percentage(df, 'indicator', weight_col='v005')
+    
+    return format_indicator_response(
+        indicator_name="Neonatal Tetanus Protection (2+ TT Doses)",
+        unit="Percentage",
+        districts_data=districts_data,
+        province_value=province_val,
+        province_code=region,
+        national_value=national_val,
+        population_type="Women with a live birth in the last 5 years"
+    )
+
+
 @router.get("/tetanus-protection", response_model=IndicatorResponse)
 async def get_tetanus_protection(
     region: RegionCode = Query(default=RegionCode.EASTERN),
@@ -379,39 +450,10 @@ async def get_tetanus_protection(
     m1_1: Number of tetanus injections during pregnancy
     """
     try:
-        df = data_loader.load_dataset("women")
-        df = filter_recent_births(df, 60)
-        
-        m1 = 'm1_1' if 'm1_1' in df.columns else 'm1_01'
-        df[m1] = pd.to_numeric(df[m1], errors='coerce').fillna(0)
-        
-        # Protected if received at least 2 doses
-        df['indicator'] = (df[m1] >= 2).astype(int)
-        
-        region_df = df[df['v024'] == region.value].copy()
-        
-        province_key = get_province_key(region.value)
-        district_map = DISTRICT_MAPS.get(province_key, {})
-        dist_col = calc.get_district_column(region_df)
-        
-        districts_data = {}
-        for dist_code, dist_name in district_map.items():
-            dist_df = region_df[pd.to_numeric(region_df[dist_col], errors='coerce') == dist_code]
-            if not dist_df.empty:
-                districts_data[dist_name] = calc.weighted_percentage(dist_df, 'indicator', weight_col='v005')
-        
-        province_val = calc.weighted_percentage(region_df, 'indicator', weight_col='v005')
-        national_val = calc.weighted_percentage(df, 'indicator', weight_col='v005')
-        
-        return format_indicator_response(
-            indicator_name="Neonatal Tetanus Protection (2+ TT Doses)",
-            unit="Percentage",
-            districts_data=districts_data,
-            province_value=province_val,
-            province_code=region.value,
-            national_value=national_val,
-            population_type="Women with a live birth in the last 5 years"
-        )
-        
+        return await asyncio.to_thread(_compute_tetanus_protection, data_loader, calc, region.value, data_loader.version)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
@@ -4,7 +4,9 @@ Endpoints for nutritional indicators (stunting, wasting, underweight) for childr
 """
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from typing import Optional
+from typing import Dict
+from functools import lru_cache
+import asyncio
 import numpy as np
 import pandas as pd
 
@@ -12,8 +14,7 @@ from app.dependencies import get_data_loader, get_calculation_service
 from app.services.data_loader import DHSDataLoader
 from app.services.calculations import CalculationService
 from app.models.schemas import IndicatorResponse, RegionCode
-from app.config import DISTRICT_MAPS, PROVINCES
-from app.utils.helpers import format_indicator_response, get_province_key
+from app.utils.helpers import format_indicator_response, get_district_map
 
 router = APIRouter(
     prefix="/chapter7",
@@ -21,6 +22,126 @@ router = APIRouter(
     responses={404: {"description": "Not found"}}
 )
 
+# Upper bounds of the underweight/normal/overweight BMI bands (BMI * 100)
+BMI_BUCKET_EDGES = np.array([1850, 2500, 3000], dtype=np.float32)
+
+
+def nutrition_base_arrays(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """
+    Extract the arrays shared by the cached nutrition data:
+    region, weight (as float32) and an integer district code.
+    """
+    dist_col = CalculationService.get_district_column(df)
+    
+    return {
+        'v024': df['v024'].to_numpy(),
+        'v005': df['v005'].to_numpy(np.float32),
+        '_dist_code': df[dist_col].fillna(0).to_numpy(np.int16),
+    }
+
+
+def prepare_children_nutrition(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """
+    Build the cleaned children's arrays used by the anthropometry endpoints.
+    Keeps living children under 5 with their z-scores (hw70, hw71, hw72).
+    """
+    # Filter: Living children under 5
+    df = df[(df['b5'] == 1) & (df['b19'] < 60)]
+    
+    data = nutrition_base_arrays(df)
+    for col in ('hw70', 'hw71', 'hw72'):
+        data[col] = df[col].to_numpy(np.float64)
+    return data
+
+
+def prepare_women_bmi(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """
+    Build the cleaned women's arrays used by the BMI endpoint.
+    Keeps non-pregnant women with a valid BMI and buckets v445 once:
+    0=underweight, 1=normal, 2=overweight, 3=obese.
+    """
+    # Filter: Non-pregnant women
+    df = df[df['v213'] != 1]  # v213=1 means currently pregnant
+    
+    v445 = df['v445']
+    # Valid BMI range (exclude flagged values)
+    valid = (v445 >= 1200) & (v445 <= 6000)
+    
+    data = nutrition_base_arrays(df[valid])
+    data['_bmi_bucket'] = np.searchsorted(
+        BMI_BUCKET_EDGES, v445[valid].to_numpy(np.float32), side='right'
+    ).astype('int8')
+    return data
+
+
+def prepare_women_anemia(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """
+    Build the cleaned women's arrays used by the anemia endpoint.
+    Precomputes one boolean mask per severity option from v457.
+    """
+    # Missing measurements count as not anemic
+    v457 = df['v457'].fillna(0).to_numpy(np.int8)
+    
+    data = nutrition_base_arrays(df)
+    data['_anemia_any'] = (v457 >= 1) & (v457 <= 3)
+    data['_anemia_mild'] = v457 == 3
+    data['_anemia_moderate'] = v457 == 2
+    data['_anemia_severe'] = v457 == 1
+    return data
+
+
+@lru_cache(maxsize=256)
+def _compute_stunting(
+    data_loader: DHSDataLoader,
+    calc: CalculationService,
+    region: int,
+    severity: str,
+    data_version: int
+) -> dict:
+    """Build the stunting response, cached per region/severity and data version."""
+    data = data_loader.load_derived("children_nutrition", "children", prepare_children_nutrition)
+    
+    # hw70: Height-for-age (stored as value * 100)
+    # Valid range: -600 to 600 (corresponds to -6 to +6 SD)
+    valid = (data['hw70'] >= -600) & (data['hw70'] <= 600)
+    hw70 = data['hw70'][valid]
+    
+    if severity == "severe":
+        mask = hw70 < -300  # < -3 SD
+        label = "Severe Stunting (HAZ < -3 SD)"
+    elif severity == "moderate":
+        mask = (hw70 >= -300) & (hw70 < -200)  # -3 to -2 SD
+        label = "Moderate Stunting (-3 <= HAZ < -2 SD)"
+    else:  # any
+        mask = hw70 < -200  # < -2 SD
+        label = "Any Stunting (HAZ < -2 SD)"
+    
+    weights = data['v005'][valid]
+    region_mask = data['v024'][valid] == region
+    dist_codes = data['_dist_code'][valid]
+    
+    dist_values = calc.weighted_fraction_by_group(
+        mask[region_mask], weights[region_mask], dist_codes[region_mask]
+    )
+    districts_data = {
+        dist_name: dist_values[dist_code]
+        for dist_code, dist_name in get_district_map(region).items()
+        if dist_code in dist_values
+    }
+    
+    province_val = calc.weighted_fraction(mask[region_mask], weights[region_mask])
+    national_val = calc.weighted_fraction(mask, weights)
+    
+    return format_indicator_response(
+        indicator_name=label,
+        unit="Percentage",
+        districts_data=districts_data,
+        province_value=province_val,
+        province_code=region,
+        national_value=national_val,
+        population_type="Children under 5 years"
+    )
+
 
 @router.get("/stunting", response_model=IndicatorResponse)
 async def get_stunting(
@@ -38,54 +159,58 @@ async def get_stunting(
     
     Values are stored as HAZ * 100 (e.g., -200 = -2 SD)
     """
-    try:
-        df = data_loader.load_dataset("children")
-        
-        # Filter: Living children under 5
-        df = df[(df['b5'] == 1) & (df['b19'] < 60)].copy()
-        
-        # hw70: Height-for-age (stored as value * 100)
-        # Valid range: -600 to 600 (corresponds to -6 to +6 SD)
-        df['hw70'] = pd.to_numeric(df['hw70'], errors='coerce')
-        df = df[(df['hw70'] >= -600) & (df['hw70'] <= 600)].copy()
-        
-        if severity == "severe":
-            df['indicator'] = (df['hw70'] < -300).astype(int)  # < -3 SD
-            label = "Severe Stunting (HAZ < -3 SD)"
-        elif severity == "moderate":
-            df['indicator'] = ((df['hw70'] >= -300) & (df['hw70'] < -200)).astype(int)  # -3 to -2 SD
-            label = "Moderate Stunting (-3 <= HAZ < -2 SD)"
-        else:  # any
-            df['indicator'] = (df['hw70'] < -200).astype(int)  # < -2 SD
-            label = "Any Stunting (HAZ < -2 SD)"
-        
-        region_df = df[df['v024'] == region.value].copy()
-        
-        province_key = get_province_key(region.value)
-        district_map = DISTRICT_MAPS.get(province_key, {})
-        dist_col = calc.get_district_column(region_df)
-        
-        districts_data = {}
-        for dist_code, dist_name in district_map.items():
-            dist_df = region_df[pd.to_numeric(region_df[dist_col], errors='coerce') == dist_code]
-            if not dist_df.empty:
-                districts_data[dist_name] = calc.weighted_percentage(dist_df, 'indicator', weight_col='v005')
-        
-        province_val = calc.weighted_percentage(region_df, 'indicator', weight_col='v005')
-        national_val = calc.weighted_percentage(df, 'indicator', weight_col='v005')
-        
-        return format_indicator_response(
-            indicator_name=label,
-            unit="Percentage",
-            districts_data=districts_data,
-            province_value=province_val,
-            province_code=region.value,
-            national_value=national_val,
-            population_type="Children under 5 years"
-        )
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await asyncio.to_thread(_compute_stunting, data_loader, calc, region.value, severity, data_loader.version)
+
+
+@lru_cache(maxsize=256)
+def _compute_wasting(
+    data_loader: DHSDataLoader,
+    calc: CalculationService,
+    region: int,
+    severity: str,
+    data_version: int
+) -> dict:
+    """Build the wasting response, cached per region/severity and data version."""
+    data = data_loader.load_derived("children_nutrition", "children", prepare_children_nutrition)
+    
+    valid = (data['hw72'] >= -500) & (data['hw72'] <= 500)
+    hw72 = data['hw72'][valid]
+    
+    if severity == "severe":
+        mask = hw72 < -300
+        label = "Severe Wasting (WHZ < -3 SD)"
+    elif severity == "moderate":
+        mask = (hw72 >= -300) & (hw72 < -200)
+        label = "Moderate Wasting (-3 <= WHZ < -2 SD)"
+    else:
+        mask = hw72 < -200
+        label = "Any Wasting (WHZ < -2 SD)"
+    
+    weights = data['v005'][valid]
+    region_mask = data['v024'][valid] == region
+    dist_codes = data['_dist_code'][valid]
+    
+    dist_values = calc.weighted_fraction_by_group(
+        mask[region_mask], weights[region_mask], dist_codes[region_mask]
+    )
+    districts_data = {
+        dist_name: dist_values[dist_code]
+        for dist_code, dist_name in get_district_map(region).items()
+        if dist_code in dist_values
+    }
+    
+    province_val = calc.weighted_fraction(mask[region_mask], weights[region_mask])
+    national_val = calc.weighted_fraction(mask, weights)
+    
+    return format_indicator_response(
+        indicator_name=label,
+        unit="Percentage",
+        districts_data=districts_data,
+        province_value=province_val,
+        province_code=region,
+        national_value=national_val,
+        population_type="Children under 5 years"
+    )
 
 
 @router.get("/wasting", response_model=IndicatorResponse)
@@ -102,51 +227,58 @@ async def get_wasting(
     - Wasted: WHZ < -2 SD
     - Severely wasted: WHZ < -3 SD
     """
-    try:
-        df = data_loader.load_dataset("children")
-        
-        df = df[(df['b5'] == 1) & (df['b19'] < 60)].copy()
-        
-        df['hw72'] = pd.to_numeric(df['hw72'], errors='coerce')
-        df = df[(df['hw72'] >= -500) & (df['hw72'] <= 500)].copy()
-        
-        if severity == "severe":
-            df['indicator'] = (df['hw72'] < -300).astype(int)
-            label = "Severe Wasting (WHZ < -3 SD)"
-        elif severity == "moderate":
-            df['indicator'] = ((df['hw72'] >= -300) & (df['hw72'] < -200)).astype(int)
-            label = "Moderate Wasting (-3 <= WHZ < -2 SD)"
-        else:
-            df['indicator'] = (df['hw72'] < -200).astype(int)
-            label = "Any Wasting (WHZ < -2 SD)"
-        
-        region_df = df[df['v024'] == region.value].copy()
-        
-        province_key = get_province_key(region.value)
-        district_map = DISTRICT_MAPS.get(province_key, {})
-        dist_col = calc.get_district_column(region_df)
-        
-        districts_data = {}
-        for dist_code, dist_name in district_map.items():
-            dist_df = region_df[pd.to_numeric(region_df[dist_col], errors='coerce') == dist_code]
-            if not dist_df.empty:
-                districts_data[dist_name] = calc.weighted_percentage(dist_df, 'indicator', weight_col='v005')
-        
-        province_val = calc.weighted_percentage(region_df, 'indicator', weight_col='v005')
-        national_val = calc.weighted_percentage(df, 'indicator', weight_col='v005')
-        
-        return format_indicator_response(
-            indicator_name=label,
-            unit="Percentage",
-            districts_data=districts_data,
-            province_value=province_val,
-            province_code=region.value,
-            national_value=national_val,
-            population_type="Children under 5 years"
-        )
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await asyncio.to_thread(_compute_wasting, data_loader, calc, region.value, severity, data_loader.version)
+
+
+@lru_cache(maxsize=256)
+def _compute_underweight(
+    data_loader: DHSDataLoader,
+    calc: CalculationService,
+    region: int,
+    severity: str,
+    data_version: int
+) -> dict:
+    """Build the underweight response, cached per region/severity and data version."""
+    data = data_loader.load_derived("children_nutrition", "children", prepare_children_nutrition)
+    
+    valid = (data['hw71'] >= -600) & (data['hw71'] <= 600)
+    hw71 = data['hw71'][valid]
+    
+    if severity == "severe":
+        mask = hw71 < -300
+        label = "Severe Underweight (WAZ < -3 SD)"
+    elif severity == "moderate":
+        mask = (hw71 >= -300) & (hw71 < -200)
+        label = "Moderate Underweight (-3 <= WAZ < -2 SD)"
+    else:
+        mask = hw71 < -200
+        label = "Any Underweight (WAZ < -2 SD)"
+    
+    weights = data['v005'][valid]
+    region_mask = data['v024'][valid] == region
+    dist_codes = data['_dist_code'][valid]
+    
+    dist_values = calc.weighted_fraction_by_group(
+        mask[region_mask], weights[region_mask], dist_codes[region_mask]
+    )
+    districts_data = {
+        dist_name: dist_values[dist_code]
+        for dist_code, dist_name in get_district_map(region).items()
+        if dist_code in dist_values
+    }
+    
+    province_val = calc.weighted_fraction(mask[region_mask], weights[region_mask])
+    national_val = calc.weighted_fraction(mask, weights)
+    
+    return format_indicator_response(
+        indicator_name=label,
+        unit="Percentage",
+        districts_data=districts_data,
+        province_value=province_val,
+        province_code=region,
+        national_value=national_val,
+        population_type="Children under 5 years"
+    )
 
 
 @router.get("/underweight", response_model=IndicatorResponse)
@@ -163,51 +295,49 @@ async def get_underweight(
     - Underweight: WAZ < -2 SD
     - Severely underweight: WAZ < -3 SD
     """
-    try:
-        df = data_loader.load_dataset("children")
-        
-        df = df[(df['b5'] == 1) & (df['b19'] < 60)].copy()
-        
-        df['hw71'] = pd.to_numeric(df['hw71'], errors='coerce')
-        df = df[(df['hw71'] >= -600) & (df['hw71'] <= 600)].copy()
-        
-        if severity == "severe":
-            df['indicator'] = (df['hw71'] < -300).astype(int)
-            label = "Severe Underweight (WAZ < -3 SD)"
-        elif severity == "moderate":
-            df['indicator'] = ((df['hw71'] >= -300) & (df['hw71'] < -200)).astype(int)
-            label = "Moderate Underweight (-3 <= WAZ < -2 SD)"
-        else:
-            df['indicator'] = (df['hw71'] < -200).astype(int)
-            label = "Any Underweight (WAZ < -2 SD)"
-        
-        region_df = df[df['v024'] == region.value].copy()
-        
-        province_key = get_province_key(region.value)
-        district_map = DISTRICT_MAPS.get(province_key, {})
-        dist_col = calc.get_district_column(region_df)
-        
-        districts_data = {}
-        for dist_code, dist_name in district_map.items():
-            dist_df = region_df[pd.to_numeric(region_df[dist_col], errors='coerce') == dist_code]
-            if not dist_df.empty:
-                districts_data[dist_name] = calc.weighted_percentage(dist_df, 'indicator', weight_col='v005')
-        
-        province_val = calc.weighted_percentage(region_df, 'indicator', weight_col='v005')
-        national_val = calc.weighted_percentage(df, 'indicator', weight_col='v005')
-        
-        return format_indicator_response(
-            indicator_name=label,
-            unit="Percentage",
-            districts_data=districts_data,
-            province_value=province_val,
-            province_code=region.value,
-            national_value=national_val,
-            population_type="Children under 5 years"
-        )
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await asyncio.to_thread(_compute_underweight, data_loader, calc, region.value, severity, data_loader.version)
+
+
+@lru_cache(maxsize=256)
+def _compute_overweight_children(
+    data_loader: DHSDataLoader,
+    calc: CalculationService,
+    region: int,
+    data_version: int
+) -> dict:
+    """Build the overweight children response, cached per region and data version."""
+    data = data_loader.load_derived("children_nutrition", "children", prepare_children_nutrition)
+    
+    valid = (data['hw72'] >= -500) & (data['hw72'] <= 500)
+    hw72 = data['hw72'][valid]
+    
+    mask = hw72 > 200  # > +2 SD
+    
+    weights = data['v005'][valid]
+    region_mask = data['v024'][valid] == region
+    dist_codes = data['_dist_code'][valid]
+    
+    dist_values = calc.weighted_fraction_by_group(
+        mask[region_mask], weights[region_mask], dist_codes[region_mask]
+    )
+    districts_data = {
+        dist_name: dist_values[dist_code]
+        for dist_code, dist_name in get_district_map(region).items()
+        if dist_code in dist_values
+    }
+    
+    province_val = calc.weighted_fraction(mask[region_mask], weights[region_mask])
+    national_val = calc.weighted_fraction(mask, weights)
+    
+    return format_indicator_response(
+        indicator_name="Overweight (WHZ > +2 SD)",
+        unit="Percentage",
+        districts_data=districts_data,
+        province_value=province_val,
+        province_code=region,
+        national_value=national_val,
+        population_type="Children under 5 years"
+    )
 
 
 @router.get("/overweight-children", response_model=IndicatorResponse)
@@ -221,43 +351,58 @@ async def get_overweight_children(
     
     hw72: Weight-for-height (WHZ > +2 SD)
     """
-    try:
-        df = data_loader.load_dataset("children")
-        
-        df = df[(df['b5'] == 1) & (df['b19'] < 60)].copy()
-        
-        df['hw72'] = pd.to_numeric(df['hw72'], errors='coerce')
-        df = df[(df['hw72'] >= -500) & (df['hw72'] <= 500)].copy()
-        
-        df['indicator'] = (df['hw72'] > 200).astype(int)  # > +2 SD
-        
-        region_df = df[df['v024'] == region.value].copy()
-        
-        province_key = get_province_key(region.value)
-        district_map = DISTRICT_MAPS.get(province_key, {})
-        dist_col = calc.get_district_column(region_df)
-        
-        districts_data = {}
-        for dist_code, dist_name in district_map.items():
-            dist_df = region_df[pd.to_numeric(region_df[dist_col], errors='coerce') == dist_code]
-            if not dist_df.empty:
-                districts_data[dist_name] = calc.weighted_percentage(dist_df, 'indicator', weight_col='v005')
-        
-        province_val = calc.weighted_percentage(region_df, 'indicator', weight_col='v005')
-        national_val = calc.weighted_percentage(df, 'indicator', weight_col='v005')
-        
-        return format_indicator_response(
-            indicator_name="Overweight (WHZ > +2 SD)",
-            unit="Percentage",
-            districts_data=districts_data,
-            province_value=province_val,
-            province_code=region.value,
-            national_value=national_val,
-            population_type="Children under 5 years"
-        )
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await asyncio.to_thread(_compute_overweight_children, data_loader, calc, region.value, data_loader.version)
+
+
+@lru_cache(maxsize=256)
+def _compute_women_bmi(
+    data_loader: DHSDataLoader,
+    calc: CalculationService,
+    region: int,
+    category: str,
+    data_version: int
+) -> dict:
+    """Build the women bmi response, cached per region/category and data version."""
+    category_map = {
+        'underweight': (0, 'Underweight (BMI < 18.5)'),
+        'normal': (1, 'Normal (18.5 <= BMI < 25)'),
+        'overweight': (2, 'Overweight (25 <= BMI < 30)'),
+        'obese': (3, 'Obese (BMI >= 30)'),
+    }
+    
+    if category not in category_map:
+        raise HTTPException(status_code=400, detail=f"Invalid category. Choose from: {list(category_map.keys())}")
+    
+    bucket, label = category_map[category]
+    
+    data = data_loader.load_derived("women_bmi", "women", prepare_women_bmi)
+    mask = data['_bmi_bucket'] == bucket
+    
+    weights = data['v005']
+    region_mask = data['v024'] == region
+    dist_codes = data['_dist_code']
+    
+    dist_values = calc.weighted_fraction_by_group(
+        mask[region_mask], weights[region_mask], dist_codes[region_mask]
+    )
+    districts_data = {
+        dist_name: dist_values[dist_code]
+        for dist_code, dist_name in get_district_map(region).items()
+        if dist_code in dist_values
+    }
+    
+    province_val = calc.weighted_fraction(mask[region_mask], weights[region_mask])
+    national_val = calc.weighted_fraction(mask, weights)
+    
+    return format_indicator_response(
+        indicator_name=label,
+        unit="Percentage",
+        districts_data=districts_data,
+        province_value=province_val,
+        province_code=region,
+        national_value=national_val,
+        population_type="Non-pregnant women 15-49"
+    )
 
 
 @router.get("/women-bmi", response_model=IndicatorResponse)
@@ -276,56 +421,58 @@ async def get_women_bmi(
     - Overweight: 25.0 <= BMI < 30.0
     - Obese: BMI >= 30.0
     """
-    try:
-        df = data_loader.load_dataset("women")
-        
-        # Filter: Non-pregnant women
-        df = df[df['v213'] != 1].copy()  # v213=1 means currently pregnant
-        
-        df['v445'] = pd.to_numeric(df['v445'], errors='coerce')
-        # Valid BMI range (exclude flagged values)
-        df = df[(df['v445'] >= 1200) & (df['v445'] <= 6000)].copy()
-        
-        category_map = {
-            'underweight': (lambda x: x < 1850, 'Underweight (BMI < 18.5)'),
-            'normal': (lambda x: (x >= 1850) & (x < 2500), 'Normal (18.5 <= BMI < 25)'),
-            'overweight': (lambda x: (x >= 2500) & (x < 3000), 'Overweight (25 <= BMI < 30)'),
-            'obese': (lambda x: x >= 3000, 'Obese (BMI >= 30)'),
-        }
-        
-        if category not in category_map:
-            raise HTTPException(status_code=400, detail=f"Invalid category. Choose from: {list(category_map.keys())}")
-        
-        condition, label = category_map[category]
-        df['indicator'] = condition(df['v445']).astype(int)
-        
-        region_df = df[df['v024'] == region.value].copy()
-        
-        province_key = get_province_key(region.value)
-        district_map = DISTRICT_MAPS.get(province_key, {})
-        dist_col = calc.get_district_column(region_df)
-        
-        districts_data = {}
-        for dist_code, dist_name in district_map.items():
-            dist_df = region_df[pd.to_numeric(region_df[dist_col], errors='coerce') == dist_code]
-            if not dist_df.empty:
-                districts_data[dist_name] = calc.weighted_percentage(dist_df, 'indicator', weight_col='v005')
-        
-        province_val = calc.weighted_percentage(region_df, 'indicator', weight_col='v005')
-        national_val = calc.weighted_percentage(df, 'indicator', weight_col='v005')
-        
-        return format_indicator_response(
-            indicator_name=label,
-            unit="Percentage",
-            districts_data=districts_data,
-            province_value=province_val,
-            province_code=region.value,
-            national_value=national_val,
-            population_type="Non-pregnant women 15-49"
-        )
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await asyncio.to_thread(_compute_women_bmi, data_loader, calc, region.value, category, data_loader.version)
+
+
+@lru_cache(maxsize=256)
+def _compute_anemia_women(
+    data_loader: DHSDataLoader,
+    calc: CalculationService,
+    region: int,
+    severity: str,
+    data_version: int
+) -> dict:
+    """Build the anemia women response, cached per region/severity and data version."""
+    severity_map = {
+        'any': ('_anemia_any', 'Any Anemia'),
+        'mild': ('_anemia_mild', 'Mild Anemia'),
+        'moderate': ('_anemia_moderate', 'Moderate Anemia'),
+        'severe': ('_anemia_severe', 'Severe Anemia'),
+    }
+    
+    if severity not in severity_map:
+        raise HTTPException(status_code=400, detail=f"Invalid severity. Choose from: {list(severity_map.keys())}")
+    
+    mask_name, label = severity_map[severity]
+    
+    data = data_loader.load_derived("women_anemia", "women", prepare_women_anemia)
+    mask = data[mask_name]
+    
+    weights = data['v005']
+    region_mask = data['v024'] == region
+    dist_codes = data['_dist_code']
+    
+    dist_values = calc.weighted_fraction_by_group(
+        mask[region_mask], weights[region_mask], dist_codes[region_mask]
+    )
+    districts_data = {
+        dist_name: dist_values[dist_code]
+        for dist_code, dist_name in get_district_map(region).items()
+        if dist_code in dist_values
+    }
+    
+    province_val = calc.weighted_fraction(mask[region_mask], weights[region_mask])
+    national_val = calc.weighted_fraction(mask, weights)
+    
+    return format_indicator_response(
+        indicator_name=label,
+        unit="Percentage",
+        districts_data=districts_data,
+        province_value=province_val,
+        province_code=region,
+        national_value=national_val,
+        population_type="Women 15-49"
+    )
 
 
 @router.get("/anemia-women", response_model=IndicatorResponse)
@@ -344,48 +491,4 @@ async def get_anemia_women(
     - 3: Mild (10.0-11.9 g/dl)
     - 4: Not anemic (>=12.0 g/dl)
     """
-    try:
-        df = data_loader.load_dataset("women")
-        
-        df['v457'] = pd.to_numeric(df['v457'], errors='coerce').fillna(0)
-        
-        severity_map = {
-            'any': (lambda x: x.isin([1, 2, 3]), 'Any Anemia'),
-            'mild': (lambda x: x == 3, 'Mild Anemia'),
-            'moderate': (lambda x: x == 2, 'Moderate Anemia'),
-            'severe': (lambda x: x == 1, 'Severe Anemia'),
-        }
-        
-        if severity not in severity_map:
-            raise HTTPException(status_code=400, detail=f"Invalid severity. Choose from: {list(severity_map.keys())}")
-        
-        condition, label = severity_map[severity]
-        df['indicator'] = condition(df['v457']).astype(int)
-        
-        region_df = df[df['v024'] == region.value].copy()
-        
-        province_key = get_province_key(region.value)
-        district_map = DISTRICT_MAPS.get(province_key, {})
-        dist_col = calc.get_district_column(region_df)
-        
-        districts_data = {}
-        for dist_code, dist_name in district_map.items():
-            dist_df = region_df[pd.to_numeric(region_df[dist_col], errors='coerce') == dist_code]
-            if not dist_df.empty:
-                districts_data[dist_name] = calc.weighted_percentage(dist_df, 'indicator', weight_col='v005')
-        
-        province_val = calc.weighted_percentage(region_df, 'indicator', weight_col='v005')
-        national_val = calc.weighted_percentage(df, 'indicator', weight_col='v005')
-        
-        return format_indicator_response(
-            indicator_name=label,
-            unit="Percentage",
-            districts_data=districts_data,
-            province_value=province_val,
-            province_code=region.value,
-            national_value=national_val,
-            population_type="Women 15-49"
-        )
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await asyncio.to_thread(_compute_anemia_women, data_loader, calc, region.value, severity, data_loader.version)
@@ -3,17 +3,19 @@ Chapter 8: Malaria
 Endpoints for ITN usage, malaria testing, and treatment.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from typing import Dict
+from functools import lru_cache
+import asyncio
 import numpy as np
 import pandas as pd
 
-from app.dependencies import get_data_loader, get_calculation_service
+from app.dependencies import get_data_loader, get_calculation_service, require_columns
 from app.services.data_loader import DHSDataLoader
-from app.services.calculations import CalculationService
+from app.services.calculations import CalculationService, IndicatorSpec
+from app.services.indicators import run_binary_indicator
 from app.models.schemas import IndicatorResponse, RegionCode
-from app.config import DISTRICT_MAPS, PROVINCES
-from app.utils.helpers import format_indicator_response, get_province_key
+from app.utils.helpers import format_indicator_response, get_district_map
 
 router = APIRouter(
     prefix="/chapter8",
@@ -22,6 +24,232 @@ router = APIRouter(
 )
 
 
+def pregnant_slept_itn(df: pd.DataFrame) -> pd.Series:
+    """
+    ITN use among pregnant women.
+    s1108na: Slept under any net last night (women's file), falling back to
+    the standard net variable v461 when it is not available.
+    """
+    if 's1108na' in df.columns:
+        return df['s1108na'] == 1
+    if 'v461' in df.columns:
+        return df['v461'] == 1
+    return pd.Series(False, index=df.index)
+
+
+def any_antimalarial(df: pd.DataFrame) -> pd.Series:
+    """Any antimalarial drug given (ml13a-ml13h)"""
+    antimalarial_cols = [f'ml13{chr(97+i)}' for i in range(8)]  # ml13a to ml13h
+    available_cols = [c for c in antimalarial_cols if c in df.columns]
+    if not available_cols:
+        return pd.Series(False, index=df.index)
+    # One byte per drug flag; any() short-circuits per row instead of summing floats
+    values = np.stack([df[col].fillna(0).to_numpy(np.uint8) for col in available_cols], axis=1)
+    return pd.Series(values.any(axis=1), index=df.index)
+
+
+ITN_OWNERSHIP = IndicatorSpec(
+    name="itn_ownership",
+    dataset="household",
+    population=lambda df: df['hv015'] == 1,  # Completed interviews
+    indicator=lambda df: df['hml1'] >= 1,
+    region_col='hv024',
+    weight_col='hv005',
+    columns=('hv015', 'hml1'),
+)
+
+
+def prepare_itn_person(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Build the de facto population frame shared by the ITN usage indicators.
+    Weights are pre-multiplied into each numerator/denominator column, so a
+    single grouped sum yields every ITN usage rate at once.
+    Expects the person recode already restricted to ITN_PERSON_COLUMNS and
+    the de facto population (ITN_PERSON_FILTERS).
+    """
+    dist_col = CalculationService.get_district_column(df)
+    
+    weight = df['hv005'].to_numpy(np.float64)
+    slept_itn = (df['hml12'] == 1).to_numpy()  # hml12: Slept under an ITN last night
+    under5 = (df['hv105'] < 5).to_numpy()
+    
+    return pd.DataFrame({
+        'region': df['hv024'].to_numpy(np.int16),
+        'district': pd.to_numeric(df[dist_col], errors='coerce').fillna(0).to_numpy(np.int16),
+        'slept_itn_all': np.where(slept_itn, weight, 0.0),
+        'slept_itn_u5': np.where(slept_itn & under5, weight, 0.0),
+        'weight': weight,
+        'weight_u5': np.where(under5, weight, 0.0),
+    })
+
+
+# Person recode columns needed by prepare_itn_person (plus the district column)
+ITN_PERSON_COLUMNS = ['hv024', 'hv005', 'hv105', 'hml12']
+
+# Filter: De facto population
+ITN_PERSON_FILTERS = [('hv103', '=', 1)]
+
+
+# Person-level ITN usage: (numerator column, denominator column, label, population)
+ITN_USAGE_INDICATORS = {
+    "itn_usage_population": (
+        'slept_itn_all', 'weight',
+        "Population Sleeping Under ITN", "De facto household population"
+    ),
+    "itn_usage_children": (
+        'slept_itn_u5', 'weight_u5',
+        "Children Under 5 Sleeping Under ITN", "De facto children under 5"
+    ),
+}
+
+ITN_USAGE_PREGNANT = IndicatorSpec(
+    name="itn_usage_pregnant",
+    dataset="women",
+    population=lambda df: df['v213'] == 1,  # Currently pregnant women
+    indicator=pregnant_slept_itn,
+    columns=('v213',),
+)
+
+# Children 6-59 months with a valid (0/1) result for the given test column
+MALARIA_TEST_SPECS = {
+    test_type: IndicatorSpec(
+        name=f"malaria_prevalence_{test_type}",
+        dataset="children",
+        population=lambda df, col=col: (
+            (df['b5'] == 1) & (df['b19'] >= 6) & (df['b19'] < 60) & df[col].isin([0, 1])
+        ),
+        indicator=lambda df, col=col: df[col] == 1,
+        columns=('b5', 'b19', col),
+    )
+    for test_type, col in (("rdt", "hml32"), ("microscopy", "hml35"))
+}
+
+
+def living_children_with_fever(df: pd.DataFrame) -> pd.Series:
+    """Living children under 5 with fever in the last two weeks"""
+    return (df['b5'] == 1) & (df['b19'] < 60) & (df['h22'] == 1)
+
+
+FEVER_COLUMNS = ('b5', 'b19', 'h22')
+
+FEVER_TREATMENT_SPECS = {
+    "any_antimalarial": IndicatorSpec(
+        name="fever_treatment_any_antimalarial",
+        dataset="children",
+        population=living_children_with_fever,
+        indicator=any_antimalarial,
+        columns=FEVER_COLUMNS,
+    ),
+    # Artemisinin-based combination therapy (ml13e typically)
+    "act": IndicatorSpec(
+        name="fever_treatment_act",
+        dataset="children",
+        population=living_children_with_fever,
+        indicator=lambda df: df['ml13e'] == 1,
+        columns=FEVER_COLUMNS + ('ml13e',),
+    ),
+    "blood_test": IndicatorSpec(
+        name="fever_treatment_blood_test",
+        dataset="children",
+        population=living_children_with_fever,
+        indicator=lambda df: df['h47'] == 1,
+        columns=FEVER_COLUMNS + ('h47',),
+    ),
+}
+
+
+@lru_cache(maxsize=256)
+def _compute_itn_ownership(
+    data_loader: DHSDataLoader,
+    calc: CalculationService,
+    region: int,
+    data_version: int
+) -> dict:
+    """Build the household ITN ownership response, cached per region and data version."""
+    spec = ITN_OWNERSHIP
+    require_columns(data_loader, spec)
+    
+    return run_binary_indicator(
+        data_loader, calc, spec, region,
+        label="Households with at least one ITN",
+        population_type="Households"
+    )
+
+
+@lru_cache(maxsize=64)
+def _compute_itn_usage(
+    data_loader: DHSDataLoader,
+    calc: CalculationService,
+    region: int,
+    data_version: int
+) -> Dict[str, dict]:
+    """Build the person-level ITN usage responses for a region, cached per data version."""
+    district_map = get_district_map(region)
+    dist_codes, dist_names = list(district_map), list(district_map.values())
+    bundle = {}
+    
+    # Person-level ITN usage: one (region, district) grouped sum covers every
+    # numerator and denominator at district, province and national level
+    person = data_loader.load_derived(
+        "itn_person", "person", prepare_itn_person,
+        columns=ITN_PERSON_COLUMNS + [data_loader.get_district_column("person")],
+        filters=ITN_PERSON_FILTERS
+    )
+    
+    sum_cols = ['slept_itn_all', 'slept_itn_u5', 'weight', 'weight_u5']
+    group_sums = person.groupby(['region', 'district'])[sum_cols].sum()
+    national_sums = group_sums.sum()
+    region_sums = group_sums[group_sums.index.get_level_values('region') == region].droplevel('region')
+    district_sums = region_sums.reindex(dist_codes)
+    province_sums = region_sums.sum()
+    
+    for key, (num_col, den_col, label, population_type) in ITN_USAGE_INDICATORS.items():
+        bundle[key] = format_indicator_response(
+            indicator_name=label,
+            unit="Percentage",
+            districts_data={
+                dist_name: calc.ratio_percentage(num, den)
+                for dist_name, num, den in zip(
+                    dist_names, district_sums[num_col].tolist(), district_sums[den_col].tolist()
+                )
+                if den > 0
+            },
+            province_value=calc.ratio_percentage(province_sums[num_col], province_sums[den_col]),
+            province_code=region,
+            national_value=calc.ratio_percentage(national_sums[num_col], national_sums[den_col]),
+            population_type=population_type
+        )
+    
+    return bundle
+
+
+def _compute_itn_bundle(
+    data_loader: DHSDataLoader,
+    calc: CalculationService,
+    region: int,
+    data_version: int
+) -> Dict[str, dict]:
+    """Combine the cached ITN ownership and usage responses for a region."""
+    return {
+        "itn_ownership": _compute_itn_ownership(data_loader, calc, region, data_version),
+        **_compute_itn_usage(data_loader, calc, region, data_version),
+    }
+
+
+@router.get("/itn-bundle", response_model=Dict[str, IndicatorResponse])
+async def get_itn_bundle(
+    region: RegionCode = Query(default=RegionCode.EASTERN),
+    data_loader: DHSDataLoader = Depends(get_data_loader),
+    calc: CalculationService = Depends(get_calculation_service)
+):
+    """
+    Get ITN ownership and ITN usage (population, children under 5) in one response.
+    
+    Keys: itn_ownership, itn_usage_population, itn_usage_children
+    """
+    return await asyncio.to_thread(_compute_itn_bundle, data_loader, calc, region.value, data_loader.version)
+
+
 @router.get("/itn-ownership", response_model=IndicatorResponse)
 async def get_itn_ownership(
     region: RegionCode = Query(default=RegionCode.EASTERN),
@@ -33,42 +261,7 @@ async def get_itn_ownership(
     
     hml1: Number of mosquito nets in household
     """
-    try:
-        df = data_loader.load_dataset("household")
-        
-        # Filter for completed interviews
-        df = df[df['hv015'] == 1].copy()
-        
-        df['hml1'] = pd.to_numeric(df['hml1'], errors='coerce').fillna(0)
-        df['has_itn'] = (df['hml1'] >= 1).astype(int)
-        
-        region_df = df[df['hv024'] == region.value].copy()
-        
-        province_key = get_province_key(region.value)
-        district_map = DISTRICT_MAPS.get(province_key, {})
-        dist_col = 'shdistrict' if 'shdistrict' in region_df.columns else 'hv001'
-        
-        districts_data = {}
-        for dist_code, dist_name in district_map.items():
-            dist_df = region_df[region_df[dist_col] == dist_code]
-            if not dist_df.empty:
-                districts_data[dist_name] = calc.weighted_percentage(dist_df, 'has_itn')
-        
-        province_val = calc.weighted_percentage(region_df, 'has_itn')
-        national_val = calc.weighted_percentage(df, 'has_itn')
-        
-        return format_indicator_response(
-            indicator_name="Households with at least one ITN",
-            unit="Percentage",
-            districts_data=districts_data,
-            province_value=province_val,
-            province_code=region.value,
-            national_value=national_val,
-            population_type="Households"
-        )
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await asyncio.to_thread(_compute_itn_ownership, data_loader, calc, region.value, data_loader.version)
 
 
 @router.get("/itn-usage-population", response_model=IndicatorResponse)
@@ -82,42 +275,8 @@ async def get_itn_usage_population(
     
     hml12: Slept under an ITN last night (1=Yes)
     """
-    try:
-        df = data_loader.load_dataset("person")
-        
-        # De facto population (slept in household last night)
-        df = df[df['hv103'] == 1].copy()
-        
-        df['hml12'] = pd.to_numeric(df['hml12'], errors='coerce').fillna(0)
-        df['slept_itn'] = (df['hml12'] == 1).astype(int)
-        
-        region_df = df[df['hv024'] == region.value].copy()
-        
-        province_key = get_province_key(region.value)
-        district_map = DISTRICT_MAPS.get(province_key, {})
-        dist_col = calc.get_district_column(region_df)
-        
-        districts_data = {}
-        for dist_code, dist_name in district_map.items():
-            dist_df = region_df[region_df[dist_col] == dist_code]
-            if not dist_df.empty:
-                districts_data[dist_name] = calc.weighted_percentage(dist_df, 'slept_itn')
-        
-        province_val = calc.weighted_percentage(region_df, 'slept_itn')
-        national_val = calc.weighted_percentage(df, 'slept_itn')
-        
-        return format_indicator_response(
-            indicator_name="Population Sleeping Under ITN",
-            unit="Percentage",
-            districts_data=districts_data,
-            province_value=province_val,
-            province_code=region.value,
-            national_value=national_val,
-            population_type="De facto household population"
-        )
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    bundle = await asyncio.to_thread(_compute_itn_usage, data_loader, calc, region.value, data_loader.version)
+    return bundle["itn_usage_population"]
 
 
 @router.get("/itn-usage-children", response_model=IndicatorResponse)
@@ -129,42 +288,26 @@ async def get_itn_usage_children(
     """
     Get percentage of children under 5 who slept under an ITN last night.
     """
-    try:
-        df = data_loader.load_dataset("person")
-        
-        # De facto children under 5
-        df = df[(df['hv103'] == 1) & (df['hv105'] < 5)].copy()
-        
-        df['hml12'] = pd.to_numeric(df['hml12'], errors='coerce').fillna(0)
-        df['slept_itn'] = (df['hml12'] == 1).astype(int)
-        
-        region_df = df[df['hv024'] == region.value].copy()
-        
-        province_key = get_province_key(region.value)
-        district_map = DISTRICT_MAPS.get(province_key, {})
-        dist_col = calc.get_district_column(region_df)
-        
-        districts_data = {}
-        for dist_code, dist_name in district_map.items():
-            dist_df = region_df[region_df[dist_col] == dist_code]
-            if not dist_df.empty:
-                districts_data[dist_name] = calc.weighted_percentage(dist_df, 'slept_itn')
-        
-        province_val = calc.weighted_percentage(region_df, 'slept_itn')
-        national_val = calc.weighted_percentage(df, 'slept_itn')
-        
-        return format_indicator_response(
-            indicator_name="Children Under 5 Sleeping Under ITN",
-            unit="Percentage",
-            districts_data=districts_data,
-            province_value=province_val,
-            province_code=region.value,
-            national_value=national_val,
-            population_type="De facto children under 5"
-        )
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    bundle = await asyncio.to_thread(_compute_itn_usage, data_loader, calc, region.value, data_loader.version)
+    return bundle["itn_usage_children"]
+
+
+@lru_cache(maxsize=256)
+def _compute_itn_usage_pregnant(
+    data_loader: DHSDataLoader,
+    calc: CalculationService,
+    region: int,
+    data_version: int
+) -> dict:
+    """Build the pregnant women ITN usage response, cached per region and data version."""
+    spec = ITN_USAGE_PREGNANT
+    require_columns(data_loader, spec)
+    
+    return run_binary_indicator(
+        data_loader, calc, spec, region,
+        label="Pregnant Women Sleeping Under ITN",
+        population_type="Currently pregnant women"
+    )
 
 
 @router.get("/itn-usage-pregnant", response_model=IndicatorResponse)
@@ -176,52 +319,32 @@ async def get_itn_usage_pregnant(
     """
     Get percentage of pregnant women who slept under an ITN last night.
     """
-    try:
-        df = data_loader.load_dataset("women")
-        
-        # Currently pregnant women
-        df = df[df['v213'] == 1].copy()
-        
-        # s1108na: Slept under any net last night (women's file)
-        # or use merged data from PR file
-        
-        # Try v461 for net usage in women's file
-        if 's1108na' in df.columns:
-            df['slept_itn'] = (df['s1108na'] == 1).astype(int)
-        else:
-            # Alternative: use standard net variable
-            df['slept_itn'] = 0
-            if 'v461' in df.columns:
-                df['v461'] = pd.to_numeric(df['v461'], errors='coerce').fillna(0)
-                df['slept_itn'] = (df['v461'] == 1).astype(int)
-        
-        region_df = df[df['v024'] == region.value].copy()
-        
-        province_key = get_province_key(region.value)
-        district_map = DISTRICT_MAPS.get(province_key, {})
-        dist_col = calc.get_district_column(region_df)
-        
-        districts_data = {}
-        for dist_code, dist_name in district_map.items():
-            dist_df = region_df[pd.to_numeric(region_df[dist_col], errors='coerce') == dist_code]
-            if not dist_df.empty:
-                districts_data[dist_name] = calc.weighted_percentage(dist_df, 'slept_itn', weight_col='v005')
-        
-        province_val = calc.weighted_percentage(region_df, 'slept_itn', weight_col='v005')
-        national_val = calc.weighted_percentage(df, 'slept_itn', weight_col='v005')
-        
-        return format_indicator_response(
-            indicator_name="Pregnant Women Sleeping Under ITN",
-            unit="Percentage",
-            districts_data=districts_data,
-            province_value=province_val,
-            province_code=region.value,
-            national_value=national_val,
-            population_type="Currently pregnant women"
-        )
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await asyncio.to_thread(_compute_itn_usage_pregnant, data_loader, calc, region.value, data_loader.version)
+
+
+@lru_cache(maxsize=256)
+def _compute_malaria_prevalence_children(
+    data_loader: DHSDataLoader,
+    calc: CalculationService,
+    region: int,
+    test_type: str,
+    data_version: int
+) -> dict:
+    """Build the malaria prevalence response, cached per region/test_type and data version."""
+    if test_type == "rdt":
+        spec = MALARIA_TEST_SPECS["rdt"]
+        label = "Malaria Prevalence (RDT)"
+    else:  # microscopy
+        spec = MALARIA_TEST_SPECS["microscopy"]
+        label = "Malaria Prevalence (Microscopy)"
+    
+    require_columns(data_loader, spec)
+    
+    return run_binary_indicator(
+        data_loader, calc, spec, region,
+        label=label,
+        population_type="Children 6-59 months"
+    )
 
 
 @router.get("/malaria-prevalence-children", response_model=IndicatorResponse)
@@ -237,50 +360,35 @@ async def get_malaria_prevalence_children(
     hml32: Result of RDT (0=Negative, 1=Positive)
     hml35: Result of microscopy (0=Negative, 1=Positive)
     """
-    try:
-        df = data_loader.load_dataset("children")
-        
-        # Children 6-59 months
-        df = df[(df['b5'] == 1) & (df['b19'] >= 6) & (df['b19'] < 60)].copy()
-        
-        if test_type == "rdt":
-            df['hml32'] = pd.to_numeric(df['hml32'], errors='coerce')
-            df = df[df['hml32'].isin([0, 1])].copy()
-            df['indicator'] = (df['hml32'] == 1).astype(int)
-            label = "Malaria Prevalence (RDT)"
-        else:  # microscopy
-            df['hml35'] = pd.to_numeric(df['hml35'], errors='coerce')
-            df = df[df['hml35'].isin([0, 1])].copy()
-            df['indicator'] = (df['hml35'] == 1).astype(int)
-            label = "Malaria Prevalence (Microscopy)"
-        
-        region_df = df[df['v024'] == region.value].copy()
-        
-        province_key = get_province_key(region.value)
-        district_map = DISTRICT_MAPS.get(province_key, {})
-        dist_col = calc.get_district_column(region_df)
-        
-        districts_data = {}
-        for dist_code, dist_name in district_map.items():
-            dist_df = region_df[pd.to_numeric(region_df[dist_col], errors='coerce') == dist_code]
-            if not dist_df.empty:
-                districts_data[dist_name] = calc.weighted_percentage(dist_df, 'indicator', weight_col='v005')
-        
-        province_val = calc.weighted_percentage(region_df, 'indicator', weight_col='v005')
-        national_val = calc.weighted_percentage(df, 'indicator', weight_col='v005')
-        
-        return format_indicator_response(
-            indicator_name=label,
-            unit="Percentage",
-            districts_data=districts_data,
-            province_value=province_val,
-            province_code=region.value,
-            national_value=national_val,
-            population_type="Children 6-59 months"
-        )
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await asyncio.to_thread(_compute_malaria_prevalence_children, data_loader, calc, region.value, test_type, data_loader.version)
+
+
+@lru_cache(maxsize=256)
+def _compute_fever_treatment(
+    data_loader: DHSDataLoader,
+    calc: CalculationService,
+    region: int,
+    treatment: str,
+    data_version: int
+) -> dict:
+    """Build the fever treatment response, cached per region/treatment and data version."""
+    if treatment == "any_antimalarial":
+        spec = FEVER_TREATMENT_SPECS["any_antimalarial"]
+        label = "Received Any Antimalarial"
+    elif treatment == "act":
+        spec = FEVER_TREATMENT_SPECS["act"]
+        label = "Received ACT"
+    else:  # blood_test
+        spec = FEVER_TREATMENT_SPECS["blood_test"]
+        label = "Blood Taken for Testing"
+    
+    require_columns(data_loader, spec)
+    
+    return run_binary_indicator(
+        data_loader, calc, spec, region,
+        label=label,
+        population_type="Children under 5 with fever"
+    )
 
 
 @router.get("/fever-treatment", response_model=IndicatorResponse)
@@ -296,59 +404,4 @@ async def get_fever_treatment(
     ml13a-ml13h: Antimalarial drugs given
     h47: Blood taken for testing
     """
-    try:
-        df = data_loader.load_dataset("children")
-        
-        # Living children under 5 with fever
-        df = df[(df['b5'] == 1) & (df['b19'] < 60) & (df['h22'] == 1)].copy()
-        
-        if treatment == "any_antimalarial":
-            # Check for any antimalarial drug (ml13a-ml13h)
-            antimalarial_cols = [f'ml13{chr(97+i)}' for i in range(8)]  # ml13a to ml13h
-            for col in antimalarial_cols:
-                if col in df.columns:
-                    df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-            
-            available_cols = [c for c in antimalarial_cols if c in df.columns]
-            if available_cols:
-                df['indicator'] = (df[available_cols].sum(axis=1) > 0).astype(int)
-            else:
-                df['indicator'] = 0
-            label = "Received Any Antimalarial"
-        elif treatment == "act":
-            # Artemisinin-based combination therapy (ml13e typically)
-            df['ml13e'] = pd.to_numeric(df.get('ml13e', 0), errors='coerce').fillna(0)
-            df['indicator'] = (df['ml13e'] == 1).astype(int)
-            label = "Received ACT"
-        else:  # blood_test
-            df['h47'] = pd.to_numeric(df['h47'], errors='coerce').fillna(0)
-            df['indicator'] = (df['h47'] == 1).astype(int)
-            label = "Blood Taken for Testing"
-        
-        region_df = df[df['v024'] == region.value].copy()
-        
-        province_key = get_province_key(region.value)
-        district_map = DISTRICT_MAPS.get(province_key, {})
-        dist_col = calc.get_district_column(region_df)
-        
-        districts_data = {}
-        for dist_code, dist_name in district_map.items():
-            dist_df = region_df[pd.to_numeric(region_df[dist_col], errors='coerce') == dist_code]
-            if not dist_df.empty:
-                districts_data[dist_name] = calc.weighted_percentage(dist_df, 'indicator', weight_col='v005')
-        
-        province_val = calc.weighted_percentage(region_df, 'indicator', weight_col='v005')
-        national_val = calc.weighted_percentage(df, 'indicator', weight_col='v005')
-        
-        return format_indicator_response(
-            indicator_name=label,
-            unit="Percentage",
-            districts_data=districts_data,
-            province_value=province_val,
-            province_code=region.value,
-            national_value=national_val,
-            population_type="Children under 5 with fever"
-        )
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await asyncio.to_thread(_compute_fever_treatment, data_loader, calc, region.value, treatment, data_loader.version)
@@ -3,17 +3,18 @@ Chapter 9: HIV/AIDS and STIs
 Endpoints for HIV knowledge, testing, sexual behavior, and STIs.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from typing import Dict
+from functools import lru_cache
+import asyncio
 import numpy as np
 import pandas as pd
 
-from app.dependencies import get_data_loader, get_calculation_service
+from app.dependencies import get_data_loader, get_calculation_service, require_columns
 from app.services.data_loader import DHSDataLoader
-from app.services.calculations import CalculationService
+from app.services.calculations import CalculationService, IndicatorSpec
+from app.services.indicators import run_binary_indicator
 from app.models.schemas import IndicatorResponse, RegionCode
-from app.config import DISTRICT_MAPS, PROVINCES
-from app.utils.helpers import format_indicator_response, get_province_key
 
 router = APIRouter(
     prefix="/chapter9",
@@ -22,6 +23,143 @@ router = APIRouter(
 )
 
 
+# Column names in the women's recode (v*); the men's recode uses the same
+# names with an "m" prefix (mv*)
+FEMALE_COLS = {
+    'region': 'v024',
+    'weight': 'v005',
+    'knows_condom_use': 'v754cp',      # Consistent condom use reduces risk
+    'knows_one_partner': 'v754dp',     # One uninfected partner reduces risk
+    'knows_healthy_looking': 'v756',   # Healthy-looking person can have HIV
+    'ever_tested': 'v781',
+    'tested_12_months': 'v783',
+    'partners_12_months': 'v766b',
+    'condom_last_sex': 'v761',
+    'had_sti': 'v763a',
+    'genital_discharge': 'v763b',
+    'genital_sore': 'v763c',
+}
+
+MALE_COLS = {key: f'm{col}' for key, col in FEMALE_COLS.items()}
+
+GENDER_COLS = {"women": FEMALE_COLS, "men": MALE_COLS}
+
+HIV_KNOWLEDGE_KEYS = ('knows_condom_use', 'knows_one_partner', 'knows_healthy_looking')
+
+STI_SYMPTOM_KEYS = ('had_sti', 'genital_discharge', 'genital_sore')
+
+
+def gender_spec(
+    name: str,
+    dataset: str,
+    indicator,
+    population=None,
+    keys=()
+) -> IndicatorSpec:
+    """
+    Build an indicator spec for the women's or men's recode.
+    The indicator and population callables receive the recode's column
+    dict (FEMALE_COLS or MALE_COLS); keys name the entries they read.
+    """
+    cols = GENDER_COLS[dataset]
+    return IndicatorSpec(
+        name=f"{name}_{dataset}",
+        dataset=dataset,
+        indicator=lambda df: indicator(df, cols),
+        population=(lambda df: population(df, cols)) if population else None,
+        region_col=cols['region'],
+        weight_col=cols['weight'],
+        columns=tuple(cols[key] for key in keys),
+    )
+
+
+def comprehensive_knowledge(df: pd.DataFrame, cols: Dict[str, str]) -> pd.Series:
+    """All comprehensive knowledge components answered correctly"""
+    answers = [df[cols[key]].to_numpy() == 1 for key in HIV_KNOWLEDGE_KEYS]
+    return pd.Series(np.logical_and.reduce(answers), index=df.index)
+
+
+def any_sti_symptom(df: pd.DataFrame, cols: Dict[str, str]) -> pd.Series:
+    """Had an STI, genital discharge or a genital sore/ulcer"""
+    symptoms = [df[cols[key]].to_numpy() == 1 for key in STI_SYMPTOM_KEYS]
+    return pd.Series(np.logical_or.reduce(symptoms), index=df.index)
+
+
+HIV_KNOWLEDGE_SPECS = {
+    dataset: gender_spec(
+        "hiv_knowledge_comprehensive", dataset, comprehensive_knowledge,
+        keys=HIV_KNOWLEDGE_KEYS
+    )
+    for dataset in GENDER_COLS
+}
+
+HIV_TESTING_SPECS = {
+    (dataset, timing): gender_spec(
+        f"hiv_testing_{timing}", dataset,
+        lambda df, cols, key=key: df[cols[key]] == 1,
+        keys=(key,)
+    )
+    for dataset in GENDER_COLS
+    for timing, key in (("ever", "ever_tested"), ("last_12_months", "tested_12_months"))
+}
+
+MULTIPLE_PARTNERS_SPECS = {
+    dataset: gender_spec(
+        "multiple_partners", dataset,
+        lambda df, cols: df[cols['partners_12_months']] >= 2,
+        keys=('partners_12_months',)
+    )
+    for dataset in GENDER_COLS
+}
+
+# Condom use at last sex, among those with 2+ partners in the last 12 months
+CONDOM_USE_SPECS = {
+    dataset: gender_spec(
+        "condom_use_multiple_partners", dataset,
+        lambda df, cols: df[cols['condom_last_sex']] == 1,
+        population=lambda df, cols: df[cols['partners_12_months']] >= 2,
+        keys=('condom_last_sex', 'partners_12_months')
+    )
+    for dataset in GENDER_COLS
+}
+
+STI_SYMPTOMS_SPECS = {
+    dataset: gender_spec("sti_symptoms", dataset, any_sti_symptom, keys=STI_SYMPTOM_KEYS)
+    for dataset in GENDER_COLS
+}
+
+CIRCUMCISION = IndicatorSpec(
+    name="circumcision",
+    dataset="men",
+    indicator=lambda df: df['mv483'] == 1,
+    region_col='mv024',
+    weight_col='mv005',
+    columns=('mv483',),
+)
+
+
+@lru_cache(maxsize=256)
+def _compute_hiv_knowledge_comprehensive(
+    data_loader: DHSDataLoader,
+    calc: CalculationService,
+    region: int,
+    gender: str,
+    data_version: int
+) -> dict:
+    """Build the comprehensive HIV knowledge response, cached per region/gender and data version."""
+    dataset = "women" if gender == "female" else "men"
+    spec = HIV_KNOWLEDGE_SPECS[dataset]
+    require_columns(data_loader, spec)
+    
+    gender_label = "Women" if gender == "female" else "Men"
+    
+    return run_binary_indicator(
+        data_loader, calc, spec, region,
+        label=f"Comprehensive HIV Knowledge ({gender_label})",
+        population_type=f"{gender_label} age 15-49"
+    )
+
+
 @router.get("/hiv-knowledge-comprehensive", response_model=IndicatorResponse)
 async def get_hiv_knowledge_comprehensive(
     region: RegionCode = Query(default=RegionCode.EASTERN),
@@ -38,56 +176,37 @@ async def get_hiv_knowledge_comprehensive(
     - Knowing that a healthy-looking person can have HIV (v756)
     - Rejecting two most common misconceptions
     """
-    try:
-        dataset = "women" if gender == "female" else "men"
-        df = data_loader.load_dataset(dataset)
-        
-        prefix = 'v' if gender == "female" else 'mv'
-        region_col = f'{prefix}024'
-        weight_col = f'{prefix}005'
-        
-        # Knowledge components
-        cols = [f'{prefix}754cp', f'{prefix}754dp', f'{prefix}756']
-        for col in cols:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-        
-        # Comprehensive: All correct answers
-        df['comprehensive'] = (
-            (df.get(f'{prefix}754cp', 0) == 1) &  # Condom use
-            (df.get(f'{prefix}754dp', 0) == 1) &  # One partner
-            (df.get(f'{prefix}756', 0) == 1)      # Healthy-looking can have HIV
-        ).astype(int)
-        
-        region_df = df[df[region_col] == region.value].copy()
-        
-        province_key = get_province_key(region.value)
-        district_map = DISTRICT_MAPS.get(province_key, {})
-        dist_col = calc.get_district_column(region_df)
-        
-        districts_data = {}
-        for dist_code, dist_name in district_map.items():
-            dist_df = region_df[pd.to_numeric(region_df[dist_col], errors='coerce') == dist_code]
-            if not dist_df.empty:
-                districts_data[dist_name] = calc.weighted_percentage(dist_df, 'comprehensive', weight_col=weight_col)
-        
-        province_val = calc.weighted_percentage(region_df, 'comprehensive', weight_col=weight_col)
-        national_val = calc.weighted_percentage(df, 'comprehensive', weight_col=weight_col)
-        
-        gender_label = "Women" if gender == "female" else "Men"
-        
-        return format_indicator_response(
-            indicator_name=f"Comprehensive HIV Knowledge ({gender_label})",
-            unit="Percentage",
-            districts_data=districts_data,
-            province_value=province_val,
-            province_code=region.value,
-            national_value=national_val,
-            population_type=f"{gender_label} age 15-49"
-        )
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await asyncio.to_thread(_compute_hiv_knowledge_comprehensive, data_loader, calc, region.value, gender, data_loader.version)
+
+
+@lru_cache(maxsize=256)
+def _compute_hiv_testing(
+    data_loader: DHSDataLoader,
+    calc: CalculationService,
+    region: int,
+    gender: str,
+    timing: str,
+    data_version: int
+) -> dict:
+    """Build the HIV testing response, cached per region/gender/timing and data version."""
+    dataset = "women" if gender == "female" else "men"
+    
+    if timing == "ever":
+        label = "Ever Tested for HIV"
+    else:  # last_12_months
+        timing = "last_12_months"
+        label = "Tested for HIV in Last 12 Months"
+    
+    spec = HIV_TESTING_SPECS[(dataset, timing)]
+    require_columns(data_loader, spec)
+    
+    gender_label = "Women" if gender == "female" else "Men"
+    
+    return run_binary_indicator(
+        data_loader, calc, spec, region,
+        label=f"{label} ({gender_label})",
+        population_type=f"{gender_label} age 15-49"
+    )
 
 
 @router.get("/hiv-testing", response_model=IndicatorResponse)
@@ -104,53 +223,29 @@ async def get_hiv_testing(
     v781: Ever been tested for HIV
     v783: Tested in last 12 months
     """
-    try:
-        dataset = "women" if gender == "female" else "men"
-        df = data_loader.load_dataset(dataset)
-        
-        prefix = 'v' if gender == "female" else 'mv'
-        region_col = f'{prefix}024'
-        weight_col = f'{prefix}005'
-        
-        if timing == "ever":
-            test_col = f'{prefix}781'
-            label = "Ever Tested for HIV"
-        else:  # last_12_months
-            test_col = f'{prefix}783'
-            label = "Tested for HIV in Last 12 Months"
-        
-        df[test_col] = pd.to_numeric(df.get(test_col, 0), errors='coerce').fillna(0)
-        df['indicator'] = (df[test_col] == 1).astype(int)
-        
-        region_df = df[df[region_col] == region.value].copy()
-        
-        province_key = get_province_key(region.value)
-        district_map = DISTRICT_MAPS.get(province_key, {})
-        dist_col = calc.get_district_column(region_df)
-        
-        districts_data = {}
-        for dist_code, dist_name in district_map.items():
-            dist_df = region_df[pd.to_numeric(region_df[dist_col], errors='coerce') == dist_code]
-            if not dist_df.empty:
-                districts_data[dist_name] = calc.weighted_percentage(dist_df, 'indicator', weight_col=weight_col)
-        
-        province_val = calc.weighted_percentage(region_df, 'indicator', weight_col=weight_col)
-        national_val = calc.weighted_percentage(df, 'indicator', weight_col=weight_col)
-        
-        gender_label = "Women" if gender == "female" else "Men"
-        
-        return format_indicator_response(
-            indicator_name=f"{label} ({gender_label})",
-            unit="Percentage",
-            districts_data=districts_data,
-            province_value=province_val,
-            province_code=region.value,
-            national_value=national_val,
-            population_type=f"{gender_label} age 15-49"
-        )
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await asyncio.to_thread(_compute_hiv_testing, data_loader, calc, region.value, gender, timing, data_loader.version)
+
+
+@lru_cache(maxsize=256)
+def _compute_multiple_partners(
+    data_loader: DHSDataLoader,
+    calc: CalculationService,
+    region: int,
+    gender: str,
+    data_version: int
+) -> dict:
+    """Build the multiple partners response, cached per region/gender and data version."""
+    dataset = "women" if gender == "female" else "men"
+    spec = MULTIPLE_PARTNERS_SPECS[dataset]
+    require_columns(data_loader, spec)
+    
+    gender_label = "Women" if gender == "female" else "Men"
+    
+    return run_binary_indicator(
+        data_loader, calc, spec, region,
+        label=f"Multiple Sexual Partners ({gender_label})",
+        population_type=f"{gender_label} age 15-49"
+    )
 
 
 @router.get("/multiple-partners", response_model=IndicatorResponse)
@@ -165,47 +260,29 @@ async def get_multiple_partners(
     
     v766b: Number of sexual partners in last 12 months
     """
-    try:
-        dataset = "women" if gender == "female" else "men"
-        df = data_loader.load_dataset(dataset)
-        
-        prefix = 'v' if gender == "female" else 'mv'
-        region_col = f'{prefix}024'
-        weight_col = f'{prefix}005'
-        partners_col = f'{prefix}766b'
-        
-        df[partners_col] = pd.to_numeric(df.get(partners_col, 0), errors='coerce').fillna(0)
-        df['multiple_partners'] = (df[partners_col] >= 2).astype(int)
-        
-        region_df = df[df[region_col] == region.value].copy()
-        
-        province_key = get_province_key(region.value)
-        district_map = DISTRICT_MAPS.get(province_key, {})
-        dist_col = calc.get_district_column(region_df)
-        
-        districts_data = {}
-        for dist_code, dist_name in district_map.items():
-            dist_df = region_df[pd.to_numeric(region_df[dist_col], errors='coerce') == dist_code]
-            if not dist_df.empty:
-                districts_data[dist_name] = calc.weighted_percentage(dist_df, 'multiple_partners', weight_col=weight_col)
-        
-        province_val = calc.weighted_percentage(region_df, 'multiple_partners', weight_col=weight_col)
-        national_val = calc.weighted_percentage(df, 'multiple_partners', weight_col=weight_col)
-        
-        gender_label = "Women" if gender == "female" else "Men"
-        
-        return format_indicator_response(
-            indicator_name=f"Multiple Sexual Partners ({gender_label})",
-            unit="Percentage",
-            districts_data=districts_data,
-            province_value=province_val,
-            province_code=region.value,
-            national_value=national_val,
-            population_type=f"{gender_label} age 15-49"
-        )
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await asyncio.to_thread(_compute_multiple_partners, data_loader, calc, region.value, gender, data_loader.version)
+
+
+@lru_cache(maxsize=256)
+def _compute_condom_use_multiple_partners(
+    data_loader: DHSDataLoader,
+    calc: CalculationService,
+    region: int,
+    gender: str,
+    data_version: int
+) -> dict:
+    """Build the condom use response, cached per region/gender and data version."""
+    dataset = "women" if gender == "female" else "men"
+    spec = CONDOM_USE_SPECS[dataset]
+    require_columns(data_loader, spec)
+    
+    gender_label = "Women" if gender == "female" else "Men"
+    
+    return run_binary_indicator(
+        data_loader, calc, spec, region,
+        label=f"Condom Use (Multiple Partners, {gender_label})",
+        population_type=f"{gender_label} 15-49 with 2+ partners in last 12 months"
+    )
 
 
 @router.get("/condom-use-multiple-partners", response_model=IndicatorResponse)
@@ -221,54 +298,29 @@ async def get_condom_use_multiple_partners(
     v761: Condom used at last intercourse
     v766b: Number of partners in last 12 months
     """
-    try:
-        dataset = "women" if gender == "female" else "men"
-        df = data_loader.load_dataset(dataset)
-        
-        prefix = 'v' if gender == "female" else 'mv'
-        region_col = f'{prefix}024'
-        weight_col = f'{prefix}005'
-        
-        partners_col = f'{prefix}766b'
-        condom_col = f'{prefix}761'
-        
-        df[partners_col] = pd.to_numeric(df.get(partners_col, 0), errors='coerce').fillna(0)
-        
-        # Filter for those with multiple partners
-        df = df[df[partners_col] >= 2].copy()
-        
-        df[condom_col] = pd.to_numeric(df.get(condom_col, 0), errors='coerce').fillna(0)
-        df['used_condom'] = (df[condom_col] == 1).astype(int)
-        
-        region_df = df[df[region_col] == region.value].copy()
-        
-        province_key = get_province_key(region.value)
-        district_map = DISTRICT_MAPS.get(province_key, {})
-        dist_col = calc.get_district_column(region_df)
-        
-        districts_data = {}
-        for dist_code, dist_name in district_map.items():
-            dist_df = region_df[pd.to_numeric(region_df[dist_col], errors='coerce') == dist_code]
-            if not dist_df.empty:
-                districts_data[dist_name] = calc.weighted_percentage(dist_df, 'used_condom', weight_col=weight_col)
-        
-        province_val = calc.weighted_percentage(region_df, 'used_condom', weight_col=weight_col)
-        national_val = calc.weighted_percentage(df, 'used_condom', weight_col=weight_col)
-        
-        gender_label = "Women" if gender == "female" else "Men"
-        
-        return format_indicator_response(
-            indicator_name=f"Condom Use (Multiple Partners, {gender_label})",
-            unit="Percentage",
-            districts_data=districts_data,
-            province_value=province_val,
-            province_code=region.value,
-            national_value=national_val,
-            population_type=f"{gender_label} 15-49 with 2+ partners in last 12 months"
-        )
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await asyncio.to_thread(_compute_condom_use_multiple_partners, data_loader, calc, region.value, gender, data_loader.version)
+
+
+@lru_cache(maxsize=256)
+def _compute_sti_symptoms(
+    data_loader: DHSDataLoader,
+    calc: CalculationService,
+    region: int,
+    gender: str,
+    data_version: int
+) -> dict:
+    """Build the STI symptoms response, cached per region/gender and data version."""
+    dataset = "women" if gender == "female" else "men"
+    spec = STI_SYMPTOMS_SPECS[dataset]
+    require_columns(data_loader, spec)
+    
+    gender_label = "Women" if gender == "female" else "Men"
+    
+    return run_binary_indicator(
+        data_loader, calc, spec, region,
+        label=f"STI Symptoms in Last 12 Months ({gender_label})",
+        population_type=f"{gender_label} age 15-49"
+    )
 
 
 @router.get("/sti-symptoms", response_model=IndicatorResponse)
@@ -285,56 +337,25 @@ async def get_sti_symptoms(
     v763b: Had genital discharge in last 12 months
     v763c: Had genital sore/ulcer in last 12 months
     """
-    try:
-        dataset = "women" if gender == "female" else "men"
-        df = data_loader.load_dataset(dataset)
-        
-        prefix = 'v' if gender == "female" else 'mv'
-        region_col = f'{prefix}024'
-        weight_col = f'{prefix}005'
-        
-        # STI symptoms
-        cols = [f'{prefix}763a', f'{prefix}763b', f'{prefix}763c']
-        for col in cols:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-        
-        # Any STI symptom
-        df['sti_symptom'] = (
-            (df.get(f'{prefix}763a', 0) == 1) |
-            (df.get(f'{prefix}763b', 0) == 1) |
-            (df.get(f'{prefix}763c', 0) == 1)
-        ).astype(int)
-        
-        region_df = df[df[region_col] == region.value].copy()
-        
-        province_key = get_province_key(region.value)
-        district_map = DISTRICT_MAPS.get(province_key, {})
-        dist_col = calc.get_district_column(region_df)
-        
-        districts_data = {}
-        for dist_code, dist_name in district_map.items():
-            dist_df = region_df[pd.to_numeric(region_df[dist_col], errors='coerce') == dist_code]
-            if not dist_df.empty:
-                districts_data[dist_name] = calc.weighted_percentage(dist_df, 'sti_symptom', weight_col=weight_col)
-        
-        province_val = calc.weighted_percentage(region_df, 'sti_symptom', weight_col=weight_col)
-        national_val = calc.weighted_percentage(df, 'sti_symptom', weight_col=weight_col)
-        
-        gender_label = "Women" if gender == "female" else "Men"
-        
-        return format_indicator_response(
-            indicator_name=f"STI Symptoms in Last 12 Months ({gender_label})",
-            unit="Percentage",
-            districts_data=districts_data,
-            province_value=province_val,
-            province_code=region.value,
-            national_value=national_val,
-            population_type=f"{gender_label} age 15-49"
-        )
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await asyncio.to_thread(_compute_sti_symptoms, data_loader, calc, region.value, gender, data_loader.version)
+
+
+@lru_cache(maxsize=256)
+def _compute_circumcision(
+    data_loader: DHSDataLoader,
+    calc: CalculationService,
+    region: int,
+    data_version: int
+) -> dict:
+    """Build the circumcision response, cached per region and data version."""
+    spec = CIRCUMCISION
+    require_columns(data_loader, spec)
+    
+    return run_binary_indicator(
+        data_loader, calc, spec, region,
+        label="Male Circumcision",
+        population_type="Men age 15-49"
+    )
 
 
 @router.get("/circumcision", response_model=IndicatorResponse)
@@ -348,36 +369,4 @@ async def get_circumcision(
     
     mv483: Circumcised
     """
-    try:
-        df = data_loader.load_dataset("men")
-        
-        df['mv483'] = pd.to_numeric(df.get('mv483', 0), errors='coerce').fillna(0)
-        df['circumcised'] = (df['mv483'] == 1).astype(int)
-        
-        region_df = df[df['mv024'] == region.value].copy()
-        
-        province_key = get_province_key(region.value)
-        district_map = DISTRICT_MAPS.get(province_key, {})
-        dist_col = calc.get_district_column(region_df)
-        
-        districts_data = {}
-        for dist_code, dist_name in district_map.items():
-            dist_df = region_df[pd.to_numeric(region_df[dist_col], errors='coerce') == dist_code]
-            if not dist_df.empty:
-                districts_data[dist_name] = calc.weighted_percentage(dist_df, 'circumcised', weight_col='mv005')
-        
-        province_val = calc.weighted_percentage(region_df, 'circumcised', weight_col='mv005')
-        national_val = calc.weighted_percentage(df, 'circumcised', weight_col='mv005')
-        
-        return format_indicator_response(
-            indicator_name="Male Circumcision",
-            unit="Percentage",
-            districts_data=districts_data,
-            province_value=province_val,
-            province_code=region.value,
-            national_value=national_val,
-            population_type="Men age 15-49"
-        )
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await asyncio.to_thread(_compute_circumcision, data_loader, calc, region.value, data_loader.version)
@@ -1,4 +1,5 @@
 from .data_loader import DHSDataLoader, data_loader
-from .calculations import CalculationService, calc_service
+from .calculations import CalculationService, FilterIndex, IndicatorSpec, calc_service
+from .indicators import run_binary_indicator
 
-__all__ = ["DHSDataLoader", "CalculationService", "data_loader", "calc_service"]
+__all__ = ["DHSDataLoader", "CalculationService", "FilterIndex", "IndicatorSpec", "data_loader", "calc_service", "run_binary_indicator"]
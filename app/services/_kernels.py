@@ -0,0 +1,53 @@
+"""
+Low-level numeric kernels for grouped DHS aggregations.
+Operate on plain numpy arrays so callers can pass cached, downcast columns.
+"""
+
+import numpy as np
+from typing import Tuple
+
+
+def grouped_weighted_sums(
+    values: np.ndarray,
+    weights: np.ndarray,
+    groups: np.ndarray,
+    n_groups: int = 0
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Accumulate value-weighted and total weights per integer group code.
+    
+    Each sum is a single sequential np.bincount pass over the rows, with
+    float64 accumulators regardless of the (int8/float32) input dtypes.
+    
+    Args:
+        values: Boolean, 0/1 or numeric array without missing values
+        weights: Sampling weights aligned with values
+        groups: Non-negative integer group codes (e.g. district codes)
+        n_groups: Minimum length of the returned accumulators
+    
+    Returns:
+        Tuple of (numerator, denominator) arrays indexed by group code
+    """
+    num = np.bincount(groups, weights=values * weights, minlength=n_groups)
+    den = np.bincount(groups, weights=weights, minlength=n_groups)
+    return num, den
+
+
+def weighted_sums(values: np.ndarray, weights: np.ndarray) -> Tuple[float, float]:
+    """
+    Sum value * weight and weight over rows where neither is NaN.
+    
+    Drops missing rows with one combined mask, and skips even that
+    when nothing is missing, before a single dot product.
+    
+    Args:
+        values: float64 indicator or measurement values (NaN = missing)
+        weights: float64 sampling weights aligned with values
+    
+    Returns:
+        Tuple of (weighted value sum, weight sum)
+    """
+    valid = ~(np.isnan(values) | np.isnan(weights))
+    if valid.all():
+        return float(values @ weights), float(weights.sum())
+    return float(values[valid] @ weights[valid]), float(weights[valid].sum())
@@ -6,12 +6,60 @@ Implements weighted percentage calculations following DHS methodology.
 import pandas as pd
 import numpy as np
 import math
-from typing import Optional, Callable, Dict, List
+from typing import AbstractSet, Optional, Callable, Dict, List, NamedTuple, Tuple, Union, TYPE_CHECKING
 import logging
 
+from app.services._kernels import grouped_weighted_sums, weighted_sums
+
+if TYPE_CHECKING:
+    from app.services.data_loader import DHSDataLoader
+
 logger = logging.getLogger(__name__)
 
 
+class IndicatorSpec(NamedTuple):
+    """
+    Named recipe for a narrow indicator frame derived from one dataset.
+    The name is used as the cache key, so it must identify the recipe uniquely.
+    columns lists the source columns the population and indicator read
+    (region and weight columns are implied).
+    """
+    name: str
+    dataset: str
+    indicator: Callable[[pd.DataFrame], pd.Series]
+    population: Optional[Callable[[pd.DataFrame], pd.Series]] = None
+    region_col: str = 'v024'
+    weight_col: str = 'v005'
+    columns: Tuple[str, ...] = ()
+
+
+# Candidate column names for each standard role, in order of preference
+COLUMN_ALIASES = {
+    'region': ('hv024', 'v024', 'mv024'),
+    'district': ('shdistrict', 'sdistrict', 'sdstr', 'smdistrict'),
+    'weight': ('hv005', 'v005', 'mv005', 'hv005a'),
+    'age': ('hv105', 'v012'),
+    'resident': ('hv102', 'v135'),
+}
+
+
+class FilterIndex(NamedTuple):
+    """
+    Prebuilt row index over the standard filter columns of one dataset.
+    Region, district and residence values map to bit-packed row masks.
+    Ages (integer years, so few distinct values) keep one cumulative
+    bit-packed mask per distinct age, row i of age_at_most marking the rows
+    with age <= age_values[i]; a range is two binary searches and two ANDs.
+    Only valid for the exact frame it was built from.
+    """
+    n_rows: int
+    region: Dict[int, np.ndarray]
+    district: Dict[int, np.ndarray]
+    resident: Optional[np.ndarray]
+    age_values: Optional[np.ndarray]
+    age_at_most: Optional[np.ndarray]
+
+
 class CalculationService:
     """
     Service for performing standardized DHS calculations.
@@ -25,13 +73,32 @@ class CalculationService:
         """
         return int(math.floor(n + 0.5))
     
+    @staticmethod
+    def standard_round_array(values: np.ndarray) -> np.ndarray:
+        """
+        DHS standard rounding (0.5 rounds UP) of a whole array in one pass.
+        Values must be finite; mask empty groups before rounding.
+        """
+        return np.floor(values + 0.5).astype(np.int64)
+    
+    @staticmethod
+    def _safe_percentages(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+        """Rounded num / den * 100 per element, 0 where den is 0"""
+        return CalculationService.standard_round_array(num / np.where(den != 0, den, 1) * 100)
+    
+    @staticmethod
+    def _nan_free(series: pd.Series) -> bool:
+        """True when the column's dtype cannot hold missing values (numpy bool/int)"""
+        return isinstance(series.dtype, np.dtype) and series.dtype.kind in 'biu'
+    
     @staticmethod
     def weighted_percentage(
         df: pd.DataFrame,
         indicator_col: str,
         weight_col: str = 'hv005',
-        condition: Optional[Callable] = None,
-        multiply_by_100: bool = True
+        condition: Optional[Union[np.ndarray, pd.Series, Callable[[pd.DataFrame], pd.Series]]] = None,
+        multiply_by_100: bool = True,
+        mask: Optional[np.ndarray] = None
     ) -> float:
         """
         Calculate weighted percentage for a binary indicator.
@@ -40,8 +107,10 @@ class CalculationService:
             df: Input dataframe
             indicator_col: Column containing the indicator (0/1 or boolean)
             weight_col: Column containing sampling weights
-            condition: Optional filter function
+            condition: Optional filter: a boolean mask, or a function taking the
+                whole dataframe and returning a boolean mask (called once)
             multiply_by_100: Whether to return as percentage (0-100) or proportion (0-1)
+            mask: Optional boolean row mask (fast path, no per-row filter call)
         
         Returns:
             Weighted percentage value
@@ -49,10 +118,14 @@ class CalculationService:
         if df.empty:
             return 0.0
         
-        # Apply optional filter
-        data = df.copy()
-        if condition:
-            data = data[data.apply(condition, axis=1)]
+        # Apply optional filters; the input frame itself is never copied
+        data = df
+        if mask is not None:
+            data = data[mask]
+        if condition is not None:
+            if callable(condition):
+                condition = condition(data)
+            data = data[np.asarray(condition, dtype=bool)]
         
         # Handle weight column variations
         w_col = weight_col if weight_col in data.columns else 'v005'
@@ -60,29 +133,259 @@ class CalculationService:
             logger.warning(f"Weight column {w_col} not found, using unweighted")
             w_col = None
         
-        # Select relevant columns and drop NaNs
-        cols = [indicator_col]
         if w_col:
-            cols.append(w_col)
+            # DHS weights carry a 1,000,000 scale factor, which cancels in the
+            # ratio; the kernel skips missing rows without a dropna copy.
+            # Bool/integer numpy columns cannot hold NaN, so they skip the checks
+            nan_free = CalculationService._nan_free(data[indicator_col]) and CalculationService._nan_free(data[w_col])
+            values = data[indicator_col].to_numpy(dtype=np.float64, na_value=np.nan)
+            weights = data[w_col].to_numpy(dtype=np.float64, na_value=np.nan)
+            if nan_free:
+                num, den = values @ weights, weights.sum()
+            else:
+                num, den = weighted_sums(values, weights)
+            if den == 0:
+                return 0.0
+            result = num / den
+        else:
+            values = data[indicator_col].to_numpy(dtype=np.float64, na_value=np.nan)
+            values = values[~np.isnan(values)]
+            if len(values) == 0:
+                return 0.0
+            result = values.mean()
         
-        temp = data[cols].dropna()
+        if multiply_by_100:
+            result *= 100
         
-        if len(temp) == 0:
-            return 0.0
+        return CalculationService.standard_round(result)
+    
+    @staticmethod
+    def weighted_percentages(
+        df: pd.DataFrame,
+        indicator_cols: List[str],
+        weight_col: str = 'hv005'
+    ) -> Dict[str, float]:
+        """
+        Calculate weighted_percentage for several indicators of the same rows at once.
         
-        # Calculate weighted average
-        if w_col:
-            # Normalize weights (DHS standard: divide by 1,000,000)
-            weights = temp[w_col] / 1000000.0
-            result = np.average(temp[indicator_col], weights=weights)
+        The indicators are read as one (rows x indicators) matrix and reduced
+        with a single matrix-vector product, instead of one filter-and-average
+        pass per indicator. Missing values are excluded per indicator.
+        
+        Args:
+            df: Input dataframe
+            indicator_cols: Columns containing the indicators (0/1 or boolean)
+            weight_col: Column containing sampling weights
+        
+        Returns:
+            Dict of indicator column -> weighted percentage
+        """
+        w_col = weight_col if weight_col in df.columns else 'v005'
+        if df.empty or w_col not in df.columns:
+            return {col: CalculationService.weighted_percentage(df, col, weight_col) for col in indicator_cols}
+        
+        values = df[indicator_cols].to_numpy(dtype=np.float64, na_value=np.nan)
+        weights = df[w_col].to_numpy(dtype=np.float64, na_value=np.nan)
+        
+        valid = ~np.isnan(values) & ~np.isnan(weights)[:, None]
+        weights = np.where(np.isnan(weights), 0.0, weights)
+        num = np.where(valid, values, 0.0).T @ weights
+        den = valid.T @ weights
+        
+        pcts = CalculationService._safe_percentages(num, den).tolist()
+        return {
+            col: pcts[i] if den[i] != 0 else 0.0
+            for i, col in enumerate(indicator_cols)
+        }
+    
+    @staticmethod
+    def weighted_percentage_by_group(
+        df: pd.DataFrame,
+        value_col: str,
+        group_col: str,
+        weight_col: str = 'hv005'
+    ) -> pd.Series:
+        """
+        Calculate weighted percentages of an indicator for every group at once.
+        
+        Computes sum(indicator * weight) / sum(weight) per group with one
+        grouped bincount over factorized group codes instead of a pandas
+        GroupBy or one filter-and-average scan per group. Every group with
+        rows is reported; a group with no non-missing values gets 0.0, as
+        weighted_percentage returns.
+        
+        Args:
+            df: Input dataframe
+            value_col: Column containing the indicator (0/1 or boolean)
+            group_col: Column to group by (e.g. district code)
+            weight_col: Column containing sampling weights
+        
+        Returns:
+            Series of weighted percentages indexed by group value
+        """
+        w_col = weight_col if weight_col in df.columns else 'v005'
+        
+        values = df[value_col].to_numpy(dtype=np.float64, na_value=np.nan)
+        if w_col in df.columns:
+            weights = df[w_col].to_numpy(dtype=np.float64, na_value=np.nan)
         else:
-            result = temp[indicator_col].mean()
+            logger.warning(f"Weight column {w_col} not found, using unweighted")
+            weights = np.ones(len(df))
         
-        if multiply_by_100:
-            result *= 100
+        codes, groups = pd.factorize(df[group_col], sort=True)
+        valid = (codes >= 0) & ~np.isnan(values) & ~np.isnan(weights)
+        num, den = grouped_weighted_sums(values[valid], weights[valid], codes[valid], len(groups))
+        
+        pcts = CalculationService._safe_percentages(num, den)
+        return pd.Series(np.where(den != 0, pcts, 0.0), index=groups)
+    
+    @staticmethod
+    def district_percentages(
+        df: pd.DataFrame,
+        indicator_col: str,
+        dist_col: str,
+        district_map: Dict[int, str],
+        weight_col: str = 'hv005'
+    ) -> Dict[str, float]:
+        """
+        Calculate weighted_percentage for every district of a region in one pass.
         
+        Runs weighted_percentage_by_group over the district column and keeps
+        the districts of the map, named. Districts with rows but no
+        non-missing values get 0.0, as weighted_percentage returns.
+        
+        Args:
+            df: Region dataframe
+            indicator_col: Column containing the indicator (0/1 or boolean)
+            dist_col: Column holding district codes
+            district_map: District code -> name mapping of the region
+            weight_col: Column containing sampling weights
+        
+        Returns:
+            Dict of district name -> weighted percentage, for districts present in df
+        """
+        pcts = CalculationService.weighted_percentage_by_group(df, indicator_col, dist_col, weight_col)
+        by_code = dict(zip(pcts.index.tolist(), pcts.tolist()))
+        return {
+            dist_name: by_code[dist_code]
+            for dist_code, dist_name in district_map.items()
+            if dist_code in by_code
+        }
+    
+    @staticmethod
+    def ratio_percentage(numerator: float, denominator: float) -> float:
+        """
+        Calculate a percentage from pre-aggregated weighted sums.
+        
+        Args:
+            numerator: Sum of weights where the indicator applies
+            denominator: Sum of weights of the population
+        
+        Returns:
+            Rounded percentage, or 0.0 when the denominator is empty
+        """
+        if denominator == 0:
+            return 0.0
+        return CalculationService.standard_round(numerator / denominator * 100)
+    
+    @staticmethod
+    def weighted_fraction(mask: np.ndarray, weights: np.ndarray) -> float:
+        """
+        Calculate weighted percentage directly from a boolean indicator mask.
+        
+        Sums the weights of rows where the mask is set instead of
+        materializing a 0/1 indicator column and averaging it.
+        
+        Args:
+            mask: Boolean array, True where the indicator applies
+            weights: Sampling weights aligned with mask
+        
+        Returns:
+            Weighted percentage value
+        """
+        total = np.sum(weights, dtype=np.float64)
+        if total == 0:
+            return 0.0
+        
+        result = np.sum(weights[mask], dtype=np.float64) / total * 100
         return CalculationService.standard_round(result)
     
+    @staticmethod
+    def weighted_fraction_by_group(
+        mask: np.ndarray,
+        weights: np.ndarray,
+        groups: np.ndarray
+    ) -> Dict[int, float]:
+        """
+        Calculate weighted percentages of a boolean mask per integer group code.
+        
+        Both the indicator-weighted and total weight sums are accumulated with
+        a single np.bincount pass each, instead of one filtered pass per group.
+        Every group with rows is reported, as in district_percentages; a group
+        whose rows carry no weight gets 0.0.
+        
+        Args:
+            mask: Boolean or 0/1 array, nonzero where the indicator applies
+            weights: Sampling weights aligned with mask
+            groups: Non-negative integer group codes (e.g. district codes)
+        
+        Returns:
+            Dictionary of group code -> weighted percentage, for groups with rows
+        """
+        num, den = grouped_weighted_sums(mask, weights, groups)
+        rows = np.bincount(groups, minlength=len(den))
+        
+        pcts = np.where(den != 0, CalculationService._safe_percentages(num, den), 0.0).tolist()
+        return {int(group): pcts[group] for group in np.flatnonzero(rows)}
+    
+    @staticmethod
+    def weighted_fraction_summary(
+        mask: np.ndarray,
+        weights: np.ndarray,
+        regions: np.ndarray,
+        districts: np.ndarray,
+        region: int,
+        codes: np.ndarray
+    ) -> Tuple[np.ndarray, float, float]:
+        """
+        Calculate district, province and national percentages in one grouped pass.
+        
+        Rows are keyed by (region, district) and summed with a single
+        bincount; province and national values are then reductions of
+        those group sums rather than separate scans of the data. Districts
+        follow the district_percentages rule: reported when they have rows,
+        0.0 when those rows carry no weight.
+        
+        Args:
+            mask: Boolean or 0/1 array, nonzero where the indicator applies
+            weights: Sampling weights aligned with mask
+            regions: Integer region code per row
+            districts: Non-negative integer district code per row
+            region: Region to report districts and province value for
+            codes: District codes to report, in output order
+        
+        Returns:
+            Tuple of (district percentages aligned with codes, NaN where a
+            district has no rows; province percentage; national percentage)
+        """
+        n_districts = int(max(districts.max(initial=0), codes.max(initial=0))) + 1
+        n_regions = int(max(regions.max(initial=0), region)) + 1
+        
+        keys = regions.astype(np.int64) * n_districts + districts
+        num, den = grouped_weighted_sums(mask, weights, keys, n_regions * n_districts)
+        num = num.reshape(n_regions, n_districts)
+        den = den.reshape(n_regions, n_districts)
+        rows = np.bincount(keys, minlength=n_regions * n_districts).reshape(n_regions, n_districts)
+        
+        dist_num, dist_den = num[region, codes], den[region, codes]
+        dist_values = np.where(dist_den != 0, CalculationService._safe_percentages(dist_num, dist_den), 0.0)
+        
+        return (
+            np.where(rows[region, codes] > 0, dist_values, np.nan),
+            CalculationService.ratio_percentage(num[region].sum(), den[region].sum()),
+            CalculationService.ratio_percentage(num.sum(), den.sum()),
+        )
+    
     @staticmethod
     def weighted_mean(
         df: pd.DataFrame,
@@ -96,18 +399,15 @@ class CalculationService:
             return 0.0
         
         w_col = weight_col if weight_col in df.columns else 'v005'
-        cols = [value_col, w_col] if w_col in df.columns else [value_col]
+        values = df[value_col].to_numpy(dtype=np.float64, na_value=np.nan)
         
-        temp = df[cols].dropna()
+        if w_col in df.columns:
+            # The 1,000,000 weight scale factor cancels in the ratio
+            num, den = weighted_sums(values, df[w_col].to_numpy(dtype=np.float64, na_value=np.nan))
+            return num / den if den != 0 else 0.0
         
-        if len(temp) == 0:
-            return 0.0
-        
-        if w_col in temp.columns:
-            weights = temp[w_col] / 1000000.0
-            return np.average(temp[value_col], weights=weights)
-        
-        return temp[value_col].mean()
+        values = values[~np.isnan(values)]
+        return values.mean() if len(values) else 0.0
     
     @staticmethod
     def apply_filters(
@@ -116,7 +416,9 @@ class CalculationService:
         district_code: Optional[int] = None,
         age_min: Optional[int] = None,
         age_max: Optional[int] = None,
-        resident_only: bool = False
+        resident_only: bool = False,
+        filter_columns: Optional[Dict[str, Optional[str]]] = None,
+        index: Optional[FilterIndex] = None
     ) -> pd.DataFrame:
         """
         Apply standard DHS filters to a dataset.
@@ -128,67 +430,234 @@ class CalculationService:
             age_min: Minimum age (hv105 or v012)
             age_max: Maximum age
             resident_only: Filter for de jure population only
+            filter_columns: Columns already resolved for the dataset (see
+                DHSDataLoader.get_resolved_columns); looked up on df if omitted
+            index: Optional FilterIndex built from df (see filter_mask)
         
         Returns:
             Filtered dataframe
         """
-        result = df.copy()
+        return df[CalculationService.filter_mask(
+            df, region_code, district_code, age_min, age_max, resident_only, filter_columns, index
+        )]
+    
+    @staticmethod
+    def filter_mask(
+        df: pd.DataFrame,
+        region_code: Optional[int] = None,
+        district_code: Optional[int] = None,
+        age_min: Optional[int] = None,
+        age_max: Optional[int] = None,
+        resident_only: bool = False,
+        filter_columns: Optional[Dict[str, Optional[str]]] = None,
+        index: Optional[FilterIndex] = None
+    ) -> np.ndarray:
+        """
+        Build the boolean row mask for the standard DHS filters (see apply_filters).
+        
+        All conditions are combined into one mask, so no intermediate
+        frames are created; callers that only read a few columns can
+        index those columns with the mask directly.
+        
+        With a FilterIndex built from df (see DHSDataLoader.get_filter_index)
+        the point filters are answered from its bitmaps and the age range by
+        binary search, without scanning the filter columns.
+        
+        Returns:
+            Boolean array, True for rows passing every filter
+        """
+        if index is not None:
+            return CalculationService._indexed_filter_mask(
+                index, region_code, district_code, age_min, age_max, resident_only
+            )
+        
+        if filter_columns is None:
+            filter_columns = CalculationService.resolve_columns(df.columns)
         
-        # Region filter (try common column names)
-        if region_code is not None:
-            region_col = 'hv024' if 'hv024' in result.columns else 'v024'
-            if region_col in result.columns:
-                result = result[result[region_col] == region_code]
+        mask = np.ones(len(df), dtype=bool)
+        
+        # Region filter
+        region_col = filter_columns['region']
+        if region_code is not None and region_col is not None:
+            mask &= df[region_col].to_numpy() == region_code
         
         # District filter
-        if district_code is not None:
-            dist_col = 'shdistrict' if 'shdistrict' in result.columns else 'sdistrict'
-            if dist_col in result.columns:
-                result = result[result[dist_col] == district_code]
+        dist_col = filter_columns['district']
+        if district_code is not None and dist_col is not None:
+            mask &= df[dist_col].to_numpy() == district_code
         
         # Age filters
-        if age_min is not None or age_max is not None:
-            age_col = 'hv105' if 'hv105' in result.columns else 'v012'
-            if age_col in result.columns:
-                if age_min is not None:
-                    result = result[result[age_col] >= age_min]
-                if age_max is not None:
-                    result = result[result[age_col] <= age_max]
+        age_col = filter_columns['age']
+        if (age_min is not None or age_max is not None) and age_col is not None:
+            age = df[age_col].to_numpy()
+            if age_min is not None:
+                mask &= age >= age_min
+            if age_max is not None:
+                mask &= age <= age_max
         
         # De jure filter
-        if resident_only:
-            resident_col = 'hv102' if 'hv102' in result.columns else 'v135'
-            if resident_col in result.columns:
-                result = result[result[resident_col] == 1]
+        resident_col = filter_columns['resident']
+        if resident_only and resident_col is not None:
+            mask &= df[resident_col].to_numpy() == 1
+        
+        return mask
+    
+    @staticmethod
+    def build_filter_index(df: pd.DataFrame, filter_columns: Dict[str, Optional[str]]) -> FilterIndex:
+        """
+        Build the FilterIndex of a dataset.
+        
+        Args:
+            df: Dataset to index
+            filter_columns: Resolved columns of the dataset (see resolve_columns)
+        
+        Returns:
+            FilterIndex over df
+        """
+        def bitmaps(col: Optional[str]) -> Dict[int, np.ndarray]:
+            if col is None:
+                return {}
+            values = df[col].to_numpy()
+            codes = np.unique(values[~pd.isna(values)])
+            return {int(code): np.packbits(values == code) for code in codes}
+        
+        resident = age_values = age_at_most = None
+        
+        if filter_columns['resident'] is not None:
+            resident = np.packbits(df[filter_columns['resident']].to_numpy() == 1)
+        
+        if filter_columns['age'] is not None:
+            age = df[filter_columns['age']].to_numpy(np.float64)
+            age_values = np.unique(age[~np.isnan(age)])
+            age_at_most = np.packbits(age[None, :] <= age_values[:, None], axis=1)
+        
+        return FilterIndex(
+            n_rows=len(df),
+            region=bitmaps(filter_columns['region']),
+            district=bitmaps(filter_columns['district']),
+            resident=resident,
+            age_values=age_values,
+            age_at_most=age_at_most,
+        )
+    
+    @staticmethod
+    def _indexed_filter_mask(
+        index: FilterIndex,
+        region_code: Optional[int],
+        district_code: Optional[int],
+        age_min: Optional[int],
+        age_max: Optional[int],
+        resident_only: bool
+    ) -> np.ndarray:
+        """filter_mask answered from a FilterIndex"""
+        n_bytes = (index.n_rows + 7) // 8
+        empty = np.zeros(n_bytes, dtype=np.uint8)
+        packed = np.full(n_bytes, 0xFF, dtype=np.uint8)
+        
+        # Missing columns are skipped, matching the scanning path
+        if region_code is not None and index.region:
+            packed &= index.region.get(region_code, empty)
+        if district_code is not None and index.district:
+            packed &= index.district.get(district_code, empty)
+        if resident_only and index.resident is not None:
+            packed &= index.resident
+        
+        if (age_min is not None or age_max is not None) and index.age_values is not None:
+            # Largest distinct age <= age_max; without an upper bound the last
+            # row still drops missing ages, as the comparisons would
+            upper = len(index.age_values) - 1
+            if age_max is not None:
+                upper = np.searchsorted(index.age_values, age_max, side='right') - 1
+            packed &= index.age_at_most[upper] if upper >= 0 else empty
+            
+            # Rows at or below the largest distinct age < age_min fall out
+            if age_min is not None:
+                lower = np.searchsorted(index.age_values, age_min, side='left') - 1
+                if lower >= 0:
+                    packed &= ~index.age_at_most[lower]
+        
+        return np.unpackbits(packed, count=index.n_rows).view(bool)
+    
+    @staticmethod
+    def build_indicator_frame(df: pd.DataFrame, spec: IndicatorSpec) -> pd.DataFrame:
+        """
+        Build the narrow frame described by an indicator spec.
         
-        return result
+        Args:
+            df: Source dataset
+            spec: Indicator recipe (population filter and 0/1 indicator)
+        
+        Returns:
+            DataFrame with 'indicator' (int8), 'weight' (float32),
+            'region' (int16) and 'district' (int16) columns
+        """
+        dist_col = CalculationService.get_district_column(df)
+        
+        if spec.population is not None:
+            df = df[spec.population(df)]
+        
+        return pd.DataFrame({
+            'indicator': spec.indicator(df).to_numpy(np.int8),
+            'weight': df[spec.weight_col].to_numpy(np.float32),
+            'region': df[spec.region_col].to_numpy(np.int16),
+            'district': pd.to_numeric(df[dist_col], errors='coerce').fillna(0).to_numpy(np.int16),
+        })
+    
+    @staticmethod
+    def get_indicator_frame(data_loader: "DHSDataLoader", spec: IndicatorSpec) -> pd.DataFrame:
+        """
+        Get the narrow frame for an indicator spec, built once per data version.
+        
+        Args:
+            data_loader: Loader providing the source dataset and the cache
+            spec: Indicator recipe
+        
+        Returns:
+            Cached indicator frame (see build_indicator_frame)
+        """
+        return data_loader.load_derived(
+            f"{spec.dataset}:{spec.name}",
+            spec.dataset,
+            lambda df: CalculationService.build_indicator_frame(df, spec)
+        )
+    
+    @staticmethod
+    def resolve_columns(columns: AbstractSet[str]) -> Dict[str, Optional[str]]:
+        """
+        Resolve every standard column role from a dataset's column names.
+        
+        Args:
+            columns: Column names of the dataset
+        
+        Returns:
+            Dict of role (keys of COLUMN_ALIASES) -> first matching column
+            name, or None where the dataset has no such column
+        """
+        return {
+            role: next((c for c in candidates if c in columns), None)
+            for role, candidates in COLUMN_ALIASES.items()
+        }
     
     @staticmethod
     def get_district_column(df: pd.DataFrame) -> str:
         """Find the appropriate district column in the dataframe"""
-        district_cols = ['shdistrict', 'sdistrict', 'sdstr', 'smdistrict']
-        for col in district_cols:
-            if col in df.columns:
-                return col
-        return 'hv001'  # Fallback to cluster
+        return CalculationService.resolve_columns(df.columns)['district'] or 'hv001'  # Fallback to cluster
     
     @staticmethod
     def get_region_column(df: pd.DataFrame) -> str:
         """Find the appropriate region/province column in the dataframe"""
-        region_cols = ['hv024', 'v024', 'mv024']
-        for col in region_cols:
-            if col in df.columns:
-                return col
-        raise ValueError("No region column found in dataframe")
+        region_col = CalculationService.resolve_columns(df.columns)['region']
+        if region_col is None:
+            raise ValueError("No region column found in dataframe")
+        return region_col
     
     @staticmethod
     def get_weight_column(df: pd.DataFrame) -> str:
         """Find the appropriate weight column in the dataframe"""
-        weight_cols = ['hv005', 'v005', 'mv005', 'hv005a']
-        for col in weight_cols:
-            if col in df.columns:
-                return col
-        raise ValueError("No weight column found in dataframe")
+        weight_col = CalculationService.resolve_columns(df.columns)['weight']
+        if weight_col is None:
+            raise ValueError("No weight column found in dataframe")
+        return weight_col
 
 
 # Singleton instance
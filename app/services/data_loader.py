@@ -5,14 +5,38 @@ Handles caching, column standardization, and data validation.
 
 import pandas as pd
 import numpy as np
+import operator
 from pathlib import Path
-from typing import Dict, Optional, List
+from typing import Any, Callable, Dict, FrozenSet, Optional, List, Tuple, Union
 import logging
 
+try:
+    import pyreadstat
+except ImportError:  # optional: only speeds up column-subset reads
+    pyreadstat = None
+
 from app.config import DATA_DIR, DATA_FILES
+from app.services.calculations import CalculationService, FilterIndex
 
 logger = logging.getLogger(__name__)
 
+# Row filters accepted by load_dataset: (column, operator, value)
+RowFilter = Tuple[str, str, Any]
+
+FILTER_OPERATORS = {
+    '=': operator.eq,
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    'in': lambda series, values: series.isin(values),
+}
+
+# Largest magnitude below which every integer is exactly representable in float32
+FLOAT32_EXACT = 2 ** 24
+
 
 class DHSDataLoader:
     """
@@ -22,12 +46,24 @@ class DHSDataLoader:
     
     _instance = None
     _cache: Dict[str, pd.DataFrame] = {}
+    _derived_cache: Dict[str, Union[pd.DataFrame, Dict[str, np.ndarray]]] = {}
+    _resolved_columns: Dict[str, Dict[str, Optional[str]]] = {}
+    _columns: Dict[str, FrozenSet[str]] = {}
+    _file_columns: Dict[str, List[str]] = {}
+    _region_cache: Dict[str, Dict[int, slice]] = {}
+    _filter_index: Dict[str, FilterIndex] = {}
+    _version: int = 0
     
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
         return cls._instance
     
+    @property
+    def version(self) -> int:
+        """Data version token, bumped whenever cached data is discarded"""
+        return self._version
+    
     def _get_file_path(self, dataset_name: str) -> Path:
         """Resolve dataset name to file path"""
         if dataset_name not in DATA_FILES:
@@ -43,62 +79,337 @@ class DHSDataLoader:
         self, 
         dataset_name: str, 
         use_cache: bool = True,
-        columns: Optional[List[str]] = None
+        columns: Optional[List[str]] = None,
+        filters: Optional[List[RowFilter]] = None
     ) -> pd.DataFrame:
         """
         Load a DHS dataset with optional caching.
         
+        When columns or filters are given, only those columns are read from
+        the file (or sliced from the cached full dataset) and rows failing
+        the filters are dropped before anything is cached.
+        
         Args:
             dataset_name: Key from DATA_FILES config (household, person, women, men, children, etc.)
             use_cache: Whether to use cached version if available
             columns: Optional list of columns to load (for memory efficiency)
+            filters: Optional list of (column, operator, value) row filters,
+                e.g. [('hv103', '=', 1)]; operators are the keys of FILTER_OPERATORS
         
         Returns:
-            Standardized pandas DataFrame with lowercase column names
+            Standardized pandas DataFrame with lowercase column names (a
+            shallow copy of the cached frame: callers may add or overwrite
+            columns freely, Copy-on-Write copies data only when written)
         """
-        cache_key = f"{dataset_name}_{columns is not None}"
+        full_load = columns is None and not filters
+        if full_load:
+            cache_key = dataset_name
+        else:
+            # Normalized so the same columns and filters in any order share
+            # one cache entry
+            columns_key = None if columns is None else sorted(set(columns))
+            cache_key = f"{dataset_name}:{columns_key}:{sorted(map(str, filters or []))}"
         
-        # Return cached version if available
+        # Return cached version if available; the shallow copy gives callers
+        # their own frame object while sharing the column data
         if use_cache and cache_key in self._cache:
-            logger.debug(f"Returning cached dataset: {dataset_name}")
-            return self._cache[cache_key].copy()
-        
-        # Load from file
-        file_path = self._get_file_path(dataset_name)
-        logger.info(f"Loading dataset: {dataset_name} from {file_path}")
+            logger.debug(f"Returning cached dataset: {cache_key}")
+            return self._select_columns(self._cache[cache_key], columns)
         
         try:
-            # Load Stata file
-            df = pd.read_stata(file_path, convert_categoricals=False)
+            if not full_load and use_cache and dataset_name in self._cache:
+                # Slice the already loaded full dataset instead of re-reading the file
+                df = self._cache[dataset_name]
+            else:
+                df = self._read_file(dataset_name, columns, filters)
             
-            # Standardize column names to lowercase
-            df.columns = df.columns.str.lower()
+            # Apply row filters
+            if filters:
+                mask = np.ones(len(df), dtype=bool)
+                for col, op, value in filters:
+                    mask &= FILTER_OPERATORS[op](df[col], value).to_numpy()
+                df = df[mask]
             
-            # Filter columns if specified
+            # Filter columns if specified (cached in sorted order, handed out
+            # in the order requested)
             if columns:
-                available_cols = [c for c in columns if c in df.columns]
-                df = df[available_cols]
+                df = df[[c for c in sorted(set(columns)) if c in df.columns]]
             
             # Cache if enabled
             if use_cache:
-                self._cache[cache_key] = df.copy()
+                self._cache[cache_key] = df
             
             logger.info(f"Loaded {len(df)} rows, {len(df.columns)} columns")
-            return df
+            return self._select_columns(df, columns)
             
         except Exception as e:
             logger.error(f"Failed to load {dataset_name}: {str(e)}")
             raise
     
+    @staticmethod
+    def _select_columns(df: pd.DataFrame, columns: Optional[List[str]]) -> pd.DataFrame:
+        """Shallow copy of a cached frame with the columns in the requested order"""
+        if columns:
+            return df[[c for c in columns if c in df.columns]]
+        return df.copy(deep=False)
+    
+    def _read_file(
+        self,
+        dataset_name: str,
+        columns: Optional[List[str]] = None,
+        filters: Optional[List[RowFilter]] = None
+    ) -> pd.DataFrame:
+        """Read a Stata file, restricted to the requested and filtered columns if given"""
+        file_path = self._get_file_path(dataset_name)
+        logger.info(f"Loading dataset: {dataset_name} from {file_path}")
+        
+        read_columns = None
+        if columns is not None or filters:
+            wanted = set(columns or []) | {col for col, _, _ in filters or []}
+            read_columns = [c for c in self._get_file_columns(dataset_name) if c.lower() in wanted]
+        
+        # Load Stata file; pyreadstat parses only the requested columns, while
+        # pandas' reader is faster when the whole file is needed
+        if read_columns is not None and pyreadstat is not None:
+            df, _ = pyreadstat.read_dta(
+                str(file_path), usecols=read_columns, disable_datetime_conversion=True
+            )
+            # Columns with missing values come back as object; restore float dtype
+            df = df.infer_objects()
+        else:
+            df = pd.read_stata(file_path, convert_categoricals=False, columns=read_columns)
+        
+        if read_columns is None:
+            self._file_columns[dataset_name] = list(df.columns)
+        
+        # Standardize column names to lowercase (a plain comprehension beats
+        # the .str accessor for a few thousand short names)
+        df.columns = [c.lower() for c in df.columns]
+        
+        # Enforce numeric dtypes once so callers never coerce per request
+        df = self._enforce_numeric(df)
+        
+        # Shrink whole-number float columns so the cached frame stays compact,
+        # and consolidate the per-column blocks left by the conversions so the
+        # shallow copies handed out by load_dataset stay cheap
+        df = self._downcast(df).copy()
+        
+        # Remember the schema and district column while the full schema is at hand
+        if read_columns is None:
+            self._columns[dataset_name] = frozenset(df.columns)
+            self._resolved_columns[dataset_name] = CalculationService.resolve_columns(self._columns[dataset_name])
+        
+        # Keep the rows stably sorted by region so load_region can hand out
+        # each region as a contiguous slice of this frame
+        region_col = self.get_resolved_columns(dataset_name)['region']
+        if region_col in df.columns:
+            df = df.take(np.argsort(df[region_col].to_numpy(), kind='stable'))
+        
+        return df
+    
+    @staticmethod
+    def _enforce_numeric(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Convert text columns that only hold numbers (or blanks) to numeric dtype.
+        Genuine text columns such as case identifiers are left untouched.
+        """
+        text_cols = [c for c in df.columns if not pd.api.types.is_numeric_dtype(df[c])]
+        
+        for col in text_cols:
+            text = df[col].str.strip()
+            numeric = pd.to_numeric(text, errors='coerce')
+            # Only convert when every non-blank cell parsed as a number
+            if (numeric.notna() | (text == '')).all():
+                df[col] = numeric
+        
+        return df
+    
+    @staticmethod
+    def _downcast(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Store float64 columns holding only whole numbers (or NaN) as float32.
+        
+        Stata integer variables with missing values arrive as float64; their
+        codes fit float32 exactly, so NaN semantics and comparisons are kept
+        while the column memory is halved.
+        """
+        downcast = []
+        for col in df.columns[(df.dtypes == np.float64).to_numpy()]:
+            values = df[col].to_numpy()
+            values = values[~np.isnan(values)]
+            if (np.abs(values) < FLOAT32_EXACT).all() and (values == np.round(values)).all():
+                downcast.append(col)
+        
+        return df.astype(dict.fromkeys(downcast, np.float32))
+    
+    def load_region(
+        self,
+        dataset_name: str,
+        region_code: int,
+        df: Optional[pd.DataFrame] = None
+    ) -> pd.DataFrame:
+        """
+        Load the rows of a dataset for one region (province).
+        
+        Datasets are stored with their rows stably sorted by region (see
+        _read_file), so every region is a contiguous block, also in any frame
+        derived from them by row filters or added columns. The block
+        boundaries of the full dataset are found once; those of a derived
+        frame by binary search on its region column. Either way the region is
+        a zero-copy row slice instead of a region column scan and row gather.
+        
+        Args:
+            dataset_name: Key from DATA_FILES config
+            region_code: Province code (hv024/v024/mv024)
+            df: Optional frame derived from load_dataset(dataset_name) by row
+                filters or added columns (defaults to the full dataset)
+        
+        Returns:
+            Region subframe (a view of the source frame; Copy-on-Write keeps
+            column assignments private to the caller), rows in file order
+        """
+        if df is not None:
+            codes = df[self.get_region_column(dataset_name)].to_numpy()
+            return df.iloc[codes.searchsorted(region_code, 'left'):codes.searchsorted(region_code, 'right')]
+        
+        df = self.load_dataset(dataset_name)
+        
+        if dataset_name not in self._region_cache:
+            codes = df[self.get_region_column(dataset_name)].to_numpy()
+            
+            boundaries = np.flatnonzero(codes[1:] != codes[:-1]) + 1
+            starts = np.r_[0, boundaries]
+            stops = np.r_[boundaries, len(codes)]
+            self._region_cache[dataset_name] = {
+                int(codes[start]): slice(start, stop)
+                for start, stop in zip(starts, stops)
+                if start < stop and not pd.isna(codes[start])
+            }
+        
+        return df.iloc[self._region_cache[dataset_name].get(region_code, slice(0, 0))]
+    
+    def _get_file_columns(self, dataset_name: str) -> List[str]:
+        """Get the column names of a dataset as stored in the file, read from the header once"""
+        if dataset_name not in self._file_columns:
+            with pd.read_stata(self._get_file_path(dataset_name), iterator=True) as reader:
+                self._file_columns[dataset_name] = list(reader.variable_labels())
+        return self._file_columns[dataset_name]
+    
+    def get_columns(self, dataset_name: str) -> FrozenSet[str]:
+        """Get the (lowercase) column names of a dataset, read from the file header once"""
+        if dataset_name not in self._columns:
+            self._columns[dataset_name] = frozenset(c.lower() for c in self._get_file_columns(dataset_name))
+        return self._columns[dataset_name]
+    
+    def get_resolved_columns(self, dataset_name: str) -> Dict[str, Optional[str]]:
+        """
+        Get the standard columns (see COLUMN_ALIASES) of a dataset.
+        
+        Resolved once per dataset from the file header, so callers never
+        probe the columns index again.
+        """
+        if dataset_name not in self._resolved_columns:
+            self._resolved_columns[dataset_name] = CalculationService.resolve_columns(
+                self.get_columns(dataset_name)
+            )
+        return self._resolved_columns[dataset_name]
+    
+    def get_district_column(self, dataset_name: str) -> str:
+        """Get the district column of a dataset (cluster hv001 if it has none)"""
+        return self.get_resolved_columns(dataset_name)['district'] or 'hv001'
+    
+    def get_region_column(self, dataset_name: str) -> str:
+        """Get the region (province) column of a dataset"""
+        region_col = self.get_resolved_columns(dataset_name)['region']
+        if region_col is None:
+            raise ValueError(f"No region column found in {dataset_name} dataset")
+        return region_col
+    
+    def get_weight_column(self, dataset_name: str) -> str:
+        """Get the sample weight column of a dataset"""
+        weight_col = self.get_resolved_columns(dataset_name)['weight']
+        if weight_col is None:
+            raise ValueError(f"No weight column found in {dataset_name} dataset")
+        return weight_col
+    
+    def get_filter_index(self, dataset_name: str) -> FilterIndex:
+        """
+        Get the FilterIndex of a full dataset, built once per data version.
+        
+        Pass it to CalculationService.apply_filters/filter_mask together with
+        the frame returned by load_dataset(dataset_name).
+        """
+        if dataset_name not in self._filter_index:
+            self._filter_index[dataset_name] = CalculationService.build_filter_index(
+                self.load_dataset(dataset_name), self.get_resolved_columns(dataset_name)
+            )
+        return self._filter_index[dataset_name]
+    
+    def load_derived(
+        self,
+        name: str,
+        dataset_name: str,
+        builder: Callable[[pd.DataFrame], Union[pd.DataFrame, Dict[str, np.ndarray]]],
+        columns: Optional[List[str]] = None,
+        filters: Optional[List[RowFilter]] = None
+    ) -> Union[pd.DataFrame, Dict[str, np.ndarray]]:
+        """
+        Load data derived from a dataset, building it only once.
+        
+        Args:
+            name: Cache key for the derived data
+            dataset_name: Source dataset passed to load_dataset
+            builder: Function turning the source dataset into a DataFrame or
+                a column-name -> numpy array dict (struct-of-arrays)
+            columns: Optional columns the builder needs (passed to load_dataset)
+            filters: Optional row filters (passed to load_dataset)
+        
+        Returns:
+            Cached derived data (shared between callers, treat as read-only)
+        """
+        if name not in self._derived_cache:
+            logger.info(f"Building derived data: {name} from {dataset_name}")
+            source = self.load_dataset(dataset_name, columns=columns, filters=filters)
+            self._derived_cache[name] = builder(source)
+        
+        return self._derived_cache[name]
+    
+    def warmup(self, datasets: List[str]) -> None:
+        """
+        Preload datasets so no request pays for the Stata read.
+        
+        Datasets are read one at a time: each full read briefly holds the raw
+        frame next to its converted copy, so parallel reads multiply the peak
+        memory of startup. A dataset that fails to load is logged and skipped;
+        it will load lazily on first use.
+        The full read also records the columns and standard columns
+        (get_columns/get_resolved_columns) the routers look up.
+        
+        Args:
+            datasets: Keys from DATA_FILES config
+        """
+        for dataset_name in datasets:
+            try:
+                self.load_dataset(dataset_name)
+            except Exception as e:
+                logger.warning(f"Warmup skipped {dataset_name}: {str(e)}")
+        
+        logger.info(f"Warmed up datasets: {datasets}")
+    
     def clear_cache(self):
         """Clear all cached datasets"""
         self._cache.clear()
+        self._derived_cache.clear()
+        self._region_cache.clear()
+        self._filter_index.clear()
+        self._version += 1
         logger.info("Data cache cleared")
     
     def get_cache_info(self) -> Dict:
         """Get information about cached datasets"""
         return {
             "cached_datasets": list(self._cache.keys()),
+            "derived_frames": list(self._derived_cache.keys()),
             "total_cached_mb": sum(
                 df.memory_usage(deep=True).sum() / 1024 / 1024 
                 for df in self._cache.values()
@@ -0,0 +1,67 @@
+"""
+Shared pipeline for binary (0/1) indicators described by an IndicatorSpec.
+Turns a spec into the standard district/province/national response.
+"""
+
+from typing import Dict
+
+import numpy as np
+
+from app.services.calculations import CalculationService, IndicatorSpec
+from app.services.data_loader import DHSDataLoader
+from app.utils.helpers import format_indicator_response, get_district_map
+
+
+def run_binary_indicator(
+    data_loader: DHSDataLoader,
+    calc: CalculationService,
+    spec: IndicatorSpec,
+    region: int,
+    label: str,
+    population_type: str
+) -> Dict:
+    """
+    Calculate a binary indicator for a region and format the response.
+    
+    Reads the cached indicator frame for the spec and computes district,
+    province and national weighted percentages in a single grouped pass.
+    
+    Args:
+        data_loader: Loader providing the source dataset and the cache
+        calc: Calculation service
+        spec: Indicator recipe
+        region: Province code
+        label: Indicator name shown in the response
+        population_type: Description of the target population
+    
+    Returns:
+        Formatted indicator response
+    """
+    df = calc.get_indicator_frame(data_loader, spec)
+    
+    district_map = get_district_map(region)
+    dist_codes = np.fromiter(district_map, dtype=np.int16, count=len(district_map))
+    dist_values, province_val, national_val = calc.weighted_fraction_summary(
+        df['indicator'].to_numpy(),
+        df['weight'].to_numpy(),
+        df['region'].to_numpy(),
+        df['district'].to_numpy(),
+        region,
+        dist_codes
+    )
+    # Keyed by code, so the response needs no name -> code lookup
+    districts_data = {
+        dist_code: value
+        for dist_code, value in zip(dist_codes.tolist(), dist_values.tolist())
+        if not np.isnan(value)
+    }
+    
+    return format_indicator_response(
+        indicator_name=label,
+        unit="Percentage",
+        districts_data=districts_data,
+        province_value=province_val,
+        province_code=region,
+        national_value=national_val,
+        population_type=population_type
+    )
@@ -1,3 +1,3 @@
-from .helpers import format_indicator_response, map_district_codes, get_province_key
+from .helpers import format_indicator_response, map_district_codes, get_province_key, get_district_map
 
-__all__ = ["format_indicator_response", "map_district_codes", "get_province_key"]
+__all__ = ["format_indicator_response", "map_district_codes", "get_province_key", "get_district_map"]
@@ -2,7 +2,8 @@
 Utility functions for data formatting and transformation.
 """
 
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Union
+
 from app.config import DISTRICT_MAPS, PROVINCES
 
 
@@ -39,10 +40,31 @@ def get_province_key(region_code: int) -> str:
     return province_map.get(region_code, "eastern")
 
 
+# District code -> name mapping per region code, resolved once at import
+REGION_DISTRICT_MAPS = {
+    code: DISTRICT_MAPS.get(get_province_key(code), {})
+    for code in PROVINCES
+}
+
+
+# District name -> code mapping per province key, for format_indicator_response
+DISTRICT_NAME_TO_CODE = {
+    province_key: {name: code for code, name in district_map.items()}
+    for province_key, district_map in DISTRICT_MAPS.items()
+}
+
+
+def get_district_map(region_code: int) -> Dict[int, str]:
+    """Get the district code -> name mapping for a region code"""
+    if region_code in REGION_DISTRICT_MAPS:
+        return REGION_DISTRICT_MAPS[region_code]
+    return DISTRICT_MAPS.get(get_province_key(region_code), {})
+
+
 def format_indicator_response(
     indicator_name: str,
     unit: str,
-    districts_data: Dict[str, float],
+    districts_data: Union[Dict[str, float], Dict[int, float]],
     province_value: Optional[float] = None,
     province_code: Optional[int] = None,
     national_value: Optional[float] = None,
@@ -54,7 +76,8 @@ def format_indicator_response(
     Args:
         indicator_name: Name of the indicator
         unit: Unit of measurement
-        districts_data: Dictionary of district_name -> value
+        districts_data: Dictionary of district_name -> value, or of
+            district_code -> value (names are then looked up from the code)
         province_value: Province-level aggregate
         province_code: Province identifier
         national_value: National-level aggregate
@@ -71,12 +94,14 @@ def format_indicator_response(
     districts = []
     province_key = get_province_key(province_code) if province_code else "eastern"
     district_map = DISTRICT_MAPS.get(province_key, {})
+    name_to_code = DISTRICT_NAME_TO_CODE.get(province_key, {})
     
-    # Create reverse mapping from name to code
-    name_to_code = {v: k for k, v in district_map.items()}
-    
-    for dist_name, value in districts_data.items():
-        dist_code = name_to_code.get(dist_name, 0)
+    for dist_key, value in districts_data.items():
+        if isinstance(dist_key, str):
+            dist_name, dist_code = dist_key, name_to_code.get(dist_key, 0)
+        else:
+            dist_code = int(dist_key)
+            dist_name = district_map.get(dist_code, f"District {dist_code}")
         districts.append(DistrictData(
             district_code=dist_code,
             district_name=dist_name,